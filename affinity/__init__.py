@@ -1,5 +1,6 @@
 # Affinity CRM Python Client
 from .client import AffinityClient
+from .async_client import AsyncAffinityClient
 
 __version__ = "0.1.1"
-__all__ = ["AffinityClient"] 
\ No newline at end of file
+__all__ = ["AffinityClient", "AsyncAffinityClient"] 
\ No newline at end of file
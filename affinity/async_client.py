@@ -0,0 +1,486 @@
+# affinity/async_client.py
+
+import asyncio
+import time
+from pydantic import ValidationError
+from affinity.auth import key_pool
+from affinity.batch import BatchResult, unique_ids
+from affinity.cache import ResponseCache
+from affinity.coercion import CoercionReport, coerce_field_values
+from affinity.client import AffinityClient, STREAM_CHUNK_SIZE, _api_error, _field_values_of, _person_with_email, _plan_field_value_writes, _WRITE_SUMMARY_KEYS
+from affinity.entity_cache import ENTITY_TYPE_PARAMS, PROBE_MISS_STATUSES, EntityTypeCache
+from affinity.exceptions import AffinityAPIError, EntityTypeNotFoundError
+from affinity.field_registry import FieldRegistry
+from affinity.indexes import OrganizationIndex, PersonIndex, normalize_email
+from affinity.instrumentation import RequestCall
+from affinity.models import GetListEntriesParams, ListFieldValuesParams, ListFieldValueChangesParams, ListOpportunitiesParams, ListOrganizationsParams, ListPersonsParams, encode_query
+from affinity.rate_limit import RateLimiter
+from affinity.records import to_records
+from affinity.retry import RetryPolicy
+from affinity.streaming import AsyncStreamedPage
+
+
+class AsyncAffinityClient(AffinityClient):
+    """
+    asyncio flavour of AffinityClient.
+
+    Every endpoint method of AffinityClient is available and returns an awaitable;
+    parameter validation is shared with the sync client. Requests go through one
+    pooled httpx.AsyncClient and at most `max_concurrency` of them are in flight at once;
+    with `http2=True` they are multiplexed over a single connection.
+    Methods with more than a single request (list_all_*, entity type probing,
+    set_field_value) are re-implemented below as coroutines / async generators.
+    """
+
+    def __init__(self, api_key, max_concurrency: int = 100, timeout: float = 30.0, transport=None, rate_limiter: RateLimiter = None, retry_policy: RetryPolicy = None, entity_type_cache: EntityTypeCache = None, cache: ResponseCache = None, organization_index: OrganizationIndex = None, person_index: PersonIndex = None, typed_records: bool = False, http2: bool = False, keepalive_expiry: float = 30.0, hooks: list = None, field_registry: FieldRegistry = None, base_url: str = None):
+        try:
+            import httpx
+        except ImportError:
+            raise ImportError("AsyncAffinityClient requires httpx: pip install affinity-crm-python-client[async]")
+        if base_url is not None:
+            self.base_url = base_url.rstrip("/")
+        self.keys = key_pool(api_key)
+        self.max_concurrency = max_concurrency
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self.entity_type_cache = entity_type_cache if entity_type_cache is not None else EntityTypeCache()
+        self.cache = cache
+        self.organization_index = organization_index
+        self.person_index = person_index
+        self.typed_records = typed_records
+        self.hooks = list(hooks or ())
+        self.field_registry = field_registry
+        self.session = httpx.AsyncClient(
+            base_url=self.base_url,
+            headers={"Content-Type": "application/json"},
+            limits=httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency, keepalive_expiry=keepalive_expiry),
+            timeout=timeout,
+            http2=http2,
+            transport=transport,
+        )
+        self._transport_errors = httpx.TransportError
+        self._semaphore = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def aclose(self):
+        await self.session.aclose()
+
+    def close(self):
+        raise TypeError("AsyncAffinityClient is closed with `await client.aclose()`")
+
+    def __enter__(self):
+        raise TypeError("Use `async with AsyncAffinityClient(...)` instead of `with`")
+
+    def __exit__(self, *exc_info):
+        pass
+
+    async def _seed_rate_limiter(self):
+        self.rate_limiter.seeded = True
+        try:
+            await self.get_rate_limit_status()
+        except AffinityAPIError:
+            pass
+
+    async def _send(self, method: str, path: str, params=None, data=None, headers=None, stream: bool = False):
+        if not self.hooks:
+            return await self._send_attempts(method, path, params, data, headers, stream)
+        call = RequestCall(method, path, data)
+        for hook in self.hooks:
+            hook.before_request(call)
+        try:
+            response = await self._send_attempts(method, path, params, data, headers, stream, call)
+        except Exception as e:
+            call.finish(error=e)
+            raise
+        else:
+            call.finish(response, stream=stream)
+        finally:
+            for hook in self.hooks:
+                hook.after_request(call)
+        return response
+
+    async def _send_attempts(self, method: str, path: str, params=None, data=None, headers=None, stream: bool = False, call: RequestCall = None):
+        # Created lazily so the semaphore binds to the running loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        policy = self.retry_policy
+        started = policy.clock()
+        attempt = 0
+
+        while True:
+            if self.rate_limiter is not None:
+                if not self.rate_limiter.seeded:
+                    await self._seed_rate_limiter()
+                await self.rate_limiter.acquire_async()
+
+            key = self.keys.acquire()
+            try:
+                async with self._semaphore:
+                    request = self.session.build_request(method, path, params=params, json=data, headers=headers)
+                    response = await self.session.send(request, auth=key, stream=stream)
+            except self._transport_errors:
+                delay = policy.next_delay(method, None, attempt, started)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                attempt += 1
+                if call is not None:
+                    call.retries = attempt
+                continue
+
+            self.keys.report(key, response.status_code, response.headers)
+            if self.rate_limiter is not None:
+                self.rate_limiter.update_from_headers(response.headers, per_key=len(self.keys) == 1)
+
+            if response.is_success or response.status_code == 304:
+                return response
+
+            if stream:
+                await response.aread()
+                await response.aclose()
+            if response.status_code == 429 and self.keys.available() and policy.next_delay(method, 429, attempt, started, 0.0) is not None:
+                # Another key still has quota: retry on it right away
+                attempt += 1
+                if call is not None:
+                    call.retries = attempt
+                continue
+            error = _api_error(response.status_code, response.text, response.headers)
+            retry_after = getattr(error, "retry_after", None)
+            if retry_after and self.rate_limiter is not None:
+                self.rate_limiter.block_for(retry_after)
+            delay = policy.next_delay(method, response.status_code, attempt, started, retry_after)
+            if delay is None:
+                raise error
+            await asyncio.sleep(delay)
+            attempt += 1
+            if call is not None:
+                call.retries = attempt
+
+    async def _request(self, method: str, path: str, params=None, data=None):
+        result = await self._request_json(method, path, params, data)
+        return to_records(path, result) if self.typed_records else result
+
+    async def _request_json(self, method: str, path: str, params=None, data=None):
+        if method != "GET":
+            result = (await self._send(method, path, params, data)).json()
+            self._after_write(method, path, result)
+            return result
+
+        cache = self.cache
+        if cache is None:
+            return (await self._send(method, path, params, data)).json()
+
+        entry = cache.lookup(path, params)
+        if entry is not None and cache.is_fresh(entry):
+            return entry.data()
+
+        response = await self._send(method, path, params, data, headers=entry.conditional_headers() if entry else None)
+        if response.status_code == 304 and entry is not None:
+            cache.revalidated(entry)
+            return entry.data()
+
+        result = response.json()
+        cache.store(path, params, result, response.headers)
+        return result
+
+    # ---------- Pagination ----------
+
+    async def _fetch_ahead(self, fetch, pages: asyncio.Queue):
+        token = None
+        try:
+            while True:
+                data = await fetch(token)
+                await pages.put(data)
+                token = data.get("next_page_token")
+                if not token:
+                    break
+        except Exception as e:
+            await pages.put(e)
+            return
+        await pages.put(None)
+
+    async def _list_all(self, fetch, key: str, prefetch: int = 0):
+        if prefetch <= 0:
+            token = None
+            while True:
+                data = await fetch(token)
+                for item in data.get(key, []):
+                    yield item
+                token = data.get("next_page_token")
+                if not token:
+                    break
+            return
+
+        pages = asyncio.Queue(maxsize=prefetch)
+        task = asyncio.ensure_future(self._fetch_ahead(fetch, pages))
+        try:
+            while True:
+                data = await pages.get()
+                if data is None:
+                    break
+                if isinstance(data, Exception):
+                    raise data
+                for item in data.get(key, []):
+                    yield item
+        finally:
+            task.cancel()
+
+    async def _stream(self, path: str, params, key: str) -> AsyncStreamedPage:
+        response = await self._send("GET", path, params, stream=True)
+        return AsyncStreamedPage(response.aiter_bytes(STREAM_CHUNK_SIZE), key, close=response.aclose, convert=self._record_factory(path))
+
+    async def _iter_streamed(self, path: str, query: dict, key: str):
+        token = None
+        while True:
+            page = await self._stream(path, {**query, "page_token": token} if token else query, key)
+            async for record in page:
+                yield record
+            token = page.meta.get("next_page_token")
+            if not token:
+                break
+
+    def _iter_all(self, path: str, params, key: str, prefetch: int, stream: bool):
+        if stream:
+            return self._iter_streamed(path, encode_query(params), key)
+        return self._list_all(self._paged_query(path, params), key, prefetch)
+
+    def list_all_persons(self, page_size: int = 50, prefetch: int = 0, stream: bool = False):
+        return self._iter_all("/persons", self._validated(ListPersonsParams, page_size=page_size), "persons", prefetch, stream)
+
+    def list_all_organizations(self, page_size: int = 50, prefetch: int = 0, stream: bool = False):
+        return self._iter_all("/organizations", self._validated(ListOrganizationsParams, page_size=page_size), "organizations", prefetch, stream)
+
+    def list_all_opportunities(self, page_size: int = 50, prefetch: int = 0, stream: bool = False):
+        return self._iter_all("/opportunities", self._validated(ListOpportunitiesParams, page_size=page_size), "opportunities", prefetch, stream)
+
+    def list_all_list_entries(self, list_id: int, page_size: int = 50, prefetch: int = 0, stream: bool = False):
+        return self._iter_all(f"/lists/{list_id}/list-entries", self._validated(GetListEntriesParams, page_size=page_size), "list_entries", prefetch, stream)
+
+    # ---------- Indexes ----------
+
+    async def build_organization_index(self, page_size: int = 500, prefetch: int = 1) -> OrganizationIndex:
+        index = OrganizationIndex()
+        async for org in self.list_all_organizations(page_size=page_size, prefetch=prefetch):
+            index.add(org)
+        self.organization_index = index
+        return index
+
+    async def build_person_index(self, page_size: int = 500, prefetch: int = 1) -> PersonIndex:
+        index = PersonIndex()
+        async for person in self.list_all_persons(page_size=page_size, prefetch=prefetch):
+            index.add(person)
+        self.person_index = index
+        return index
+
+    async def build_field_registry(self, list_ids=(), max_age: float = 3600.0) -> FieldRegistry:
+        """
+        Load every field (and the lists in `list_ids`) into a FieldRegistry and attach it as
+        self.field_registry. The registry itself can't await, so this client reloads it before the
+        field value writes when it is stale or a name or option misses.
+        """
+        self.field_registry = FieldRegistry(list_ids=list_ids, max_age=max_age)
+        await self.refresh_field_registry()
+        return self.field_registry
+
+    async def refresh_field_registry(self):
+        registry = self.field_registry
+        fields = []
+        token = None
+        while True:
+            page = await self.list_fields(page_token=token)
+            if isinstance(page, list):
+                fields.extend(page)
+                break
+            fields.extend(page.get("fields", []))
+            token = page.get("next_page_token")
+            if not token:
+                break
+        lists = await asyncio.gather(*(self.get_list(list_id) for list_id in registry.list_ids))
+        registry.load(fields, lists)
+
+    async def coerce_field_values(self, rows, list_id: int = None) -> CoercionReport:
+        if self.field_registry is None:
+            await self.build_field_registry()
+        elif self.field_registry.stale:
+            await self.refresh_field_registry()
+        return coerce_field_values(self.field_registry, rows, list_id, self.person_index, self.organization_index)
+
+    async def _resolve_fields(self, resolve, *args):
+        """Run a field_registry resolve method, reloading the registry first if stale and once more on a miss."""
+        registry = self.field_registry
+        if registry.stale:
+            await self.refresh_field_registry()
+        try:
+            return resolve(*args)
+        except ValueError:
+            if not registry.refresh_allowed:
+                raise
+        await self.refresh_field_registry()
+        return resolve(*args)
+
+    async def _find_person_by_email(self, email: str):
+        return _person_with_email(await self.list_persons(term=email), email)
+
+    async def resolve_emails(self, emails, max_workers: int = 50) -> dict:
+        emails = list(emails)
+        resolved = self.person_index.resolve(emails) if self.person_index is not None else dict.fromkeys(emails)
+        misses = [normalize_email(email) for email, person in resolved.items() if person is None]
+        found = {}
+        for fetched in await self._get_many(self._find_person_by_email, misses, max_workers, False, {}):
+            if not fetched.ok:
+                raise fetched.error
+            found[fetched.id] = fetched.result
+        return self._merge_resolved(resolved, found)
+
+    # ---------- Utility ----------
+
+    async def get_rate_limit_status(self):
+        status = await self._request("GET", "/rate-limit")
+        if self.rate_limiter is not None:
+            self.rate_limiter.seed(status, per_key=len(self.keys) == 1)
+        return status
+
+    # ---------- Field Values ----------
+
+    async def _probe_entity_types(self, path: str, api_params: dict, query_id: int, request=None):
+        request = request or self._request
+        cache = self.entity_type_cache
+        last_error = None
+        failed = 0
+
+        for param_name in cache.candidates(query_id):
+            test_params = api_params.copy()
+            test_params[param_name] = query_id
+            started = time.monotonic()
+            try:
+                result = await request("GET", path, params=test_params)
+            except AffinityAPIError as e:
+                if e.status_code not in PROBE_MISS_STATUSES:
+                    raise
+                cache.record_failure(query_id, param_name, time.monotonic() - started)
+                last_error = e
+                failed += 1
+                continue
+            cache.record_success(query_id, param_name, failed)
+            return result
+
+        raise EntityTypeNotFoundError(query_id, last_error)
+
+    async def list_field_values(self, field_values_query_id: int, entity_type: int = None, field_id: int = None, page_size: int = None, page_token: str = None):
+        if entity_type is not None:
+            return await super().list_field_values(field_values_query_id, entity_type=entity_type, field_id=field_id, page_size=page_size, page_token=page_token)
+        try:
+            params = ListFieldValuesParams(field_values_query_id=field_values_query_id, field_id=field_id, page_size=page_size, page_token=page_token)
+        except ValidationError as e:
+            raise ValueError(f"Parameter validation error: {e}")
+        api_params = params.model_dump(exclude_none=True)
+        query_id = api_params.pop('field_values_query_id')
+        return await self._probe_entity_types("/field-values", api_params, query_id)
+
+    async def iter_field_values(self, field_values_query_id: int, entity_type: int = None, field_id: int = None):
+        params = self._validated(ListFieldValuesParams, field_values_query_id=field_values_query_id, entity_type=entity_type, field_id=field_id)
+        api_params = encode_query(params)
+        query_id = api_params.pop('field_values_query_id')
+        entity_type = api_params.pop('entity_type', None)
+
+        if entity_type is not None:
+            if entity_type not in ENTITY_TYPE_PARAMS:
+                raise ValueError(f"Invalid entity_type: {entity_type}. Must be 0 (person), 1 (organization), or 8 (opportunity)")
+            api_params[ENTITY_TYPE_PARAMS[entity_type]] = query_id
+            page = await self._stream("/field-values", api_params, "field_values")
+        else:
+            page = await self._probe_entity_types("/field-values", api_params, query_id, request=lambda method, path, params: self._stream(path, params, "field_values"))
+        async for record in page:
+            yield record
+
+    async def list_field_value_changes(self, field_id: int, field_value_changes_query_id: int = None, entity_type: int = None, action_type: int = None):
+        if entity_type is not None or field_value_changes_query_id is None:
+            return await super().list_field_value_changes(field_id, field_value_changes_query_id, entity_type=entity_type, action_type=action_type)
+        try:
+            params = ListFieldValueChangesParams(field_id=field_id, field_value_changes_query_id=field_value_changes_query_id, action_type=action_type)
+        except ValidationError as e:
+            raise ValueError(f"Parameter validation error: {e}")
+        api_params = params.model_dump(exclude_none=True)
+        query_id = api_params.pop('field_value_changes_query_id')
+        return await self._probe_entity_types("/field-value-changes", api_params, query_id)
+
+    async def set_field_value(self, field_id, value, entity_id, entity_type: int = None, list_entry_id=None, list_id: int = None):
+        if self.field_registry is not None:
+            field_id, value = await self._resolve_fields(self.field_registry.resolve, field_id, value, list_id, self.person_index, self.organization_index)
+        try:
+            field_values = await self.list_field_values(entity_id, entity_type=entity_type, field_id=field_id)
+            existing_values = _field_values_of(field_values)
+
+            if existing_values:
+                field_value_id = existing_values[0]["id"]
+                return await self.update_field_value(field_value_id, value)
+            else:
+                return await self._create_field_value(field_id, value, entity_id, list_entry_id)
+
+        except Exception:
+            return await self._create_field_value(field_id, value, entity_id, list_entry_id)
+
+    async def set_field_values(self, entity_id: int, values: dict, entity_type: int = None, list_entry_id: int = None, max_workers: int = 8, list_id: int = None):
+        if self.field_registry is not None:
+            values = await self._resolve_fields(self.field_registry.resolve_values, values, list_id, self.person_index, self.organization_index)
+        try:
+            existing_values = _field_values_of(await self.list_field_values(entity_id, entity_type=entity_type))
+        except EntityTypeNotFoundError:
+            existing_values = []
+
+        writes = _plan_field_value_writes(existing_values, values, list_entry_id)
+        summary = {"created": [], "updated": [], "deleted": [], "unchanged": [], "errors": {}}
+        semaphore = asyncio.Semaphore(max_workers)
+
+        async def write(action, field_id, args):
+            async with semaphore:
+                if action == "create":
+                    return await self._create_field_value(*args, entity_id, list_entry_id)
+                if action == "update":
+                    return await self.update_field_value(*args)
+                return await self.delete_field_value(*args)
+
+        pending = [(action, field_id, args) for action, field_id, args in writes if action != "unchanged"]
+        summary["unchanged"] = [field_id for action, field_id, _ in writes if action == "unchanged"]
+        results = await asyncio.gather(*(write(*w) for w in pending), return_exceptions=True)
+        for (action, field_id, _), result in zip(pending, results):
+            if isinstance(result, Exception):
+                summary["errors"][field_id] = result
+            else:
+                summary[_WRITE_SUMMARY_KEYS[action]].append(result)
+        return summary
+
+    # ---------- Batch fetches ----------
+
+    async def _get_one(self, fetch, id, semaphore: asyncio.Semaphore, kwargs: dict) -> BatchResult:
+        async with semaphore:
+            try:
+                return BatchResult(id, result=await fetch(id, **kwargs))
+            except Exception as e:
+                return BatchResult(id, error=e)
+
+    def _get_many(self, fetch, ids, max_workers: int, as_completed: bool, kwargs: dict):
+        semaphore = asyncio.Semaphore(max_workers)
+        coros = [self._get_one(fetch, id, semaphore, kwargs) for id in unique_ids(ids)]
+        if as_completed:
+            return self._as_completed(coros)
+        return asyncio.gather(*coros)
+
+    async def _as_completed(self, coros):
+        for next_result in asyncio.as_completed(coros):
+            yield await next_result
+
+    def get_persons_many(self, person_ids, max_workers: int = 50, as_completed: bool = False, **kwargs):
+        """Awaitable list of BatchResult in input order, or an async iterator if `as_completed`."""
+        return self._get_many(self.get_person, person_ids, max_workers, as_completed, kwargs)
+
+    def get_organizations_many(self, org_ids, max_workers: int = 50, as_completed: bool = False, **kwargs):
+        return self._get_many(self.get_organization, org_ids, max_workers, as_completed, kwargs)
+
+    def get_opportunities_many(self, opp_ids, max_workers: int = 50, as_completed: bool = False, **kwargs):
+        return self._get_many(self.get_opportunity, opp_ids, max_workers, as_completed, kwargs)
@@ -0,0 +1,131 @@
+# affinity/auth.py
+
+import base64
+import threading
+import time
+
+from affinity.rate_limit import _header_int
+
+ROUND_ROBIN = "round_robin"
+FAILOVER = "failover"
+
+# How long a key is skipped after a 429 without Retry-After / exhausted quota without reset
+DEFAULT_COOLDOWN = 60.0
+
+
+def basic_auth_header(api_key: str) -> str:
+    """Authorization header value for an Affinity API key (HTTP Basic, empty user name)."""
+    return "Basic " + base64.b64encode(f":{api_key}".encode()).decode("ascii")
+
+
+class ApiKey:
+    """
+    One API key with its Authorization header encoded once.
+
+    Instances are callables that set that header on a request, so they can be passed as the
+    `auth` of both requests and httpx without any per-request encoding.
+    """
+
+    __slots__ = ("key", "header", "exhausted_until")
+
+    def __init__(self, key: str):
+        self.key = key
+        self.header = basic_auth_header(key)
+        self.exhausted_until = 0.0
+
+    def __call__(self, request):
+        request.headers["Authorization"] = self.header
+        return request
+
+    def __repr__(self):
+        return f"ApiKey('...{self.key[-4:]}')"
+
+
+class KeyPool:
+    """
+    The API key(s) a client authenticates with.
+
+    With several keys, `strategy` picks one per request: ROUND_ROBIN spreads requests evenly,
+    FAILOVER sticks to the first key and only moves on while it is exhausted. A key is
+    exhausted for Retry-After seconds after a 429, or until the reset when the
+    X-Ratelimit-Limit-User-Remaining header reaches 0; the client then retries the request on
+    another key immediately. Keys can be replaced at any time with rotate()/replace(): the key
+    set is swapped in one assignment, so requests in flight finish with the key they started with
+    and every later request uses the new set.
+    """
+
+    def __init__(self, api_keys, strategy: str = ROUND_ROBIN, cooldown: float = DEFAULT_COOLDOWN, clock=time.monotonic):
+        if strategy not in (ROUND_ROBIN, FAILOVER):
+            raise ValueError(f"Invalid strategy: {strategy}. Must be '{ROUND_ROBIN}' or '{FAILOVER}'")
+        self.strategy = strategy
+        self.cooldown = cooldown
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._next = 0
+        self._keys = self._build(api_keys)
+
+    @staticmethod
+    def _build(api_keys) -> tuple:
+        keys = tuple(ApiKey(key) for key in api_keys)
+        if not keys or not all(key.key for key in keys):
+            raise ValueError("At least one non-empty API key is required")
+        return keys
+
+    @property
+    def keys(self) -> list:
+        return [key.key for key in self._keys]
+
+    def __len__(self):
+        return len(self._keys)
+
+    def acquire(self) -> ApiKey:
+        """The key to send the next request with."""
+        keys = self._keys
+        now = self.clock()
+        with self._lock:
+            start = self._next % len(keys) if self.strategy == ROUND_ROBIN else 0
+            for offset in range(len(keys)):
+                key = keys[(start + offset) % len(keys)]
+                if key.exhausted_until <= now:
+                    self._next = start + offset + 1
+                    return key
+        # Every key is exhausted: use the one that recovers first
+        return min(keys, key=lambda key: key.exhausted_until)
+
+    def available(self) -> bool:
+        """Whether any key currently has quota left."""
+        now = self.clock()
+        return any(key.exhausted_until <= now for key in self._keys)
+
+    def report(self, key: ApiKey, status_code: int, headers):
+        """Record what a response says about `key`'s quota."""
+        if status_code == 429:
+            wait = _header_int(headers, "Retry-After")
+        elif _header_int(headers, "X-Ratelimit-Limit-User-Remaining") == 0:
+            wait = _header_int(headers, "X-Ratelimit-Limit-User-Reset")
+        else:
+            return
+        key.exhausted_until = self.clock() + (wait if wait is not None else self.cooldown)
+
+    def rotate(self, old_key: str, new_key: str):
+        """Replace `old_key` with `new_key`, keeping the other keys and their quota state."""
+        with self._lock:
+            if old_key not in self.keys:
+                raise ValueError("Unknown API key")
+            self._keys = tuple(ApiKey(new_key) if key.key == old_key else key for key in self._keys)
+
+    def replace(self, api_keys):
+        """Swap in a new set of keys."""
+        keys = self._build(api_keys)
+        with self._lock:
+            self._keys = keys
+            self._next = 0
+
+
+def key_pool(api_key) -> KeyPool:
+    """KeyPool for a client's `api_key` argument: a key, a list of keys, or a KeyPool."""
+    if isinstance(api_key, KeyPool):
+        return api_key
+    if isinstance(api_key, str):
+        return KeyPool([api_key])
+    return KeyPool(api_key)
@@ -0,0 +1,56 @@
+# affinity/batch.py
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+
+class BatchResult:
+    """Outcome of one ID in a batch fetch: either `result` or `error` is set."""
+
+    __slots__ = ("id", "result", "error")
+
+    def __init__(self, id, result=None, error: Exception = None):
+        self.id = id
+        self.result = result
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def __repr__(self):
+        return f"BatchResult(id={self.id!r}, ok={self.ok})"
+
+
+def unique_ids(ids) -> list:
+    """Drop duplicate IDs, keeping first-seen order."""
+    return list(dict.fromkeys(ids))
+
+
+def _call(fetch, id) -> BatchResult:
+    try:
+        return BatchResult(id, result=fetch(id))
+    except Exception as e:
+        return BatchResult(id, error=e)
+
+
+def fetch_many(fetch, ids, max_workers: int = 8) -> list:
+    """
+    Call `fetch(id)` for every distinct ID over a thread pool.
+    Returns BatchResults in input order; failures are captured per ID instead of raised.
+    """
+    ids = unique_ids(ids)
+    if not ids:
+        return []
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(ids))) as pool:
+        return list(pool.map(lambda id: _call(fetch, id), ids))
+
+
+def fetch_many_as_completed(fetch, ids, max_workers: int = 8):
+    """Like fetch_many, but yields each BatchResult as soon as its request finishes."""
+    ids = unique_ids(ids)
+    if not ids:
+        return
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(ids))) as pool:
+        futures = [pool.submit(_call, fetch, id) for id in ids]
+        for future in as_completed(futures):
+            yield future.result()
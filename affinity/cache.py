@@ -0,0 +1,201 @@
+# affinity/cache.py
+
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlencode
+
+# Read-mostly metadata endpoints and how long (seconds) their responses stay fresh.
+# "*" matches exactly one path segment.
+DEFAULT_TTLS = {
+    "/lists": 300,
+    "/lists/*": 300,
+    "/fields": 300,
+    "/fields/*": 300,
+    "/auth/whoami": 3600,
+}
+
+# Writes to a resource also invalidate these other resources (lists embed their fields)
+RELATED_RESOURCES = {
+    "fields": ("lists",),
+}
+
+
+class CachedResponse:
+    __slots__ = ("key", "path", "body", "etag", "last_modified", "expires_at")
+
+    def __init__(self, key: str, path: str, body: str, etag: str = None, last_modified: str = None, expires_at: float = 0.0):
+        self.key = key
+        self.path = path
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.expires_at = expires_at
+
+    def data(self):
+        # Bodies are stored as JSON text so callers can't mutate cached state
+        return json.loads(self.body)
+
+    def conditional_headers(self) -> dict:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class MemoryCache:
+    """In-process LRU backend."""
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, entry: CachedResponse):
+        with self._lock:
+            self._entries[entry.key] = entry
+            self._entries.move_to_end(entry.key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete_prefix(self, prefix: str):
+        with self._lock:
+            for key in [k for k, e in self._entries.items() if e.path == prefix or e.path.startswith(prefix + "/")]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteCache:
+    """On-disk backend; survives restarts and can be shared by several processes."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, path TEXT NOT NULL, body TEXT NOT NULL, "
+                "etag TEXT, last_modified TEXT, expires_at REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS responses_path ON responses (path)")
+
+    def get(self, key: str):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT key, path, body, etag, last_modified, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        return CachedResponse(*row) if row else None
+
+    def set(self, entry: CachedResponse):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (entry.key, entry.path, entry.body, entry.etag, entry.last_modified, entry.expires_at),
+            )
+
+    def delete_prefix(self, prefix: str):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses WHERE path = ? OR path LIKE ?", (prefix, prefix + "/%"))
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses")
+
+    def close(self):
+        self._conn.close()
+
+
+def _matches(pattern: str, path: str) -> bool:
+    pattern_parts = pattern.strip("/").split("/")
+    path_parts = path.strip("/").split("/")
+    if len(pattern_parts) != len(path_parts):
+        return False
+    return all(p == "*" or p == s for p, s in zip(pattern_parts, path_parts))
+
+
+class ResponseCache:
+    """
+    GET response cache used by AffinityClient._request.
+
+    Only paths with a TTL (see DEFAULT_TTLS) are cached. Stale entries that carried an ETag or
+    Last-Modified are revalidated with a conditional request; a 304 refreshes them without a
+    body. Any POST/PUT/DELETE issued by the client drops the cached entries of that resource.
+    """
+
+    def __init__(self, backend=None, ttls: dict = None, clock=time.time):
+        self.backend = backend if backend is not None else MemoryCache()
+        self.ttls = dict(DEFAULT_TTLS if ttls is None else ttls)
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+
+    def ttl_for(self, path: str) -> float:
+        for pattern, ttl in self.ttls.items():
+            if _matches(pattern, path):
+                return ttl
+        return 0
+
+    @staticmethod
+    def key_for(path: str, params=None) -> str:
+        return f"{path}?{urlencode(sorted(params.items()))}" if params else path
+
+    def lookup(self, path: str, params=None):
+        """Return the cached entry for a GET, or None if the path isn't cacheable or unknown."""
+        if not self.ttl_for(path):
+            return None
+        entry = self.backend.get(self.key_for(path, params))
+        if entry is None:
+            self.misses += 1
+        return entry
+
+    def is_fresh(self, entry: CachedResponse) -> bool:
+        fresh = entry.expires_at > self.clock()
+        if fresh:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return fresh
+
+    def store(self, path: str, params, data, headers) -> None:
+        ttl = self.ttl_for(path)
+        if not ttl:
+            return
+        self.backend.set(CachedResponse(
+            self.key_for(path, params),
+            path,
+            json.dumps(data),
+            etag=headers.get("ETag"),
+            last_modified=headers.get("Last-Modified"),
+            expires_at=self.clock() + ttl,
+        ))
+
+    def revalidated(self, entry: CachedResponse) -> None:
+        """Server answered 304: the entry is good for another TTL."""
+        self.revalidations += 1
+        entry.expires_at = self.clock() + self.ttl_for(entry.path)
+        self.backend.set(entry)
+
+    def invalidate(self, path: str) -> None:
+        """Drop everything cached for the resource `path` belongs to (e.g. /lists/12/list-entries -> /lists)."""
+        resource = path.strip("/").split("/")[0]
+        for name in (resource,) + RELATED_RESOURCES.get(resource, ()):
+            self.backend.delete_prefix("/" + name)
+
+    def clear(self) -> None:
+        self.backend.clear()
@@ -0,0 +1,145 @@
+# affinity/changes.py
+
+import json
+import os
+import time
+
+from affinity.batch import fetch_many_as_completed
+from affinity.records import as_dict
+
+
+def _changes_of(response) -> list:
+    """The change records of a list_field_value_changes response (a bare list, or a dict holding one)."""
+    if isinstance(response, dict):
+        response = response.get("field_value_changes", [])
+    return [as_dict(change) for change in response or ()]
+
+
+class ChangeCheckpoint:
+    """
+    High-water mark per field: the highest field value change ID already processed (change IDs
+    only ever grow). Kept in the JSON file at `path`, rewritten atomically on save(); without a
+    path it lives in memory only.
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path
+        self.marks = {}
+        if path and os.path.exists(path):
+            with open(path) as f:
+                self.marks = {int(field_id): mark for field_id, mark in json.load(f).get("fields", {}).items()}
+
+    def get(self, field_id: int) -> int:
+        return self.marks.get(field_id, 0)
+
+    def advance(self, field_id: int, change_id: int):
+        if change_id > self.get(field_id):
+            self.marks[field_id] = change_id
+
+    def save(self):
+        if not self.path:
+            return
+        # Write then rename, so a crash mid-save leaves the previous checkpoint intact
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump({"fields": {str(field_id): mark for field_id, mark in sorted(self.marks.items())}}, f)
+        os.replace(temp_path, self.path)
+
+
+class ChangeFeed:
+    """
+    Incremental feed of field value changes across many fields and, optionally, entities.
+
+    The API has no paging and no "since" filter for changes, so every run still reads each
+    (field, entity) blob - concurrently, `max_workers` at a time - but only changes above the
+    field's high-water mark are delivered. A change seen through several queries (an entity and
+    its list entry) is delivered once. A field's changes are delivered together, in change ID
+    order, once all of its queries have answered; a field with a failed query is held back whole
+    and retried from the same mark next run, so nothing is skipped.
+
+        feed = ChangeFeed(client, [4707433, 5000141], checkpoint="changes.checkpoint.json")
+        feed.run(audit_log.append)   # first run: full history; later runs: only what's new
+    """
+
+    def __init__(self, client, field_ids, entity_ids=None, entity_type: int = None, action_type: int = None, checkpoint=None, max_workers: int = 8):
+        self.client = client
+        self.field_ids = list(dict.fromkeys(field_ids))
+        self.entity_ids = list(dict.fromkeys(entity_ids)) if entity_ids is not None else None
+        self.entity_type = entity_type
+        self.action_type = action_type
+        self.checkpoint = checkpoint if isinstance(checkpoint, ChangeCheckpoint) else ChangeCheckpoint(checkpoint)
+        self.max_workers = max_workers
+        self.pending = {}  # field_id -> highest change ID delivered by iteration, not yet committed
+        # Counters of the latest run
+        self.errors = {}   # field_id -> first exception of its queries
+        self.changes = 0
+        self.duplicates = 0
+        self.skipped = 0   # at or below the high-water mark
+
+    def _queries(self) -> list:
+        if self.entity_ids is None:
+            return [(field_id, None) for field_id in self.field_ids]
+        return [(field_id, entity_id) for field_id in self.field_ids for entity_id in self.entity_ids]
+
+    def _fetch(self, query) -> list:
+        field_id, entity_id = query
+        return _changes_of(self.client.list_field_value_changes(field_id, entity_id, entity_type=self.entity_type, action_type=self.action_type))
+
+    def batches(self):
+        """Yield (field_id, new changes in ID order) per field, as each field's queries complete."""
+        self.errors, self.changes, self.duplicates, self.skipped = {}, 0, 0, 0
+        queries = self._queries()
+        remaining = {}
+        for field_id, _ in queries:
+            remaining[field_id] = remaining.get(field_id, 0) + 1
+        collected = {field_id: {} for field_id in remaining}
+
+        for fetched in fetch_many_as_completed(self._fetch, queries, self.max_workers):
+            field_id = fetched.id[0]
+            if not fetched.ok:
+                self.errors.setdefault(field_id, fetched.error)
+            else:
+                mark = self.checkpoint.get(field_id)
+                changes = collected[field_id]
+                for change in fetched.result:
+                    if change["id"] <= mark:
+                        self.skipped += 1
+                    elif change["id"] in changes:
+                        self.duplicates += 1
+                    else:
+                        changes[change["id"]] = change
+            remaining[field_id] -= 1
+            if remaining[field_id] == 0:
+                changes = collected.pop(field_id)
+                if field_id not in self.errors and changes:
+                    self.changes += len(changes)
+                    yield field_id, [changes[change_id] for change_id in sorted(changes)]
+
+    def __iter__(self):
+        """Each new change once; call commit() after processing them to advance the checkpoint."""
+        for field_id, changes in self.batches():
+            for change in changes:
+                yield change
+                self.pending[field_id] = change["id"]
+
+    def commit(self):
+        """Advance and save the checkpoint past every change iteration has delivered."""
+        for field_id, change_id in self.pending.items():
+            self.checkpoint.advance(field_id, change_id)
+        self.pending = {}
+        self.checkpoint.save()
+
+    def run(self, handler) -> dict:
+        """
+        Call `handler(change)` for every new change, saving the checkpoint after each field, so an
+        exception from the handler only repeats that field's changes on the next run.
+        Returns {"changes", "duplicates", "skipped", "errors", "seconds"}.
+        """
+        started = time.monotonic()
+        for field_id, changes in self.batches():
+            for change in changes:
+                handler(change)
+            self.checkpoint.advance(field_id, changes[-1]["id"])
+            self.checkpoint.save()
+        return {"changes": self.changes, "duplicates": self.duplicates, "skipped": self.skipped, "errors": dict(self.errors), "seconds": time.monotonic() - started}
+
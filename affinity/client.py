@@ -1,28 +1,334 @@
 # affinity/client.py
 
-import requests
-from requests.auth import HTTPBasicAuth
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from pydantic import ValidationError
 from typing import List
-from affinity.models import CreatePersonParams, UpdatePersonParams, GetPersonParams, ListPersonsParams, CreateOrganizationParams, UpdateOrganizationParams, GetOrganizationParams, ListOrganizationsParams, CreateOpportunityParams, UpdateOpportunityParams, GetOpportunityParams, ListOpportunitiesParams, CreateListParams, GetListEntriesParams, AddListEntryParams, ListFieldsParams, CreateFieldParams, ListFieldValuesParams, ListFieldValueChangesParams, CreateFieldValueParams, UpdateFieldValueParams, CreateNoteParams, UpdateNoteParams, ListNotesParams, CreateInteractionParams, UpdateInteractionParams, ListInteractionsParams, GetInteractionParams, CreateWebhookParams, UpdateWebhookParams, GetWebhookParams, GetRelationshipStrengthsParams
+from affinity.auth import key_pool
+from affinity.batch import fetch_many, fetch_many_as_completed
+from affinity.cache import ResponseCache
+from affinity.coercion import CoercionReport, coerce_field_values
+from affinity.entity_cache import ENTITY_TYPE_PARAMS, PROBE_MISS_STATUSES, EntityTypeCache
+from affinity.exceptions import AffinityAPIError, EntityTypeNotFoundError, RateLimitError
+from affinity.field_registry import FieldRegistry
+from affinity.indexes import OrganizationIndex, PersonIndex, emails_of, normalize_email
+from affinity.instrumentation import RequestCall
+from affinity.pagination import iter_items
+from affinity.rate_limit import RateLimiter
+from affinity.records import record_class_for, to_records
+from affinity.retry import RetryPolicy
+from affinity.streaming import StreamedPage
+from affinity.transport import RequestsTransport
+from affinity.models import CreatePersonParams, UpdatePersonParams, GetPersonParams, ListPersonsParams, CreateOrganizationParams, UpdateOrganizationParams, GetOrganizationParams, ListOrganizationsParams, CreateOpportunityParams, UpdateOpportunityParams, GetOpportunityParams, ListOpportunitiesParams, CreateListParams, GetListEntriesParams, AddListEntryParams, ListFieldsParams, CreateFieldParams, ListFieldValuesParams, ListFieldValueChangesParams, CreateFieldValueParams, UpdateFieldValueParams, CreateNoteParams, UpdateNoteParams, ListNotesParams, CreateInteractionParams, UpdateInteractionParams, ListInteractionsParams, GetInteractionParams, CreateWebhookParams, UpdateWebhookParams, GetWebhookParams, GetRelationshipStrengthsParams, encode_query
 
 BASE_URL = "https://api.affinity.co"
+STREAM_CHUNK_SIZE = 64 * 1024
+
+def _api_error(status_code: int, text: str, headers) -> AffinityAPIError:
+    if status_code == 429:
+        return RateLimitError(status_code, text, headers)
+    return AffinityAPIError(status_code, text, headers)
+
+def _field_values_of(response) -> list:
+    # /field-values answers with a bare list; tests and older callers use {"field_values": [...]}
+    if isinstance(response, list):
+        return response
+    return response.get("field_values", [])
+
+def _as_datetime(value):
+    if not isinstance(value, str):
+        return None
+    try:
+        return datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+def _same_value(existing, value) -> bool:
+    if isinstance(existing, dict) and not isinstance(value, dict):
+        # Dropdowns, persons, organizations come back as objects; callers pass the ID (or option text)
+        return existing.get("id") == value or existing.get("text") == value
+    existing_at, value_at = _as_datetime(existing), _as_datetime(value)
+    if existing_at is not None and value_at is not None:
+        # Dates come back as millisecond timestamps ("2025-03-31T00:00:00.000-07:00"); callers pass ISO dates
+        if len(value.strip()) == 10:
+            return existing_at.date() == value_at.date()
+        return existing_at == value_at
+    return existing == value
+
+_WRITE_SUMMARY_KEYS = {"create": "created", "update": "updated", "delete": "deleted"}
+
+def _plan_field_value_writes(existing_values: list, values: dict, list_entry_id=None) -> list:
+    """
+    Diff the desired {field_id: value} against the entity's current field values.
+    Returns (action, field_id, args) tuples; a value of None deletes the field's values.
+    """
+    by_field = {}
+    for field_value in existing_values:
+        if list_entry_id is not None and field_value.get("list_entry_id") not in (None, list_entry_id):
+            continue
+        by_field.setdefault(field_value.get("field_id"), []).append(field_value)
+
+    writes = []
+    for field_id, value in values.items():
+        current = by_field.get(field_id, [])
+        if value is None:
+            writes.extend(("delete", field_id, (fv["id"],)) for fv in current)
+        elif isinstance(value, list) or len(current) > 1:
+            # Multi-value fields hold one field value per item: create the missing, delete the extra
+            field_writes = _plan_multi_value_writes(field_id, current, value if isinstance(value, list) else [value])
+            writes.extend(field_writes or [("unchanged", field_id, ())])
+        elif not current:
+            writes.append(("create", field_id, (field_id, value)))
+        elif _same_value(current[0].get("value"), value):
+            writes.append(("unchanged", field_id, ()))
+        else:
+            writes.append(("update", field_id, (current[0]["id"], value)))
+    return writes
+
+def _plan_multi_value_writes(field_id, current: list, items: list) -> list:
+    remaining = list(current)
+    writes = []
+    for item in items:
+        match = next((fv for fv in remaining if _same_value(fv.get("value"), item)), None)
+        if match is None:
+            writes.append(("create", field_id, (field_id, item)))
+        else:
+            remaining.remove(match)
+    writes.extend(("delete", field_id, (fv["id"],)) for fv in remaining)
+    return writes
+
+def _person_with_email(result, email: str):
+    """The person in a list_persons search result who owns `email` exactly (term search is fuzzy)."""
+    for person in result.get("persons", []) if isinstance(result, dict) else result:
+        if email in emails_of(person):
+            return person
+    return None
 
 class AffinityClient:
-    def __init__(self, api_key: str):
-        self.api_key = api_key
-        self.session = requests.Session()
-        self.session.headers.update({"Content-Type": "application/json"})
+    base_url = BASE_URL
+
+    def __init__(self, api_key, rate_limiter: RateLimiter = None, retry_policy: RetryPolicy = None, entity_type_cache: EntityTypeCache = None, cache: ResponseCache = None, organization_index: OrganizationIndex = None, person_index: PersonIndex = None, typed_records: bool = False, transport=None, hooks: list = None, field_registry: FieldRegistry = None, base_url: str = None):
+        """
+        Args:
+            api_key: Affinity API key, a list of keys (requests are spread round-robin across them), or
+                a KeyPool for failover and other settings. See affinity.auth.KeyPool.
+            rate_limiter: Optional RateLimiter every request is scheduled through. It is seeded from
+                /rate-limit on first use and kept up to date from the X-Ratelimit-* response headers.
+            retry_policy: How transient failures (429/5xx, connection errors) are retried.
+                Defaults to RetryPolicy(); pass affinity.retry.NO_RETRY to disable.
+            entity_type_cache: Remembers which query parameter resolved each entity ID in
+                list_field_values / list_field_value_changes. Defaults to an in-memory EntityTypeCache().
+            cache: Optional ResponseCache for read-mostly GET endpoints (lists, fields, whoami).
+            organization_index: Optional OrganizationIndex kept current by this client's organization
+                writes; see build_organization_index().
+            person_index: Optional PersonIndex kept current by this client's person writes and used
+                by resolve_emails(); see build_person_index().
+            typed_records: Return persons, organizations, opportunities, list entries, field values,
+                notes and interactions as compact affinity.records classes instead of dicts.
+            transport: How requests are sent. Defaults to RequestsTransport() (pooled requests.Session);
+                pass RequestsTransport(pool_maxsize=..., timeout=...) to tune it, or HTTPXTransport()
+                for HTTP/2.
+            hooks: Objects notified before and after every API call (see affinity.instrumentation.Hook),
+                e.g. a MetricsCollector or an OpenTelemetryHook.
+            field_registry: Optional FieldRegistry that lets the field value writes take field names and
+                dropdown option text; see build_field_registry().
+            base_url: API root to send requests to; defaults to https://api.affinity.co.
+        """
+        if base_url is not None:
+            self.base_url = base_url.rstrip("/")
+        self.keys = key_pool(api_key)
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self.entity_type_cache = entity_type_cache if entity_type_cache is not None else EntityTypeCache()
+        self.cache = cache
+        self.organization_index = organization_index
+        self.person_index = person_index
+        self.typed_records = typed_records
+        self.transport = transport if transport is not None else RequestsTransport()
+        # requests.Session of the default transport (None for other transports)
+        self.session = getattr(self.transport, "session", None)
+        self.hooks = list(hooks or ())
+        self.field_registry = field_registry
+
+    @property
+    def api_key(self) -> str:
+        return self.keys.keys[0]
+
+    @api_key.setter
+    def api_key(self, value: str):
+        """Switch to a new key; requests already in flight finish with the old one."""
+        self.keys.replace([value])
+
+    def close(self):
+        self.transport.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _seed_rate_limiter(self):
+        # Mark as seeded first: the /rate-limit call below goes through _request too
+        self.rate_limiter.seeded = True
+        try:
+            self.get_rate_limit_status()
+        except AffinityAPIError:
+            pass
+
+    def _send(self, method: str, path: str, params=None, data=None, headers=None, stream: bool = False):
+        """Send one API call, applying rate limiting and retries; returns the successful response."""
+        if not self.hooks:
+            return self._send_attempts(method, path, params, data, headers, stream)
+        call = RequestCall(method, path, data)
+        for hook in self.hooks:
+            hook.before_request(call)
+        try:
+            response = self._send_attempts(method, path, params, data, headers, stream, call)
+        except Exception as e:
+            call.finish(error=e)
+            raise
+        else:
+            call.finish(response, stream=stream)
+        finally:
+            for hook in self.hooks:
+                hook.after_request(call)
+        return response
+
+    def _send_attempts(self, method: str, path: str, params=None, data=None, headers=None, stream: bool = False, call: RequestCall = None):
+        url = f"{self.base_url}{path}"
+        policy = self.retry_policy
+        started = policy.clock()
+        attempt = 0
+
+        while True:
+            if self.rate_limiter is not None:
+                if not self.rate_limiter.seeded:
+                    self._seed_rate_limiter()
+                self.rate_limiter.acquire()
+
+            key = self.keys.acquire()
+            try:
+                response = self.transport.request(method, url, auth=key, params=params, json=data, headers=headers, stream=stream)
+            except self.transport.errors:
+                delay = policy.next_delay(method, None, attempt, started)
+                if delay is None:
+                    raise
+                policy.sleep(delay)
+                attempt += 1
+                if call is not None:
+                    call.retries = attempt
+                continue
+
+            self.keys.report(key, response.status_code, response.headers)
+            if self.rate_limiter is not None:
+                self.rate_limiter.update_from_headers(response.headers, per_key=len(self.keys) == 1)
+
+            if response.ok:
+                return response
+
+            if response.status_code == 429 and self.keys.available() and policy.next_delay(method, 429, attempt, started, 0.0) is not None:
+                # Another key still has quota: retry on it right away
+                attempt += 1
+                if call is not None:
+                    call.retries = attempt
+                continue
+
+            error = _api_error(response.status_code, response.text, response.headers)
+            retry_after = getattr(error, "retry_after", None)
+            if retry_after and self.rate_limiter is not None:
+                self.rate_limiter.block_for(retry_after)
+            delay = policy.next_delay(method, response.status_code, attempt, started, retry_after)
+            if delay is None:
+                raise error
+            policy.sleep(delay)
+            attempt += 1
+            if call is not None:
+                call.retries = attempt
+
+    def _after_write(self, method: str, path: str, result):
+        """Bring client-side caches and indexes in line with a successful write."""
+        if self.cache is not None:
+            self.cache.invalidate(path)
+        parts = path.strip("/").split("/")
+        if parts[0] == "fields" and self.field_registry is not None:
+            self.field_registry.invalidate()
+        index = {"organizations": self.organization_index, "persons": self.person_index}.get(parts[0])
+        if index is not None and len(parts) <= 2:
+            if method == "DELETE":
+                index.remove(int(parts[1]))
+            elif isinstance(result, dict) and "id" in result:
+                index.add(result)
 
     def _request(self, method: str, path: str, params=None, data=None):
-        url = f"{BASE_URL}{path}"
-        auth = HTTPBasicAuth('', self.api_key)
-        response = self.session.request(method, url, auth=auth, params=params, json=data)
+        result = self._request_json(method, path, params, data)
+        return to_records(path, result) if self.typed_records else result
+
+    def _record_factory(self, path: str):
+        """from_dict of the record class for `path` when typed records are on, else None."""
+        record_class = record_class_for(path)[0] if self.typed_records else None
+        return record_class.from_dict if record_class is not None else None
+
+    def _request_json(self, method: str, path: str, params=None, data=None):
+        if method != "GET":
+            result = self._send(method, path, params, data).json()
+            self._after_write(method, path, result)
+            return result
+
+        cache = self.cache
+        if cache is None:
+            return self._send(method, path, params, data).json()
+
+        entry = cache.lookup(path, params)
+        if entry is not None and cache.is_fresh(entry):
+            return entry.data()
+
+        response = self._send(method, path, params, data, headers=entry.conditional_headers() if entry else None)
+        if response.status_code == 304 and entry is not None:
+            cache.revalidated(entry)
+            return entry.data()
+
+        result = response.json()
+        cache.store(path, params, result, response.headers)
+        return result
+
+    @staticmethod
+    def _validated(model, **kwargs):
+        try:
+            return model(**kwargs)
+        except ValidationError as e:
+            raise ValueError(f"Parameter validation error: {e}")
 
-        if not response.ok:
-            raise Exception(f"Affinity API error {response.status_code}: {response.text}")
+    def _paged_query(self, path: str, params):
+        """
+        Page fetcher for the list_all_* loops: the params model is validated and encoded once,
+        and each page only swaps in its page_token.
+        """
+        query = encode_query(params)
+
+        def fetch(token):
+            return self._request("GET", path, params={**query, "page_token": token} if token else query)
+        return fetch
+
+    def _stream(self, path: str, params, key: str) -> StreamedPage:
+        """GET `path` and parse the body incrementally; iterate the result to get `key`'s records."""
+        response = self._send("GET", path, params, stream=True)
+        return StreamedPage(response.iter_content(chunk_size=STREAM_CHUNK_SIZE), key, close=response.close, convert=self._record_factory(path))
+
+    def _iter_streamed(self, path: str, query: dict, key: str):
+        token = None
+        while True:
+            page = self._stream(path, {**query, "page_token": token} if token else query, key)
+            yield from page
+            token = page.meta.get("next_page_token")
+            if not token:
+                break
 
-        return response.json()
+    def _iter_all(self, path: str, params, key: str, prefetch: int, stream: bool):
+        if stream:
+            return self._iter_streamed(path, encode_query(params), key)
+        return iter_items(self._paged_query(path, params), key, prefetch)
 
     # ---------- Persons ----------
 
@@ -39,7 +345,7 @@ class AffinityClient:
             )
         except ValidationError as e:
             raise ValueError(f"Parameter validation error: {e}")
-        return self._request("GET", f"/persons/{person_id}", params={k: str(v).lower() if isinstance(v, bool) else v for k, v in params.model_dump(exclude_none=True).items()})
+        return self._request("GET", f"/persons/{person_id}", params=encode_query(params))
 
     def list_persons(self, term: str = None, with_interaction_dates: bool = None, with_interaction_persons: bool = None, with_opportunities: bool = None, with_current_organizations: bool = None, min_interaction_date: str = None, max_interaction_date: str = None, page_size: int = 50, page_token: str = None):
         """
@@ -59,17 +365,16 @@ class AffinityClient:
             )
         except ValidationError as e:
             raise ValueError(f"Parameter validation error: {e}")
-        return self._request("GET", "/persons", params={k: str(v).lower() if isinstance(v, bool) else v for k, v in params.model_dump(exclude_none=True).items()})
+        return self._request("GET", "/persons", params=encode_query(params))
 
-    def list_all_persons(self, page_size: int = 50):
-        token = None
-        while True:
-            data = self.list_persons(page_size=page_size, page_token=token)
-            for person in data.get("persons", []):
-                yield person
-            token = data.get("next_page_token")
-            if not token:
-                break
+    def list_all_persons(self, page_size: int = 50, prefetch: int = 0, stream: bool = False):
+        """
+        Iterate over all persons, following next_page_token.
+        `prefetch` pages are fetched ahead in a background thread while the current page is consumed.
+        With `stream=True` each page is parsed incrementally and records are yielded as they arrive
+        (lower peak memory and time-to-first-record; `prefetch` is then ignored).
+        """
+        yield from self._iter_all("/persons", self._validated(ListPersonsParams, page_size=page_size), "persons", prefetch, stream)
 
     def create_person(self, first_name, last_name, emails, organization_ids=None):
         try:
@@ -98,6 +403,40 @@ class AffinityClient:
     def delete_person(self, person_id: int):
         return self._request("DELETE", f"/persons/{person_id}")
 
+    def build_person_index(self, page_size: int = 500, prefetch: int = 1) -> PersonIndex:
+        """Load every person into a PersonIndex and attach it as self.person_index."""
+        self.person_index = PersonIndex(self.list_all_persons(page_size=page_size, prefetch=prefetch))
+        return self.person_index
+
+    def _find_person_by_email(self, email: str):
+        return _person_with_email(self.list_persons(term=email), email)
+
+    def resolve_emails(self, emails, max_workers: int = 8) -> dict:
+        """
+        Map each email address to its person record, or None if Affinity has no such person.
+
+        Addresses are answered from self.person_index when present; only misses are searched
+        with list_persons(term=email), concurrently, and the persons found are added to the index.
+        Raises the first search error, since a failed lookup must not read as "no such person".
+        """
+        emails = list(emails)
+        resolved = self.person_index.resolve(emails) if self.person_index is not None else dict.fromkeys(emails)
+        misses = [normalize_email(email) for email, person in resolved.items() if person is None]
+        found = {}
+        for fetched in fetch_many(self._find_person_by_email, misses, max_workers):
+            if not fetched.ok:
+                raise fetched.error
+            found[fetched.id] = fetched.result
+        return self._merge_resolved(resolved, found)
+
+    def _merge_resolved(self, resolved: dict, found: dict) -> dict:
+        for email, person in resolved.items():
+            if person is None:
+                resolved[email] = person = found.get(normalize_email(email))
+                if person is not None and self.person_index is not None:
+                    self.person_index.add(person)
+        return resolved
+
     # ---------- Organizations ----------
 
     def get_organization(self, org_id: int, with_opportunities: bool = None, with_persons: bool = None, with_interactions: bool = None, with_notes: bool = None, with_reminders: bool = None, with_files: bool = None):
@@ -124,7 +463,7 @@ class AffinityClient:
             )
         except ValidationError as e:
             raise ValueError(f"Parameter validation error: {e}")
-        return self._request("GET", f"/organizations/{org_id}", params={k: str(v).lower() if isinstance(v, bool) else v for k, v in params.model_dump(exclude_none=True).items()})
+        return self._request("GET", f"/organizations/{org_id}", params=encode_query(params))
 
     def list_organizations(self, term: str = None, page_size: int = 50, page_token: str = None, list_id: int = None, person_id: int = None, opportunity_id: int = None):
         """
@@ -149,19 +488,18 @@ class AffinityClient:
             )
         except ValidationError as e:
             raise ValueError(f"Parameter validation error: {e}")
-        return self._request("GET", "/organizations", params={k: str(v).lower() if isinstance(v, bool) else v for k, v in params.model_dump(exclude_none=True).items()})
+        return self._request("GET", "/organizations", params=encode_query(params))
 
 
 
-    def list_all_organizations(self, page_size: int = 50):
-        token = None
-        while True:
-            data = self.list_organizations(page_size=page_size, page_token=token)
-            for org in data.get("organizations", []):
-                yield org
-            token = data.get("next_page_token")
-            if not token:
-                break
+    def list_all_organizations(self, page_size: int = 50, prefetch: int = 0, stream: bool = False):
+        """
+        Iterate over all organizations, following next_page_token.
+        `prefetch` pages are fetched ahead in a background thread while the current page is consumed.
+        With `stream=True` each page is parsed incrementally and records are yielded as they arrive
+        (lower peak memory and time-to-first-record; `prefetch` is then ignored).
+        """
+        yield from self._iter_all("/organizations", self._validated(ListOrganizationsParams, page_size=page_size), "organizations", prefetch, stream)
 
     def create_organization(self, name: str, domain: str = None):
         try:
@@ -186,6 +524,11 @@ class AffinityClient:
     def delete_organization(self, org_id: int):
         return self._request("DELETE", f"/organizations/{org_id}")
 
+    def build_organization_index(self, page_size: int = 500, prefetch: int = 1) -> OrganizationIndex:
+        """Load every organization into an OrganizationIndex and attach it as self.organization_index."""
+        self.organization_index = OrganizationIndex(self.list_all_organizations(page_size=page_size, prefetch=prefetch))
+        return self.organization_index
+
     # ---------- Opportunities ----------
 
     def get_opportunity(self, opp_id: int, with_interactions: bool = None, with_notes: bool = None, with_reminders: bool = None, with_files: bool = None):
@@ -198,7 +541,7 @@ class AffinityClient:
             )
         except ValidationError as e:
             raise ValueError(f"Parameter validation error: {e}")
-        return self._request("GET", f"/opportunities/{opp_id}", params={k: str(v).lower() if isinstance(v, bool) else v for k, v in params.model_dump(exclude_none=True).items()})
+        return self._request("GET", f"/opportunities/{opp_id}", params=encode_query(params))
 
     def list_opportunities(self, page_size: int = 50, page_token: str = None, term: str = None, list_id: int = None, organization_id: int = None, person_id: int = None):
         try:
@@ -212,19 +555,18 @@ class AffinityClient:
             )
         except ValidationError as e:
             raise ValueError(f"Parameter validation error: {e}")
-        return self._request("GET", "/opportunities", params={k: str(v).lower() if isinstance(v, bool) else v for k, v in params.model_dump(exclude_none=True).items()})
+        return self._request("GET", "/opportunities", params=encode_query(params))
 
 
 
-    def list_all_opportunities(self, page_size: int = 50):
-        token = None
-        while True:
-            data = self.list_opportunities(page_size=page_size, page_token=token)
-            for opp in data.get("opportunities", []):
-                yield opp
-            token = data.get("next_page_token")
-            if not token:
-                break
+    def list_all_opportunities(self, page_size: int = 50, prefetch: int = 0, stream: bool = False):
+        """
+        Iterate over all opportunities, following next_page_token.
+        `prefetch` pages are fetched ahead in a background thread while the current page is consumed.
+        With `stream=True` each page is parsed incrementally and records are yielded as they arrive
+        (lower peak memory and time-to-first-record; `prefetch` is then ignored).
+        """
+        yield from self._iter_all("/opportunities", self._validated(ListOpportunitiesParams, page_size=page_size), "opportunities", prefetch, stream)
 
     def create_opportunity(self, name: str, list_id: int, organization_ids: List[int] = None):
         try:
@@ -298,17 +640,23 @@ class AffinityClient:
     def get_list_entry(self, entry_id: int):
         return self._request("GET", f"/list-entries/{entry_id}")
 
-    def list_all_list_entries(self, list_id: int, page_size: int = 50):
-        token = None
-        while True:
-            data = self.list_list_entries(list_id=list_id, page_size=page_size, page_token=token)
-            for entry in data.get("list_entries", []):
-                yield entry
-            token = data.get("next_page_token")
-            if not token:
-                break
+    def list_all_list_entries(self, list_id: int, page_size: int = 50, prefetch: int = 0, stream: bool = False):
+        """
+        Iterate over all list entries, following next_page_token.
+        `prefetch` pages are fetched ahead in a background thread while the current page is consumed.
+        With `stream=True` each page is parsed incrementally and records are yielded as they arrive
+        (lower peak memory and time-to-first-record; `prefetch` is then ignored).
+        """
+        yield from self._iter_all(f"/lists/{list_id}/list-entries", self._validated(GetListEntriesParams, page_size=page_size), "list_entries", prefetch, stream)
 
-    def create_field_value(self, field_id: int, value, entity_id: int, list_entry_id: int = None):
+    def create_field_value(self, field_id: int, value, entity_id: int, list_entry_id: int = None, list_id: int = None):
+        """With a field_registry, `field_id` may be a field name (`list_id` picks between lists' fields of the same name)."""
+        if self.field_registry is not None:
+            field_id, value = self.field_registry.resolve(field_id, value, list_id, self.person_index, self.organization_index)
+        return self._create_field_value(field_id, value, entity_id, list_entry_id)
+
+    def _create_field_value(self, field_id: int, value, entity_id: int, list_entry_id: int = None):
+        """create_field_value for an already resolved field ID and encoded value."""
         try:
             params = CreateFieldValueParams(
                 field_id=field_id,
@@ -316,8 +664,6 @@ class AffinityClient:
                 entity_id=entity_id,
                 list_entry_id=list_entry_id
             )
-            print(params)
-            print(params.model_dump(exclude_none=True))
         except ValidationError as e:
             raise ValueError(f"Parameter validation error: {e}")
         return self._request("POST", "/field-values", data=params.model_dump(exclude_none=True))
@@ -349,7 +695,7 @@ class AffinityClient:
             )
         except ValidationError as e:
             raise ValueError(f"Parameter validation error: {e}")
-        return self._request("GET", "/fields", params={k: str(v).lower() if isinstance(v, bool) else v for k, v in params.model_dump(exclude_none=True).items()})
+        return self._request("GET", "/fields", params=encode_query(params))
 
     def create_field(self, name: str, entity_type: int, value_type: int, list_id: int = None, allows_multiple: bool = None, is_list_specific: bool = None, is_required: bool = None):
         try:
@@ -372,6 +718,49 @@ class AffinityClient:
     def get_field(self, field_id: int):
         return self._request("GET", f"/fields/{field_id}")
 
+    def build_field_registry(self, list_ids=(), max_age: float = 3600.0) -> FieldRegistry:
+        """Load every field (and the lists in `list_ids`) into a FieldRegistry and attach it as self.field_registry."""
+        registry = FieldRegistry(self, list_ids=list_ids, max_age=max_age)
+        registry.refresh()
+        self.field_registry = registry
+        return registry
+
+    def coerce_field_values(self, rows, list_id: int = None) -> CoercionReport:
+        """
+        Validate and encode a batch of {field: value} rows against the fields' value_types before
+        writing any of them; see affinity.coercion.coerce_field_values. Builds the field registry
+        if there is none; person and organization references may be emails and domains when
+        person_index / organization_index are present.
+        """
+        if self.field_registry is None:
+            self.build_field_registry()
+        return coerce_field_values(self.field_registry, rows, list_id, self.person_index, self.organization_index)
+
+    def _probe_entity_types(self, path: str, api_params: dict, query_id: int, request=None):
+        request = request or self._request
+        cache = self.entity_type_cache
+        last_error = None
+        failed = 0
+
+        for param_name in cache.candidates(query_id):
+            test_params = api_params.copy()
+            test_params[param_name] = query_id
+            started = time.monotonic()
+            try:
+                result = request("GET", path, params=test_params)
+            except AffinityAPIError as e:
+                if e.status_code not in PROBE_MISS_STATUSES:
+                    raise
+                cache.record_failure(query_id, param_name, time.monotonic() - started)
+                last_error = e
+                failed += 1
+                continue
+            cache.record_success(query_id, param_name, failed)
+            return result
+
+        # If none of the parameter types worked, raise the last error
+        raise EntityTypeNotFoundError(query_id, last_error)
+
     def list_field_values(self, field_values_query_id: int, entity_type: int = None, field_id: int = None, page_size: int = None, page_token: str = None):
         """
         List field values for a specific entity.
@@ -411,29 +800,38 @@ class AffinityClient:
             if entity_type in entity_type_mappings:
                 param_name = entity_type_mappings[entity_type]
                 api_params[param_name] = query_id
+                self.entity_type_cache.set(query_id, param_name)
                 return self._request("GET", "/field-values", params=api_params)
             else:
                 raise ValueError(f"Invalid entity_type: {entity_type}. Must be 0 (person), 1 (organization), or 8 (opportunity)")
         
-        # Otherwise, try each parameter type until one works
-        param_names = ['person_id', 'organization_id', 'opportunity_id', 'list_entry_id']
-        last_error = None
-        
-        for param_name in param_names:
-            try:
-                test_params = api_params.copy()
-                test_params[param_name] = query_id
-                return self._request("GET", "/field-values", params=test_params)
-            except Exception as e:
-                last_error = e
-                continue
-        
-        # If none of the parameter types worked, raise the last error
-        raise Exception(f"Could not determine entity type for ID {query_id}. Tried all entity types but none worked. Last error: {last_error}")
+        # Otherwise, try each parameter type until one works (the cached one first)
+        return self._probe_entity_types("/field-values", api_params, query_id)
+
+    def iter_field_values(self, field_values_query_id: int, entity_type: int = None, field_id: int = None):
+        """
+        Streaming variant of list_field_values: yields field values while the response is still
+        being received instead of decoding the whole body first. Same arguments and entity type
+        resolution as list_field_values.
+        """
+        params = self._validated(ListFieldValuesParams, field_values_query_id=field_values_query_id, entity_type=entity_type, field_id=field_id)
+        api_params = encode_query(params)
+        query_id = api_params.pop('field_values_query_id')
+        entity_type = api_params.pop('entity_type', None)
+
+        if entity_type is not None:
+            if entity_type not in ENTITY_TYPE_PARAMS:
+                raise ValueError(f"Invalid entity_type: {entity_type}. Must be 0 (person), 1 (organization), or 8 (opportunity)")
+            api_params[ENTITY_TYPE_PARAMS[entity_type]] = query_id
+            page = self._stream("/field-values", api_params, "field_values")
+        else:
+            page = self._probe_entity_types("/field-values", api_params, query_id, request=lambda method, path, params: self._stream(path, params, "field_values"))
+        yield from page
 
-    def list_field_value_changes(self, field_id: int, field_value_changes_query_id: int, entity_type: int = None, action_type: int = None):
+    def list_field_value_changes(self, field_id: int, field_value_changes_query_id: int = None, entity_type: int = None, action_type: int = None):
         """
-        List field value changes for a specific entity.
+        List field value changes for a specific entity, or for every entity when
+        field_value_changes_query_id is omitted.
         
         Args:
             field_id: The ID of the field to get changes for
@@ -453,8 +851,10 @@ class AffinityClient:
         
         # Convert the abstract parameter to the appropriate API parameter
         api_params = params.model_dump(exclude_none=True)
-        query_id = api_params.pop('field_value_changes_query_id')
+        query_id = api_params.pop('field_value_changes_query_id', None)
         entity_type = api_params.pop('entity_type', None)
+        if query_id is None:
+            return self._request("GET", "/field-value-changes", params=api_params)
         
         # Define entity type mappings
         entity_type_mappings = {
@@ -468,25 +868,13 @@ class AffinityClient:
             if entity_type in entity_type_mappings:
                 param_name = entity_type_mappings[entity_type]
                 api_params[param_name] = query_id
+                self.entity_type_cache.set(query_id, param_name)
                 return self._request("GET", "/field-value-changes", params=api_params)
             else:
                 raise ValueError(f"Invalid entity_type: {entity_type}. Must be 0 (person), 1 (organization), or 8 (opportunity)")
         
-        # Otherwise, try each parameter type until one works
-        param_names = ['person_id', 'organization_id', 'opportunity_id', 'list_entry_id']
-        last_error = None
-        
-        for param_name in param_names:
-            try:
-                test_params = api_params.copy()
-                test_params[param_name] = query_id
-                return self._request("GET", "/field-value-changes", params=test_params)
-            except Exception as e:
-                last_error = e
-                continue
-        
-        # If none of the parameter types worked, raise the last error
-        raise Exception(f"Could not determine entity type for ID {query_id}. Tried all entity types but none worked. Last error: {last_error}")
+        # Otherwise, try each parameter type until one works (the cached one first)
+        return self._probe_entity_types("/field-value-changes", api_params, query_id)
 
     # ---------- Notes ----------
 
@@ -618,7 +1006,10 @@ class AffinityClient:
         return self._request("GET", "/auth/whoami")
 
     def get_rate_limit_status(self):
-        return self._request("GET", "/rate-limit")
+        status = self._request("GET", "/rate-limit")
+        if self.rate_limiter is not None:
+            self.rate_limiter.seed(status, per_key=len(self.keys) == 1)
+        return status
 
     def get_relationship_strengths(self, external_id: int):
         try:
@@ -629,7 +1020,36 @@ class AffinityClient:
 
     # ---------- Wrappers & Added functions ----------
 
-    def set_field_value(self, field_id, value, entity_id, entity_type: int = None, list_entry_id=None):
+    def _get_many(self, fetch, ids, max_workers: int, as_completed: bool, kwargs: dict):
+        call = lambda id: fetch(id, **kwargs)
+        if as_completed:
+            return fetch_many_as_completed(call, ids, max_workers)
+        return fetch_many(call, ids, max_workers)
+
+    def get_persons_many(self, person_ids, max_workers: int = 8, as_completed: bool = False, **kwargs):
+        """
+        Fetch many persons concurrently. Duplicate IDs are fetched once.
+
+        Args:
+            person_ids: Iterable of person IDs
+            max_workers: Maximum number of requests in flight
+            as_completed: Yield results as they finish instead of returning them in input order
+            **kwargs: Passed to get_person (e.g. with_opportunities=True)
+
+        Returns:
+            List (or iterator) of BatchResult with `id`, `result` and `error` set per ID.
+        """
+        return self._get_many(self.get_person, person_ids, max_workers, as_completed, kwargs)
+
+    def get_organizations_many(self, org_ids, max_workers: int = 8, as_completed: bool = False, **kwargs):
+        """Fetch many organizations concurrently; see get_persons_many."""
+        return self._get_many(self.get_organization, org_ids, max_workers, as_completed, kwargs)
+
+    def get_opportunities_many(self, opp_ids, max_workers: int = 8, as_completed: bool = False, **kwargs):
+        """Fetch many opportunities concurrently; see get_persons_many."""
+        return self._get_many(self.get_opportunity, opp_ids, max_workers, as_completed, kwargs)
+
+    def set_field_value(self, field_id, value, entity_id, entity_type: int = None, list_entry_id=None, list_id: int = None):
         """
         Smart method that either creates or updates a field value.
         First checks if a field value exists, then creates or updates accordingly.
@@ -639,11 +1059,16 @@ class AffinityClient:
             entity_id: The entity ID
             entity_type: Optional entity type (0=person, 1=organization, 8=opportunity). If provided, takes precedence over auto-detection.
             list_entry_id: The list entry ID (optional but often required)
+            list_id: The list whose field a field name refers to, when several lists have a field of that name
+
+        With a field_registry, `field_id` may be a field name and `value` dropdown option text.
         """
+        if self.field_registry is not None:
+            field_id, value = self.field_registry.resolve(field_id, value, list_id, self.person_index, self.organization_index)
         # First, try to get existing field values for this entity and field
         try:
             field_values = self.list_field_values(entity_id, entity_type=entity_type, field_id=field_id)
-            existing_values = field_values.get("field_values", [])
+            existing_values = _field_values_of(field_values)
             
             if existing_values:
                 # Update existing field value
@@ -651,8 +1076,60 @@ class AffinityClient:
                 return self.update_field_value(field_value_id, value)
             else:
                 # Create new field value
-                return self.create_field_value(field_id, value, entity_id, list_entry_id)
+                return self._create_field_value(field_id, value, entity_id, list_entry_id)
                 
         except Exception as e:
             # If we can't determine existing values, just try to create
-            return self.create_field_value(field_id, value, entity_id, list_entry_id)
\ No newline at end of file
+            return self._create_field_value(field_id, value, entity_id, list_entry_id)
+
+    def set_field_values(self, entity_id: int, values: dict, entity_type: int = None, list_entry_id: int = None, max_workers: int = 8, list_id: int = None):
+        """
+        Bulk version of set_field_value: reads the entity's field values once, skips values that
+        are already set, and issues the remaining creates, updates and deletes concurrently.
+
+        Args:
+            entity_id: The entity ID
+            values: {field_id: value}; a value of None deletes the field's current values
+            entity_type: Optional entity type (0=person, 1=organization, 8=opportunity). If provided, takes precedence over auto-detection.
+            list_entry_id: The list entry ID (optional but often required)
+            max_workers: Maximum number of writes in flight
+            list_id: The list whose fields names in `values` refer to, when several lists have a field of that name
+
+        Returns:
+            {"created": [...], "updated": [...], "deleted": [...], "unchanged": [field_id, ...], "errors": {field_id: exception}}
+
+        With a field_registry, `values` may be keyed by field name and give dropdown option text.
+        """
+        if self.field_registry is not None:
+            values = self.field_registry.resolve_values(values, list_id, self.person_index, self.organization_index)
+        try:
+            existing_values = _field_values_of(self.list_field_values(entity_id, entity_type=entity_type))
+        except EntityTypeNotFoundError:
+            # No entity type has this ID, so it has no values yet: just create
+            existing_values = []
+
+        writes = _plan_field_value_writes(existing_values, values, list_entry_id)
+        summary = {"created": [], "updated": [], "deleted": [], "unchanged": [], "errors": {}}
+        calls = {
+            "create": lambda field_id, value: self._create_field_value(field_id, value, entity_id, list_entry_id),
+            "update": self.update_field_value,
+            "delete": self.delete_field_value,
+        }
+
+        pending = []
+        for action, field_id, args in writes:
+            if action == "unchanged":
+                summary["unchanged"].append(field_id)
+            else:
+                pending.append((action, field_id, args))
+        if not pending:
+            return summary
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(pending))) as pool:
+            futures = [(action, field_id, pool.submit(calls[action], *args)) for action, field_id, args in pending]
+            for action, field_id, future in futures:
+                try:
+                    summary[_WRITE_SUMMARY_KEYS[action]].append(future.result())
+                except Exception as e:
+                    summary["errors"][field_id] = e
+        return summary
@@ -0,0 +1,262 @@
+# affinity/coercion.py
+
+import math
+from datetime import date, datetime
+
+from affinity.records import as_dict
+
+# Field value types
+PERSON = 0
+ORGANIZATION = 1
+DROPDOWN = 2
+NUMBER = 3
+DATE = 4
+LOCATION = 5
+TEXT = 6
+RANKED_DROPDOWN = 7
+
+LOCATION_KEYS = ("street_address", "city", "state", "country", "continent")
+
+
+class Reject:
+    """One value that can't be written: `row` is its position in the batch (None for a single value)."""
+
+    __slots__ = ("row", "field", "value", "reason")
+
+    def __init__(self, row, field, value, reason: str):
+        self.row = row
+        self.field = field
+        self.value = value
+        self.reason = reason
+
+    def __repr__(self):
+        return f"Reject(row={self.row}, field={self.field!r}, value={self.value!r}, reason={self.reason!r})"
+
+
+class CoercionError(ValueError):
+    """Raised when values fail validation; `rejects` lists every one of them, not just the first."""
+
+    def __init__(self, rejects: list):
+        self.rejects = rejects
+        shown = "; ".join(f"{r.field!r}={r.value!r}: {r.reason}" for r in rejects[:5])
+        more = f" (and {len(rejects) - 5} more)" if len(rejects) > 5 else ""
+        super().__init__(f"{len(rejects)} invalid field value(s): {shown}{more}")
+
+
+class CoercionReport:
+    """
+    Result of coerce_field_values: `rows` holds each input row as {field_id: encoded value}
+    (rejected values left out) and `rejects` every value that failed.
+    """
+
+    def __init__(self, rows: list, rejects: list):
+        self.rows = rows
+        self.rejects = rejects
+
+    @property
+    def rejected_rows(self) -> set:
+        return {reject.row for reject in self.rejects}
+
+    @property
+    def valid(self) -> list:
+        """(row index, values) of the rows without a single reject, ready to write."""
+        rejected = self.rejected_rows
+        return [(i, values) for i, values in enumerate(self.rows) if i not in rejected]
+
+    def raise_for_rejects(self):
+        if self.rejects:
+            raise CoercionError(self.rejects)
+
+    def __repr__(self):
+        return f"CoercionReport(rows={len(self.rows)}, rejects={len(self.rejects)}, rejected_rows={len(self.rejected_rows)})"
+
+
+class _Invalid(Exception):
+    """A single value failed; the message is the reject reason."""
+
+
+class ValueEncoder:
+    """
+    Validates values against a field's value_type and encodes them the way the API expects.
+
+    Dropdown text or option IDs are resolved through `registry` (a FieldRegistry); person and
+    organization references may be IDs, records, or - given a PersonIndex / OrganizationIndex -
+    email addresses and domains.
+    """
+
+    def __init__(self, registry=None, person_index=None, organization_index=None):
+        self.registry = registry
+        self.person_index = person_index
+        self.organization_index = organization_index
+        self._by_type = {
+            PERSON: self.person,
+            ORGANIZATION: self.organization,
+            DROPDOWN: self.dropdown,
+            NUMBER: self.number,
+            DATE: self.date,
+            LOCATION: self.location,
+            TEXT: self.text,
+            RANKED_DROPDOWN: self.dropdown,
+        }
+
+    def encoder_for(self, field: dict):
+        """One-argument function encoding values of `field`; raises _Invalid on a bad value."""
+        encode = self._by_type.get(field.get("value_type"))
+        if encode is None:
+            return lambda value: value
+        single = lambda value: None if value is None else encode(field, value)
+        if field.get("allows_multiple") is False:
+            def encode_one(value):
+                if isinstance(value, (list, tuple)):
+                    raise _Invalid("field takes a single value")
+                return single(value)
+            return encode_one
+
+        def encode_any(value):
+            if isinstance(value, (list, tuple)):
+                return [single(item) for item in value]
+            return single(value)
+        return encode_any
+
+    def encode(self, field: dict, value):
+        """Encoded `value` for `field`; raises CoercionError on a bad value."""
+        try:
+            return self.encoder_for(field)(value)
+        except _Invalid as e:
+            raise CoercionError([Reject(None, field.get("name", field.get("id")), value, str(e))])
+
+    # ---------- Value types ----------
+
+    @staticmethod
+    def _entity_id(value, kind: str) -> int:
+        if isinstance(value, dict):
+            value = value.get("id")
+        if isinstance(value, str) and value.strip().isdigit():
+            value = int(value)
+        if isinstance(value, bool) or not isinstance(value, int) or value <= 0:
+            raise _Invalid(f"expected a {kind} ID")
+        return value
+
+    def person(self, field, value):
+        if isinstance(value, str) and "@" in value:
+            if self.person_index is None:
+                raise _Invalid("email addresses need a person index")
+            person = self.person_index.by_email(value)
+            if person is None:
+                raise _Invalid("no person with this email")
+            return as_dict(person)["id"]
+        return self._entity_id(value, "person")
+
+    def organization(self, field, value):
+        if isinstance(value, str) and not value.strip().isdigit():
+            if self.organization_index is None:
+                raise _Invalid("domains need an organization index")
+            organization = self.organization_index.by_domain(value)
+            if organization is None:
+                raise _Invalid("no organization with this domain")
+            return as_dict(organization)["id"]
+        return self._entity_id(value, "organization")
+
+    def dropdown(self, field, value):
+        if not field.get("dropdown_options") or self.registry is None:
+            # Options unknown (e.g. loaded with exclude_dropdown_options): send as given
+            return value
+        if isinstance(value, dict):
+            value = value.get("id", value.get("text"))
+        if isinstance(value, bool) or not isinstance(value, (int, str)):
+            raise _Invalid("expected option text or ID")
+        try:
+            option = self.registry.option(field, value)
+        except ValueError:
+            raise _Invalid("not one of the field's options")
+        # Ranked dropdowns are written by option ID, plain dropdowns by option text
+        return option["id"] if field["value_type"] == RANKED_DROPDOWN else option["text"]
+
+    @staticmethod
+    def number(field, value):
+        if isinstance(value, str):
+            text = value.strip().replace(",", "").replace("_", "").replace(" ", "")
+            try:
+                value = int(text)
+            except ValueError:
+                try:
+                    value = float(text)
+                except ValueError:
+                    raise _Invalid("not a number")
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise _Invalid("not a number")
+        if isinstance(value, float) and not math.isfinite(value):
+            raise _Invalid("not a finite number")
+        return value
+
+    @staticmethod
+    def date(field, value):
+        if isinstance(value, (date, datetime)):
+            return value.isoformat()
+        if not isinstance(value, str):
+            raise _Invalid("expected a date or ISO 8601 string")
+        try:
+            return datetime.fromisoformat(value.strip().replace("Z", "+00:00")).isoformat()
+        except ValueError:
+            raise _Invalid("not an ISO 8601 date")
+
+    @staticmethod
+    def location(field, value):
+        if not isinstance(value, dict):
+            raise _Invalid("expected a location mapping")
+        unknown = set(value) - set(LOCATION_KEYS)
+        if unknown:
+            raise _Invalid(f"unknown location keys {sorted(unknown)}")
+        location = {key: value.get(key) for key in LOCATION_KEYS}
+        if not any(location.values()):
+            raise _Invalid("empty location")
+        if not all(part is None or isinstance(part, str) for part in location.values()):
+            raise _Invalid("location parts must be strings")
+        return location
+
+    @staticmethod
+    def text(field, value):
+        if isinstance(value, str):
+            return value
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return str(value)
+        raise _Invalid("expected text")
+
+
+def coerce_field_values(registry, rows, list_id: int = None, person_index=None, organization_index=None) -> CoercionReport:
+    """
+    Validate and encode a batch of {field: value} rows (fields by ID or name) before any request.
+
+    Work is done per column: each field is looked up in `registry` and its encoder chosen once,
+    then applied to all of that field's values. Unknown field names are rejects; field IDs the
+    registry doesn't know pass through unchecked, as in FieldRegistry.resolve.
+    """
+    rows = [dict(row) for row in rows]
+    encoder = ValueEncoder(registry, person_index, organization_index)
+    columns = {}
+    for i, row in enumerate(rows):
+        for field, value in row.items():
+            columns.setdefault(field, []).append((i, value))
+
+    encoded = [{} for _ in rows]
+    rejects = []
+    for field, cells in columns.items():
+        try:
+            meta = registry.field(field, list_id)
+        except ValueError as e:
+            if isinstance(field, int):
+                for i, value in cells:
+                    encoded[i][field] = value
+            else:
+                rejects.extend(Reject(i, field, value, str(e)) for i, value in cells)
+            continue
+        field_id = meta["id"]
+        encode = encoder.encoder_for(meta)
+        for i, value in cells:
+            try:
+                encoded[i][field_id] = encode(value)
+            except _Invalid as e:
+                rejects.append(Reject(i, field, value, str(e)))
+
+    rejects.sort(key=lambda reject: reject.row)
+    return CoercionReport(encoded, rejects)
@@ -0,0 +1,125 @@
+# affinity/entity_cache.py
+
+import json
+import os
+import threading
+from collections import OrderedDict
+
+# Order in which /field-values and /field-value-changes are probed when the entity type is unknown
+PROBE_ORDER = ['person_id', 'organization_id', 'opportunity_id', 'list_entry_id']
+
+# Numeric entity_type codes accepted by the field value endpoints
+ENTITY_TYPE_PARAMS = {0: 'person_id', 1: 'organization_id', 8: 'opportunity_id'}
+
+# API error statuses meaning "no entity of this type has the ID"; any other error ends probing
+PROBE_MISS_STATUSES = (404, 422)
+
+
+class EntityTypeCache:
+    """
+    LRU map of entity ID -> query parameter (person_id, organization_id, ...) that worked for it.
+
+    list_field_values / list_field_value_changes consult it before probing, so an ID that has
+    resolved once hits the right parameter on the first request. Pass `path` to persist the
+    mapping as JSON across runs (loaded on creation, written by save()).
+    """
+
+    def __init__(self, maxsize: int = 10000, path: str = None):
+        self.maxsize = maxsize
+        self.path = path
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.probe_requests = 0
+        self.failed_probes = 0
+        self.failed_probe_seconds = 0.0
+        self.saved_probes = 0
+        if path and os.path.exists(path):
+            self.load()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, entity_id: int):
+        with self._lock:
+            param_name = self._entries.get(entity_id)
+            if param_name is not None:
+                self._entries.move_to_end(entity_id)
+            return param_name
+
+    def set(self, entity_id: int, param_name: str):
+        with self._lock:
+            self._entries[entity_id] = param_name
+            self._entries.move_to_end(entity_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def discard(self, entity_id: int):
+        with self._lock:
+            self._entries.pop(entity_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def candidates(self, entity_id: int) -> list:
+        """Parameter names to try for `entity_id`, the cached one (if any) first."""
+        cached = self.get(entity_id)
+        with self._lock:
+            if cached is None:
+                self.misses += 1
+                return list(PROBE_ORDER)
+            self.hits += 1
+        return [cached] + [name for name in PROBE_ORDER if name != cached]
+
+    def record_failure(self, entity_id: int, param_name: str, seconds: float):
+        with self._lock:
+            self.probe_requests += 1
+            self.failed_probes += 1
+            self.failed_probe_seconds += seconds
+            if self._entries.get(entity_id) == param_name:
+                # Stale mapping (e.g. the entity was deleted)
+                del self._entries[entity_id]
+
+    def record_success(self, entity_id: int, param_name: str, failed: int):
+        """`failed` is the number of failed probes this lookup needed before succeeding."""
+        with self._lock:
+            self.probe_requests += 1
+            # Without the cache this lookup would have cost PROBE_ORDER.index(param_name) failed probes
+            self.saved_probes += PROBE_ORDER.index(param_name) - failed
+        self.set(entity_id, param_name)
+
+    def stats(self) -> dict:
+        with self._lock:
+            avg_failed = self.failed_probe_seconds / self.failed_probes if self.failed_probes else 0.0
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "probe_requests": self.probe_requests,
+                "failed_probes": self.failed_probes,
+                "failed_probe_seconds": self.failed_probe_seconds,
+                "saved_probes": self.saved_probes,
+                "estimated_seconds_saved": self.saved_probes * avg_failed,
+            }
+
+    def load(self):
+        with open(self.path) as f:
+            data = json.load(f)
+        with self._lock:
+            for entity_id, param_name in data.items():
+                if param_name in PROBE_ORDER:
+                    self._entries[int(entity_id)] = param_name
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def save(self):
+        if not self.path:
+            raise ValueError("EntityTypeCache has no path to save to")
+        with self._lock:
+            data = {str(entity_id): param_name for entity_id, param_name in self._entries.items()}
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,30 @@
+# affinity/exceptions.py
+
+class AffinityAPIError(Exception):
+    """Raised when the Affinity API answers with a non-2xx status."""
+
+    def __init__(self, status_code: int, text: str, headers=None):
+        super().__init__(f"Affinity API error {status_code}: {text}")
+        self.status_code = status_code
+        self.text = text
+        self.headers = headers or {}
+
+
+class RateLimitError(AffinityAPIError):
+    """Raised on HTTP 429; `retry_after` is in seconds when the server sent it."""
+
+    def __init__(self, status_code: int, text: str, headers=None):
+        super().__init__(status_code, text, headers)
+        try:
+            self.retry_after = float(self.headers.get("Retry-After"))
+        except (TypeError, ValueError):
+            self.retry_after = None
+
+
+class EntityTypeNotFoundError(Exception):
+    """Raised when probing finds no entity type (person, organization, opportunity, list entry) for an ID."""
+
+    def __init__(self, entity_id: int, last_error=None):
+        super().__init__(f"Could not determine entity type for ID {entity_id}. Tried all entity types but none worked. Last error: {last_error}")
+        self.entity_id = entity_id
+        self.last_error = last_error
@@ -0,0 +1,432 @@
+# affinity/export.py
+
+import abc
+import csv
+import json
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from affinity.batch import fetch_many
+from affinity.client import _field_values_of
+from affinity.field_registry import _all_fields
+from affinity.pagination import iter_pages
+from affinity.rate_limit import RateLimiter
+from affinity.records import as_dict
+
+ENTRY_COLUMNS = ("list_entry_id", "entity_id", "entity_type", "entity_name", "created_at")
+
+LOCATION_PARTS = ("street_address", "city", "state", "country")
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError("Columnar export requires pyarrow: pip install affinity-crm-python-client[arrow]")
+    return pyarrow
+
+
+def _arrow_type(pa, value_type):
+    """Arrow type of one value of a field with the given value_type."""
+    if value_type in (0, 1):  # person, organization -> entity ID
+        return pa.int64()
+    if value_type == 3:  # number
+        return pa.float64()
+    if value_type == 4:  # date
+        return pa.timestamp("us", tz="UTC")
+    return pa.string()  # dropdown / ranked dropdown (option text), location, text
+
+
+def _parse_date(value):
+    if isinstance(value, str):
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return value
+
+
+def _scalar(value_type, value):
+    """Convert one raw field value to the Python value of its column type."""
+    if value is None:
+        return None
+    if value_type in (0, 1):
+        return value.get("id") if isinstance(value, dict) else int(value)
+    if value_type in (2, 7):
+        return value.get("text") if isinstance(value, dict) else str(value)
+    if value_type == 3:
+        return float(value)
+    if value_type == 4:
+        return _parse_date(value)
+    if value_type == 5 and isinstance(value, dict):
+        return ", ".join(str(value[part]) for part in LOCATION_PARTS if value.get(part)) or None
+    return str(value)
+
+
+def _column_names(fields: list) -> list:
+    """One column name per field; duplicate names get the field ID appended."""
+    names = [field["name"] for field in fields]
+    taken = set(ENTRY_COLUMNS)
+    columns = []
+    for field, name in zip(fields, names):
+        if name in taken or names.count(name) > 1:
+            name = f"{name} ({field['id']})"
+        taken.add(name)
+        columns.append(name)
+    return columns
+
+
+def list_schema(fields: list):
+    """Arrow schema for a list export: the entry columns, then one column per field."""
+    pa = _pyarrow()
+    columns = [
+        pa.field("list_entry_id", pa.int64()),
+        pa.field("entity_id", pa.int64()),
+        pa.field("entity_type", pa.int8()),
+        pa.field("entity_name", pa.string()),
+        pa.field("created_at", pa.timestamp("us", tz="UTC")),
+    ]
+    for field, name in zip(fields, _column_names(fields)):
+        value_type = _arrow_type(pa, field.get("value_type"))
+        columns.append(pa.field(name, pa.list_(value_type) if field.get("allows_multiple") else value_type))
+    return pa.schema(columns)
+
+
+def _entry_values(entry: dict, values: list, field_ids) -> dict:
+    """{field_id: [raw values]} of one list entry, from its entity's field values."""
+    row = {}
+    for value in values:
+        # Values of other lists' entries for the same entity don't belong to this row
+        if value.get("list_entry_id") not in (None, entry["id"]) or value.get("field_id") not in field_ids:
+            continue
+        row.setdefault(value["field_id"], []).append(value.get("value"))
+    return row
+
+
+def _entity_name(entity):
+    if not entity:
+        return None
+    if entity.get("name") is not None:
+        return entity["name"]
+    name = " ".join(part for part in (entity.get("first_name"), entity.get("last_name")) if part)
+    return name or None
+
+
+class ListExporter:
+    """
+    Streams one list's entries and their field values into Arrow record batches.
+
+    Entries are read page by page (streamed) and grouped into batches of `batch_size`; each
+    batch's field values are fetched concurrently (`max_workers` threads, one request per entity),
+    pivoted into one column per field, typed by the field's value_type, and handed to the writer.
+    Only one batch is held in memory at a time.
+    """
+
+    def __init__(self, client, list_id: int, fields: list = None, batch_size: int = 1000, max_workers: int = 8):
+        self.client = client
+        self.list_id = list_id
+        if fields is None:
+            fields = _all_fields(client, list_id)
+        self.fields = [as_dict(field) for field in fields]
+        self.schema = list_schema(self.fields)
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.rows = 0
+        self.batches = 0
+
+    def _fetch_values(self, entry: dict) -> list:
+        return _field_values_of(self.client.list_field_values(entry["entity_id"], entity_type=entry.get("entity_type")))
+
+    def _columns(self, entries: list, values_by_entry: list) -> dict:
+        columns = {
+            "list_entry_id": [entry["id"] for entry in entries],
+            "entity_id": [entry.get("entity_id") for entry in entries],
+            "entity_type": [entry.get("entity_type") for entry in entries],
+            "entity_name": [_entity_name(entry.get("entity")) for entry in entries],
+            "created_at": [_parse_date(entry.get("created_at")) for entry in entries],
+        }
+        field_names = {field["id"]: (field, name) for field, name in zip(self.fields, self.schema.names[len(ENTRY_COLUMNS):])}
+        for field, name in field_names.values():
+            columns[name] = []
+
+        for entry, values in zip(entries, values_by_entry):
+            row = _entry_values(entry, values, field_names)
+            for field_id, (field, name) in field_names.items():
+                converted = [_scalar(field.get("value_type"), v) for v in row.get(field_id, ())]
+                if field.get("allows_multiple"):
+                    columns[name].append(converted)
+                else:
+                    columns[name].append(converted[0] if converted else None)
+        return columns
+
+    def _values(self, entries: list) -> list:
+        """Field values of each entry, fetched concurrently. A failed fetch aborts the export."""
+        values = []
+        for fetched in fetch_many(lambda i: self._fetch_values(entries[i]), range(len(entries)), self.max_workers):
+            if not fetched.ok:
+                raise fetched.error
+            values.append(fetched.result)
+        return values
+
+    def _record_batch(self, entries: list):
+        batch = _pyarrow().RecordBatch.from_pydict(self._columns(entries, self._values(entries)), schema=self.schema)
+        self.rows += batch.num_rows
+        self.batches += 1
+        return batch
+
+    def record_batches(self):
+        """Yield one pyarrow.RecordBatch per `batch_size` list entries."""
+        entries = []
+        for entry in self.client.list_all_list_entries(self.list_id, page_size=500, stream=True):
+            entries.append(as_dict(entry))
+            if len(entries) >= self.batch_size:
+                yield self._record_batch(entries)
+                entries = []
+        if entries:
+            yield self._record_batch(entries)
+
+    def write(self, path: str, format: str = None, compression: str = "snappy") -> dict:
+        """
+        Write the export to `path` batch by batch. `format` is "parquet" or "arrow" (Arrow IPC
+        file); by default it follows the extension (.parquet/.pq -> Parquet, anything else -> Arrow).
+        Returns {"rows", "batches", "seconds"}.
+        """
+        pa = _pyarrow()
+        if format is None:
+            format = "parquet" if path.endswith((".parquet", ".pq")) else "arrow"
+        if format == "parquet":
+            import pyarrow.parquet
+            writer = pyarrow.parquet.ParquetWriter(path, self.schema, compression=compression)
+        elif format == "arrow":
+            writer = pa.ipc.new_file(path, self.schema)
+        else:
+            raise ValueError(f"Invalid format: {format}. Must be 'parquet' or 'arrow'")
+
+        started = time.monotonic()
+        with writer:
+            for batch in self.record_batches():
+                writer.write_batch(batch)
+        return {"rows": self.rows, "batches": self.batches, "seconds": time.monotonic() - started}
+
+
+def export_list(client, list_id: int, path: str, format: str = None, fields: list = None, batch_size: int = 1000, max_workers: int = 8, compression: str = "snappy") -> dict:
+    """Export a list's entries and field values to a Parquet or Arrow IPC file; see ListExporter."""
+    exporter = ListExporter(client, list_id, fields=fields, batch_size=batch_size, max_workers=max_workers)
+    return exporter.write(path, format=format, compression=compression)
+
+
+# ---------- Multi-list export ----------
+
+def _plain(value_type, value):
+    """_scalar, with dates as ISO 8601 strings so records serialize to JSON and CSV as-is."""
+    value = _scalar(value_type, value)
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+class RecordSink(abc.ABC):
+    """
+    Destination of export_lists records. open() gets the column names (entry columns, then every
+    exported field's column) before the first record; write() is only ever called from one thread.
+    """
+
+    def open(self, columns: list):
+        pass
+
+    @abc.abstractmethod
+    def write(self, record: dict):
+        """Write one record."""
+
+    def close(self):
+        pass
+
+
+class CallbackSink(RecordSink):
+    def __init__(self, callback):
+        self.callback = callback
+
+    def write(self, record: dict):
+        self.callback(record)
+
+
+class _FileSink(RecordSink):
+    """Writes to `path`, or to an already open text file (left open on close)."""
+
+    def __init__(self, path_or_file):
+        self.path_or_file = path_or_file
+        self.file = None
+
+    def open(self, columns: list):
+        if isinstance(self.path_or_file, str):
+            self.file = open(self.path_or_file, "w", encoding="utf-8", newline="")
+        else:
+            self.file = self.path_or_file
+
+    def close(self):
+        if isinstance(self.path_or_file, str) and self.file is not None:
+            self.file.close()
+
+
+class JSONLSink(_FileSink):
+    """One JSON object per line: the entry columns plus {"fields": {column: value}}."""
+
+    def write(self, record: dict):
+        self.file.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+class CSVSink(_FileSink):
+    """One row per entry, one column per field; multiple values are joined with `separator`."""
+
+    def __init__(self, path_or_file, separator: str = "; "):
+        super().__init__(path_or_file)
+        self.separator = separator
+        self.writer = None
+
+    def open(self, columns: list):
+        super().open(columns)
+        self.writer = csv.DictWriter(self.file, fieldnames=columns, extrasaction="ignore")
+        self.writer.writeheader()
+
+    def _cell(self, value):
+        if isinstance(value, list):
+            return self.separator.join(str(v) for v in value)
+        return value
+
+    def write(self, record: dict):
+        row = {name: value for name, value in record.items() if name != "fields"}
+        row.update((name, self._cell(value)) for name, value in record["fields"].items())
+        self.writer.writerow(row)
+
+
+def _sink(sink) -> RecordSink:
+    if isinstance(sink, RecordSink):
+        return sink
+    if isinstance(sink, str):
+        return CSVSink(sink) if sink.endswith(".csv") else JSONLSink(sink)
+    if callable(sink):
+        return CallbackSink(sink)
+    raise ValueError(f"Invalid sink: {sink!r}. Must be a RecordSink, a callable or a .jsonl/.csv path")
+
+
+class MultiListExporter:
+    """
+    Exports many lists in one pass: each list's entries are paged by its own thread (up to
+    `max_lists` at a time) and every entry's field value fetch goes to one shared pool of
+    `max_workers` threads. Fetched values are joined to their entry and the resulting records are
+    written to the sink from the calling thread, in completion order. At most
+    `max_workers * 4` entries wait in memory, so page walkers stall when writes fall behind.
+
+    All requests are paced by one RateLimiter: the client's own when it has one, else
+    `rate_limiter` (default RateLimiter(), Affinity's per-key limit).
+    """
+
+    def __init__(self, client, list_ids, fields: dict = None, max_workers: int = 16, max_lists: int = 4, page_size: int = 500, rate_limiter: RateLimiter = None):
+        self.client = client
+        self.list_ids = list(dict.fromkeys(list_ids))
+        self.max_workers = max_workers
+        self.max_lists = max_lists
+        self.page_size = page_size
+        # The client paces its own requests; only add pacing when it doesn't
+        self.budget = None if client.rate_limiter is not None else (rate_limiter or RateLimiter())
+        fields = fields or {}
+        self.fields = {list_id: [as_dict(f) for f in (fields[list_id] if list_id in fields else self._list_fields(list_id))] for list_id in self.list_ids}
+        self.names = {list_id: dict(zip((f["id"] for f in self.fields[list_id]), _column_names(self.fields[list_id]))) for list_id in self.list_ids}
+        self._fields_by_id = {list_id: {f["id"]: f for f in self.fields[list_id]} for list_id in self.list_ids}
+        self.records = {list_id: 0 for list_id in self.list_ids}
+        self.errors = []
+
+    def _list_fields(self, list_id: int) -> list:
+        registry = getattr(self.client, "field_registry", None)
+        if registry is not None:
+            return registry.fields(list_id)
+        return _all_fields(self.client, list_id)
+
+    @property
+    def columns(self) -> list:
+        columns = ["list_id", *ENTRY_COLUMNS]
+        for list_id in self.list_ids:
+            columns.extend(name for name in self.names[list_id].values() if name not in columns)
+        return columns
+
+    def _paced(self):
+        if self.budget is not None:
+            self.budget.acquire()
+
+    def _page(self, list_id: int, token):
+        self._paced()
+        return self.client.list_list_entries(list_id, page_size=self.page_size, page_token=token)
+
+    def _fetch_values(self, entry: dict) -> list:
+        self._paced()
+        return _field_values_of(self.client.list_field_values(entry["entity_id"], entity_type=entry.get("entity_type")))
+
+    def _record(self, list_id: int, entry: dict, values: list) -> dict:
+        fields = self._fields_by_id[list_id]
+        row = _entry_values(entry, values, fields)
+        record = {
+            "list_id": list_id,
+            "list_entry_id": entry["id"],
+            "entity_id": entry.get("entity_id"),
+            "entity_type": entry.get("entity_type"),
+            "entity_name": _entity_name(entry.get("entity")),
+            "created_at": entry.get("created_at"),
+            "fields": {},
+        }
+        for field_id, name in self.names[list_id].items():
+            field = fields[field_id]
+            converted = [_plain(field.get("value_type"), v) for v in row.get(field_id, ())]
+            record["fields"][name] = converted if field.get("allows_multiple") else (converted[0] if converted else None)
+        return record
+
+    def _walk(self, list_id: int, pool: ThreadPoolExecutor, slots: threading.Semaphore, results: queue.Queue):
+        submitted = 0
+        try:
+            for page in iter_pages(lambda token: self._page(list_id, token)):
+                for entry in page.get("list_entries", ()):
+                    entry = as_dict(entry)
+                    slots.acquire()
+                    future = pool.submit(self._fetch_values, entry)
+                    future.add_done_callback(lambda f, entry=entry: results.put(("entry", list_id, entry, f)))
+                    submitted += 1
+        except Exception as e:
+            self.errors.append((list_id, None, e))
+        results.put(("done", list_id, submitted, None))
+
+    def run(self, sink) -> dict:
+        """Export every list to `sink`; returns {"records", "per_list", "errors", "seconds"}."""
+        sink = _sink(sink)
+        started = time.monotonic()
+        results = queue.Queue()
+        slots = threading.Semaphore(self.max_workers * 4)
+        sink.open(self.columns)
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool, ThreadPoolExecutor(max_workers=self.max_lists) as walkers:
+                for list_id in self.list_ids:
+                    walkers.submit(self._walk, list_id, pool, slots, results)
+                lists_left, expected, received = len(self.list_ids), 0, 0
+                while lists_left or received < expected:
+                    kind, list_id, payload, future = results.get()
+                    if kind == "done":
+                        lists_left -= 1
+                        expected += payload
+                        continue
+                    received += 1
+                    slots.release()
+                    try:
+                        sink.write(self._record(list_id, payload, future.result()))
+                        self.records[list_id] += 1
+                    except Exception as e:
+                        self.errors.append((list_id, payload["id"], e))
+        finally:
+            sink.close()
+        return {"records": sum(self.records.values()), "per_list": dict(self.records), "errors": self.errors, "seconds": time.monotonic() - started}
+
+
+def export_lists(client, list_ids, sink, fields: dict = None, max_workers: int = 16, max_lists: int = 4, page_size: int = 500, rate_limiter: RateLimiter = None) -> dict:
+    """
+    Export the entries of many lists, each joined with its field values, to `sink` in one pass;
+    see MultiListExporter. `sink` is a RecordSink, a callable taking each record, or a path
+    (.csv -> CSVSink, anything else -> JSONLSink). Failed fetches don't stop the export: they are
+    returned as (list_id, list_entry_id or None for a list's pages, exception) in "errors".
+    """
+    exporter = MultiListExporter(client, list_ids, fields=fields, max_workers=max_workers, max_lists=max_lists, page_size=page_size, rate_limiter=rate_limiter)
+    return exporter.run(sink)
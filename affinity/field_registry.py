@@ -0,0 +1,223 @@
+# affinity/field_registry.py
+
+import threading
+import time
+
+from affinity.coercion import ValueEncoder, coerce_field_values
+from affinity.indexes import normalize_name
+from affinity.records import as_dict
+
+
+class _Snapshot:
+    """One loaded generation of field metadata; replaced as a whole on refresh."""
+
+    __slots__ = ("by_id", "by_name", "by_list", "by_entity_type", "options", "option_ids", "lists")
+
+    def __init__(self, fields=(), lists=()):
+        self.by_id = {}
+        self.by_name = {}          # normalized name -> [fields]
+        self.by_list = {}          # list_id (None for global fields) -> [fields]
+        self.by_entity_type = {}   # entity_type -> [fields]
+        self.options = {}          # field_id -> {normalized option text: option}
+        self.option_ids = {}       # field_id -> {option id: option}
+        self.lists = {}
+        for list_ in lists:
+            list_ = as_dict(list_)
+            self.lists[list_["id"]] = list_
+            for field in list_.get("fields") or ():
+                self._add(dict(field, list_id=field.get("list_id", list_["id"])))
+        for field in fields:
+            self._add(as_dict(field))
+
+    def _add(self, field: dict):
+        field_id = field["id"]
+        if field_id in self.by_id:
+            # Seen through get_list already; /fields has the fuller record
+            old = self.by_id[field_id]
+            for group in (self.by_name.get(normalize_name(old.get("name"))), self.by_list.get(old.get("list_id")), self.by_entity_type.get(old.get("entity_type"))):
+                if group is not None and old in group:
+                    group.remove(old)
+        self.by_id[field_id] = field
+        self.by_name.setdefault(normalize_name(field.get("name")), []).append(field)
+        self.by_list.setdefault(field.get("list_id"), []).append(field)
+        if field.get("entity_type") is not None:
+            self.by_entity_type.setdefault(field["entity_type"], []).append(field)
+        options = field.get("dropdown_options") or ()
+        self.options[field_id] = {normalize_name(option.get("text")): option for option in options}
+        self.option_ids[field_id] = {option["id"]: option for option in options}
+
+
+class FieldRegistry:
+    """
+    Field metadata indexed by ID, name, list and entity type, with dropdown option text -> option.
+
+    Loaded in one go from list_fields (plus get_list for `list_ids`), then answered from memory.
+    Lookups reload lazily once the data is older than `max_age` seconds, and a miss (a field or
+    option created since) triggers at most one reload per `min_refresh_interval` seconds. The
+    client invalidates it when it creates or deletes a field. Without a `client` it only serves
+    what load() was given.
+
+    The field value write paths use it to accept field names and dropdown option text:
+
+        client.build_field_registry()
+        client.set_field_values(opp_id, {"Status": "Identified", "Fund": "Data Ventures II"}, entity_type=8)
+    """
+
+    def __init__(self, client=None, list_ids=(), max_age: float = 3600.0, min_refresh_interval: float = 60.0, clock=time.monotonic):
+        self.client = client
+        self.list_ids = list(list_ids)
+        self.max_age = max_age
+        self.min_refresh_interval = min_refresh_interval
+        self.clock = clock
+        self.loaded_at = None
+        self.refreshes = 0
+        self._snapshot = _Snapshot()
+        self._lock = threading.Lock()
+
+    # ---------- Loading ----------
+
+    def load(self, fields, lists=()):
+        """Replace the registry's contents with `fields` (list_fields records) and `lists` (get_list records)."""
+        self._snapshot = _Snapshot(fields, lists)
+        self.loaded_at = self.clock()
+        self.refreshes += 1
+
+    def refresh(self):
+        if self.client is None:
+            raise ValueError("FieldRegistry has no client to refresh from")
+        with self._lock:
+            self._reload()
+
+    def _reload(self):
+        fields = _all_fields(self.client)
+        self.load(fields, [self.client.get_list(list_id) for list_id in self.list_ids])
+
+    def invalidate(self):
+        self.loaded_at = None
+
+    @property
+    def stale(self) -> bool:
+        return self.loaded_at is None or self.clock() - self.loaded_at > self.max_age
+
+    @property
+    def refresh_allowed(self) -> bool:
+        """Whether a lookup miss may reload now (min_refresh_interval has passed since the last load)."""
+        return self.loaded_at is None or self.clock() - self.loaded_at >= self.min_refresh_interval
+
+    def _current(self) -> _Snapshot:
+        if self.client is not None and self.stale:
+            with self._lock:
+                # Another thread may have reloaded while this one waited
+                if self.stale:
+                    self._reload()
+        return self._snapshot
+
+    def _refresh_after_miss(self) -> bool:
+        if self.client is None:
+            return False
+        with self._lock:
+            if not self.refresh_allowed:
+                return False
+            self._reload()
+        return True
+
+    # ---------- Fields ----------
+
+    @property
+    def lists(self) -> dict:
+        """{list_id: get_list record} for the registry's list_ids."""
+        return self._current().lists
+
+    def fields(self, list_id=None, entity_type: int = None) -> list:
+        """Fields of a list (or all fields when list_id is None), optionally of one entity type."""
+        snapshot = self._current()
+        fields = snapshot.by_list.get(list_id, []) if list_id is not None else list(snapshot.by_id.values())
+        if entity_type is not None:
+            fields = [field for field in fields if field.get("entity_type") == entity_type]
+        return list(fields)
+
+    def _find(self, snapshot: _Snapshot, field, list_id):
+        if isinstance(field, int):
+            return [snapshot.by_id[field]] if field in snapshot.by_id else []
+        matches = snapshot.by_name.get(normalize_name(field), [])
+        if list_id is not None:
+            # A list's own fields win over global fields of the same name
+            own = [f for f in matches if f.get("list_id") == list_id]
+            matches = own or [f for f in matches if f.get("list_id") is None]
+        return matches
+
+    def field(self, field, list_id: int = None) -> dict:
+        """The field with ID or name `field` (names are matched case-insensitively)."""
+        matches = self._find(self._current(), field, list_id)
+        if not matches and self._refresh_after_miss():
+            matches = self._find(self._snapshot, field, list_id)
+        if not matches:
+            raise ValueError(f"Unknown field: {field!r}" + (f" on list {list_id}" if list_id is not None else ""))
+        if len(matches) > 1:
+            raise ValueError(f"Ambiguous field name {field!r}: fields {sorted(f['id'] for f in matches)}; pass list_id or the field ID")
+        return matches[0]
+
+    def field_id(self, field, list_id: int = None) -> int:
+        return field if isinstance(field, int) else self.field(field, list_id)["id"]
+
+    # ---------- Dropdown options ----------
+
+    def option(self, field, value, list_id: int = None) -> dict:
+        """The dropdown option of `field` with text (case-insensitive) or ID `value`."""
+        field = self.field(field, list_id) if not isinstance(field, dict) else field
+        option = self._find_option(self._snapshot, field["id"], value)
+        if option is None and self._refresh_after_miss():
+            option = self._find_option(self._snapshot, field["id"], value)
+        if option is None:
+            raise ValueError(f"Unknown option {value!r} for field {field.get('name')!r} ({field['id']})")
+        return option
+
+    @staticmethod
+    def _find_option(snapshot: _Snapshot, field_id: int, value):
+        if isinstance(value, int):
+            return snapshot.option_ids.get(field_id, {}).get(value)
+        return snapshot.options.get(field_id, {}).get(normalize_name(value))
+
+    def option_id(self, field, text: str, list_id: int = None) -> int:
+        return self.option(field, text, list_id)["id"]
+
+    # ---------- Write path ----------
+
+    def resolve(self, field, value, list_id: int = None, person_index=None, organization_index=None):
+        """
+        (field_id, value) ready to write: a field name becomes its ID and the value is validated and
+        encoded for the field's value_type (see affinity.coercion; dropdown option text or ID becomes
+        what the API expects, emails and domains become IDs through the indexes). Raises
+        CoercionError for a bad value. Field IDs the registry doesn't know pass through untouched.
+        """
+        try:
+            field = self.field(field, list_id)
+        except ValueError:
+            if isinstance(field, int):
+                return field, value
+            raise
+        return field["id"], ValueEncoder(self, person_index, organization_index).encode(field, value)
+
+    def resolve_values(self, values: dict, list_id: int = None, person_index=None, organization_index=None) -> dict:
+        """resolve() for each item of a {field: value} mapping; the CoercionError lists every bad value."""
+        report = coerce_field_values(self, [values], list_id, person_index, organization_index)
+        report.raise_for_rejects()
+        return report.rows[0]
+
+
+def _all_fields(client, list_id: int = None) -> list:
+    """Every field (or only `list_id`'s own fields), following next_page_token when /fields answers with pages."""
+    fields = []
+    token = None
+    while True:
+        page = client.list_fields(list_id=list_id, page_token=token)
+        if isinstance(page, list):
+            fields.extend(page)
+            break
+        fields.extend(page.get("fields", []))
+        token = page.get("next_page_token")
+        if not token:
+            break
+    if list_id is not None:
+        fields = [field for field in fields if as_dict(field).get("list_id") == list_id]
+    return fields
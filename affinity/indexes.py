@@ -0,0 +1,198 @@
+# affinity/indexes.py
+
+import re
+import threading
+
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_domain(value: str) -> str:
+    """
+    Reduce a domain, URL or email address to a bare lowercase host:
+    "https://www.Acme.com/about" -> "acme.com", "ada@acme.com" -> "acme.com".
+    """
+    if not value:
+        return ""
+    host = value.strip().lower()
+    if "://" in host:
+        host = host.split("://", 1)[1]
+    host = host.split("/", 1)[0].split("?", 1)[0]
+    host = host.rsplit("@", 1)[-1].split(":", 1)[0].rstrip(".")
+    if host.startswith("www."):
+        host = host[4:]
+    return host
+
+
+def normalize_name(value: str) -> str:
+    return _SPACES.sub(" ", value or "").strip().casefold()
+
+
+class OrganizationIndex:
+    """
+    In-memory hash maps of organizations by ID, normalized domain and normalized name.
+
+    Build it once from list_all_organizations (client.build_organization_index()) and look up
+    thousands of domains locally instead of one list_organizations(term=...) search each.
+    The client keeps it current on create/update/delete_organization, and webhooks.apply_to_client
+    applies organization events to it.
+    """
+
+    def __init__(self, organizations=()):
+        self._by_id = {}
+        self._by_domain = {}
+        self._by_name = {}
+        self._lock = threading.Lock()
+        self.add_many(organizations)
+
+    def __len__(self):
+        return len(self._by_id)
+
+    def __contains__(self, org_id):
+        return org_id in self._by_id
+
+    @staticmethod
+    def _domains(org: dict) -> set:
+        domains = set(org.get("domains") or [])
+        if org.get("domain"):
+            domains.add(org["domain"])
+        return {normalize_domain(d) for d in domains} - {""}
+
+    def _remove(self, org_id: int):
+        old = self._by_id.pop(org_id, None)
+        if old is None:
+            return
+        for domain in self._domains(old):
+            if self._by_domain.get(domain) == org_id:
+                del self._by_domain[domain]
+        ids = self._by_name.get(normalize_name(old.get("name")))
+        if ids is not None:
+            ids.discard(org_id)
+            if not ids:
+                del self._by_name[normalize_name(old.get("name"))]
+
+    def _add(self, org: dict):
+        org_id = org["id"]
+        self._remove(org_id)
+        self._by_id[org_id] = org
+        for domain in self._domains(org):
+            self._by_domain[domain] = org_id
+        name = normalize_name(org.get("name"))
+        if name:
+            self._by_name.setdefault(name, set()).add(org_id)
+
+    def add(self, org: dict):
+        """Insert or replace an organization record."""
+        with self._lock:
+            self._add(org)
+
+    def add_many(self, organizations):
+        with self._lock:
+            for org in organizations:
+                self._add(org)
+
+    def remove(self, org_id: int):
+        with self._lock:
+            self._remove(org_id)
+
+    def clear(self):
+        with self._lock:
+            self._by_id.clear()
+            self._by_domain.clear()
+            self._by_name.clear()
+
+    def get(self, org_id: int):
+        return self._by_id.get(org_id)
+
+    def by_domain(self, domain: str):
+        """The organization owning `domain` (a domain, URL or email address), or None."""
+        org_id = self._by_domain.get(normalize_domain(domain))
+        return self._by_id.get(org_id) if org_id is not None else None
+
+    def by_name(self, name: str) -> list:
+        """Organizations whose name matches case- and whitespace-insensitively."""
+        with self._lock:
+            ids = sorted(self._by_name.get(normalize_name(name), ()))
+        return [self._by_id[org_id] for org_id in ids]
+
+    def match_domains(self, domains) -> dict:
+        """Map each input domain to its organization (None when unknown)."""
+        return {domain: self.by_domain(domain) for domain in domains}
+
+
+def normalize_email(value: str) -> str:
+    return (value or "").strip().lower()
+
+
+def emails_of(person: dict) -> set:
+    """Normalized email addresses of a person record."""
+    emails = set(person.get("emails") or [])
+    if person.get("primary_email"):
+        emails.add(person["primary_email"])
+    return {normalize_email(e) for e in emails} - {""}
+
+
+class PersonIndex:
+    """
+    In-memory hash maps of persons by ID and normalized email address.
+
+    Build it once from list_all_persons (client.build_person_index()); client.resolve_emails()
+    answers from it and only searches the API for misses. The client keeps it current on
+    create/update/delete_person, and webhooks.apply_to_client applies person events to it.
+    """
+
+    def __init__(self, persons=()):
+        self._by_id = {}
+        self._by_email = {}
+        self._lock = threading.Lock()
+        self.add_many(persons)
+
+    def __len__(self):
+        return len(self._by_id)
+
+    def __contains__(self, person_id):
+        return person_id in self._by_id
+
+    def _remove(self, person_id: int):
+        old = self._by_id.pop(person_id, None)
+        if old is None:
+            return
+        for email in emails_of(old):
+            if self._by_email.get(email) == person_id:
+                del self._by_email[email]
+
+    def _add(self, person: dict):
+        person_id = person["id"]
+        self._remove(person_id)
+        self._by_id[person_id] = person
+        for email in emails_of(person):
+            self._by_email[email] = person_id
+
+    def add(self, person: dict):
+        """Insert or replace a person record."""
+        with self._lock:
+            self._add(person)
+
+    def add_many(self, persons):
+        with self._lock:
+            for person in persons:
+                self._add(person)
+
+    def remove(self, person_id: int):
+        with self._lock:
+            self._remove(person_id)
+
+    def clear(self):
+        with self._lock:
+            self._by_id.clear()
+            self._by_email.clear()
+
+    def get(self, person_id: int):
+        return self._by_id.get(person_id)
+
+    def by_email(self, email: str):
+        person_id = self._by_email.get(normalize_email(email))
+        return self._by_id.get(person_id) if person_id is not None else None
+
+    def resolve(self, emails) -> dict:
+        """Map each input email to its person (None when not in the index)."""
+        return {email: self.by_email(email) for email in emails}
@@ -0,0 +1,275 @@
+# affinity/instrumentation.py
+
+import bisect
+import json
+import re
+import threading
+import time
+
+from affinity.rate_limit import _header_int
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_ID_SEGMENT = re.compile(r"/\d+(?=/|$)")
+
+
+def route_of(path: str) -> str:
+    """Path with IDs replaced by {id}, e.g. /lists/{id}/list-entries, so calls group per endpoint."""
+    return _ID_SEGMENT.sub("/{id}", path)
+
+
+class RequestCall:
+    """
+    One client API call as seen by hooks: created before the first attempt, completed after
+    the last one (retries included). `context` is free for hooks to keep per-call state in.
+    """
+
+    __slots__ = ("method", "path", "route", "started", "seconds", "retries", "status_code", "error",
+                 "request_bytes", "response_bytes", "rate_limit_remaining", "context")
+
+    def __init__(self, method: str, path: str, data=None):
+        self.method = method
+        self.path = path
+        self.route = route_of(path)
+        self.request_bytes = len(json.dumps(data).encode()) if data is not None else 0
+        self.started = time.perf_counter()
+        self.seconds = None
+        self.retries = 0
+        self.status_code = None
+        self.error = None
+        self.response_bytes = None
+        self.rate_limit_remaining = None
+        self.context = {}
+
+    @property
+    def endpoint(self) -> str:
+        return f"{self.method} {self.route}"
+
+    def finish(self, response=None, error: Exception = None, stream: bool = False):
+        self.seconds = time.perf_counter() - self.started
+        self.error = error
+        if error is not None:
+            self.status_code = getattr(error, "status_code", None)
+        if response is not None:
+            self.status_code = response.status_code
+            self.response_bytes = _header_int(response.headers, "Content-Length")
+            if self.response_bytes is None and not stream:
+                # Chunked response; the body is already in memory unless it is being streamed
+                self.response_bytes = len(response.content)
+            self.rate_limit_remaining = _header_int(response.headers, "X-Ratelimit-Limit-User-Remaining")
+
+    def __repr__(self):
+        return f"RequestCall({self.endpoint!r}, status_code={self.status_code}, seconds={self.seconds})"
+
+
+class Hook:
+    """Base class for client hooks; override either method. Exceptions raised by hooks propagate."""
+
+    def before_request(self, call: RequestCall):
+        pass
+
+    def after_request(self, call: RequestCall):
+        pass
+
+
+class _Histogram:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)  # last bucket is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float):
+        """Estimate like Prometheus' histogram_quantile: linear within the bucket holding rank q."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            if seen + bucket_count >= rank and bucket_count:
+                if i == len(LATENCY_BUCKETS):
+                    return LATENCY_BUCKETS[-1]
+                lower = LATENCY_BUCKETS[i - 1] if i else 0.0
+                return lower + (LATENCY_BUCKETS[i] - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return LATENCY_BUCKETS[-1]
+
+
+class _EndpointStats:
+    __slots__ = ("latency", "statuses", "errors", "retries", "request_bytes", "response_bytes")
+
+    def __init__(self):
+        self.latency = _Histogram()
+        self.statuses = {}
+        self.errors = 0
+        self.retries = 0
+        self.request_bytes = 0
+        self.response_bytes = 0
+
+
+class MetricsCollector(Hook):
+    """
+    Aggregates calls per endpoint (method + route): a latency histogram, status code counts,
+    errors, retries and bytes sent/received, plus the latest rate-limit headroom.
+
+        metrics = MetricsCollector()
+        client = AffinityClient(api_key="...", hooks=[metrics])
+        metrics.quantile("GET /field-values", 0.99)
+        metrics.prometheus_text()
+    """
+
+    def __init__(self, namespace: str = "affinity_client"):
+        self.namespace = namespace
+        self.endpoints = {}
+        self.rate_limit_remaining = None
+        self._lock = threading.Lock()
+
+    def after_request(self, call: RequestCall):
+        with self._lock:
+            stats = self.endpoints.get(call.endpoint)
+            if stats is None:
+                stats = self.endpoints[call.endpoint] = _EndpointStats()
+            stats.latency.observe(call.seconds)
+            status = str(call.status_code) if call.status_code is not None else "error"
+            stats.statuses[status] = stats.statuses.get(status, 0) + 1
+            if call.error is not None:
+                stats.errors += 1
+            stats.retries += call.retries
+            stats.request_bytes += call.request_bytes
+            stats.response_bytes += call.response_bytes or 0
+            if call.rate_limit_remaining is not None:
+                self.rate_limit_remaining = call.rate_limit_remaining
+
+    def quantile(self, endpoint: str, q: float):
+        """Estimated latency quantile (seconds) of an endpoint, e.g. quantile("GET /organizations/{id}", 0.99)."""
+        with self._lock:
+            stats = self.endpoints.get(endpoint)
+            return stats.latency.quantile(q) if stats is not None else None
+
+    def snapshot(self) -> dict:
+        """Plain-dict summary per endpoint: count, errors, retries, statuses, bytes, mean/p50/p99."""
+        with self._lock:
+            return {
+                endpoint: {
+                    "count": stats.latency.count,
+                    "errors": stats.errors,
+                    "retries": stats.retries,
+                    "statuses": dict(stats.statuses),
+                    "request_bytes": stats.request_bytes,
+                    "response_bytes": stats.response_bytes,
+                    "mean": stats.latency.sum / stats.latency.count,
+                    "p50": stats.latency.quantile(0.5),
+                    "p99": stats.latency.quantile(0.99),
+                }
+                for endpoint, stats in self.endpoints.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self.endpoints = {}
+            self.rate_limit_remaining = None
+
+    def prometheus_text(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        ns = self.namespace
+        lines = [
+            f"# HELP {ns}_request_duration_seconds Latency of API calls, retries included.",
+            f"# TYPE {ns}_request_duration_seconds histogram",
+        ]
+        with self._lock:
+            endpoints = sorted(self.endpoints.items())
+            for endpoint, stats in endpoints:
+                labels = _labels(endpoint)
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS + (None,), stats.latency.counts):
+                    cumulative += count
+                    le = "+Inf" if bound is None else repr(bound)
+                    lines.append(f'{ns}_request_duration_seconds_bucket{{{labels},le="{le}"}} {cumulative}')
+                lines.append(f"{ns}_request_duration_seconds_sum{{{labels}}} {stats.latency.sum}")
+                lines.append(f"{ns}_request_duration_seconds_count{{{labels}}} {stats.latency.count}")
+
+            lines += [f"# HELP {ns}_responses_total API calls by final status code.", f"# TYPE {ns}_responses_total counter"]
+            for endpoint, stats in endpoints:
+                for status, count in sorted(stats.statuses.items()):
+                    lines.append(f'{ns}_responses_total{{{_labels(endpoint)},status="{status}"}} {count}')
+
+            for name, attribute, help_text in (
+                ("errors_total", "errors", "API calls that raised."),
+                ("retries_total", "retries", "Retried attempts."),
+                ("request_bytes_total", "request_bytes", "JSON request body bytes sent."),
+                ("response_bytes_total", "response_bytes", "Response body bytes received."),
+            ):
+                lines += [f"# HELP {ns}_{name} {help_text}", f"# TYPE {ns}_{name} counter"]
+                for endpoint, stats in endpoints:
+                    lines.append(f"{ns}_{name}{{{_labels(endpoint)}}} {getattr(stats, attribute)}")
+
+            if self.rate_limit_remaining is not None:
+                lines += [
+                    f"# HELP {ns}_rate_limit_remaining Requests left in the current per-key rate-limit window.",
+                    f"# TYPE {ns}_rate_limit_remaining gauge",
+                    f"{ns}_rate_limit_remaining {self.rate_limit_remaining}",
+                ]
+        return "\n".join(lines) + "\n"
+
+
+def _labels(endpoint: str) -> str:
+    method, route = endpoint.split(" ", 1)
+    return f'method="{method}",route="{route}"'
+
+
+def metrics_app(collector: MetricsCollector):
+    """WSGI app serving `collector.prometheus_text()`, for a Prometheus scrape target."""
+    def app(environ, start_response):
+        body = collector.prometheus_text().encode()
+        start_response("200 OK", [("Content-Type", "text/plain; version=0.0.4; charset=utf-8"), ("Content-Length", str(len(body)))])
+        return [body]
+    return app
+
+
+class OpenTelemetryHook(Hook):
+    """
+    Records one OpenTelemetry CLIENT span per API call (`pip install affinity-crm-python-client[otel]`).
+
+    Spans are named "<METHOD> <route>" and carry the HTTP method, route, status code, retry
+    count and byte counts; failed calls are marked as errors. Uses the global tracer provider
+    unless a `tracer` is given.
+    """
+
+    def __init__(self, tracer=None):
+        try:
+            from opentelemetry import trace
+        except ImportError:
+            raise ImportError("OpenTelemetryHook requires opentelemetry-api: pip install affinity-crm-python-client[otel]")
+        self._trace = trace
+        self.tracer = tracer if tracer is not None else trace.get_tracer("affinity")
+
+    def before_request(self, call: RequestCall):
+        call.context["span"] = self.tracer.start_span(
+            call.endpoint,
+            kind=self._trace.SpanKind.CLIENT,
+            attributes={"http.request.method": call.method, "http.route": call.route, "url.path": call.path},
+        )
+
+    def after_request(self, call: RequestCall):
+        span = call.context.pop("span", None)
+        if span is None:
+            return
+        if call.status_code is not None:
+            span.set_attribute("http.response.status_code", call.status_code)
+        span.set_attribute("affinity.retries", call.retries)
+        span.set_attribute("http.request.body.size", call.request_bytes)
+        if call.response_bytes is not None:
+            span.set_attribute("http.response.body.size", call.response_bytes)
+        if call.rate_limit_remaining is not None:
+            span.set_attribute("affinity.rate_limit.remaining", call.rate_limit_remaining)
+        if call.error is not None:
+            span.record_exception(call.error)
+            span.set_status(self._trace.Status(self._trace.StatusCode.ERROR, str(call.error)))
+        span.end()
@@ -0,0 +1,413 @@
+# affinity/mock_server.py
+
+import json
+import math
+import random
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from affinity.instrumentation import route_of
+
+# ID ranges per entity type, so an ID never exists under two types (like in Affinity)
+PERSON_IDS = 1_000_000
+ORGANIZATION_IDS = 2_000_000
+OPPORTUNITY_IDS = 3_000_000
+LIST_ENTRY_IDS = 4_000_000
+FIELD_VALUE_IDS = 5_000_000
+FIELD_VALUE_CHANGE_IDS = 6_000_000
+
+# action_type of a field value change
+CHANGE_CREATED = 0
+CHANGE_DELETED = 1
+CHANGE_UPDATED = 2
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+ID_BASES = {"persons": PERSON_IDS, "organizations": ORGANIZATION_IDS, "opportunities": OPPORTUNITY_IDS, "list_entries": LIST_ENTRY_IDS, "field_values": FIELD_VALUE_IDS, "field_value_changes": FIELD_VALUE_CHANGE_IDS}
+
+ENTITY_PARAMS = {"person_id": "persons", "organization_id": "organizations", "opportunity_id": "opportunities", "list_entry_id": "list_entries"}
+
+
+def generate_data(persons: int = 0, organizations: int = 0, opportunities: int = 0, list_entries: int = 0, fields: int = 0, field_values: int = 0, seed: int = 0) -> dict:
+    """
+    Deterministic synthetic workspace: `list_entries` organizations on one list, that list
+    having `fields` text fields, and `field_values` values per list entry.
+    """
+    rng = random.Random(seed)
+    data = {"persons": [], "organizations": [], "opportunities": [], "lists": [], "list_entries": [], "fields": [], "field_values": []}
+    for i in range(persons):
+        email = f"person{i}@example{i % 97}.com"
+        data["persons"].append({"id": PERSON_IDS + i, "type": 0, "first_name": f"First{i}", "last_name": f"Last{i}", "primary_email": email, "emails": [email], "organization_ids": []})
+    for i in range(organizations):
+        data["organizations"].append({"id": ORGANIZATION_IDS + i, "name": f"Company {i}", "domain": f"company{i}.com", "domains": [f"company{i}.com"], "global": False})
+    for i in range(opportunities):
+        data["opportunities"].append({"id": OPPORTUNITY_IDS + i, "name": f"Deal {i}", "person_ids": [], "organization_ids": []})
+    if list_entries or fields:
+        data["lists"].append({"id": 10, "type": 1, "name": "Pipeline", "public": True, "owner_id": 1, "list_size": list_entries})
+    for i in range(fields):
+        data["fields"].append({"id": 100 + i, "name": f"Field {i}", "list_id": 10, "entity_type": 1, "value_type": 6, "allows_multiple": False, "dropdown_options": []})
+    for i, org in enumerate(data["organizations"][:list_entries]):
+        entry_id = LIST_ENTRY_IDS + i
+        data["list_entries"].append({"id": entry_id, "list_id": 10, "creator_id": 1, "entity_id": org["id"], "entity_type": 1, "created_at": "2024-01-01T00:00:00.000Z", "entity": org})
+        for field in rng.sample(data["fields"], min(field_values, fields)):
+            data["field_values"].append({
+                "id": FIELD_VALUE_IDS + len(data["field_values"]), "field_id": field["id"], "entity_id": org["id"],
+                "entity_type": 1, "list_entry_id": entry_id, "value": f"value {rng.randrange(1000)}",
+            })
+    return data
+
+
+class _NotFound(Exception):
+    pass
+
+
+class MockAffinityServer:
+    """
+    In-memory Affinity v1 API on localhost, for offline tests and benchmarks.
+
+    Serves persons, organizations and opportunities (paged, with `term` search), lists, list
+    entries (paged when page_size is sent), fields and field values (404 for an ID of the wrong
+    entity type, as the real API does, so entity-type probing is exercised), the field value
+    changes made through it, plus /rate-limit and /auth/whoami. Every request waits `latency` seconds. Throttling comes in two forms: at most
+    `rate_limit` requests per `rate_window` seconds, and deterministically every
+    `throttle_every`-th request; both answer 429 with Retry-After.
+
+        with MockAffinityServer(generate_data(organizations=1000), latency=0.005) as server:
+            client = server.client()
+            orgs = list(client.list_all_organizations(page_size=500))
+    """
+
+    def __init__(self, data: dict = None, latency: float = 0.0, rate_limit: int = None, rate_window: float = 60.0, throttle_every: int = None, retry_after: float = 0.0):
+        data = data or {}
+        self.tables = {name: {row["id"]: row for row in data.get(name, ())} for name in ("persons", "organizations", "opportunities", "lists", "list_entries", "fields", "field_values", "field_value_changes")}
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.rate_window = rate_window
+        self.throttle_every = throttle_every
+        self.retry_after = retry_after
+        self.requests = 0
+        self.throttled = 0
+        self.calls = {}  # "METHOD /route" -> count
+        self._window_started = time.monotonic()
+        self._window_requests = 0
+        self._next_id = {name: max(table, default=ID_BASES.get(name, 1) - 1) + 1 for name, table in self.tables.items()}
+        self._lock = threading.Lock()
+        self._server = None
+        self.url = None
+
+    # ---------- Lifecycle ----------
+
+    def start(self) -> str:
+        server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        server.daemon_threads = True
+        server.mock = self
+        threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+        self._server = server
+        self.url = f"http://127.0.0.1:{server.server_port}"
+        return self.url
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def client(self, **kwargs):
+        """AffinityClient pointed at this server."""
+        from affinity.client import AffinityClient
+        return AffinityClient(api_key=kwargs.pop("api_key", "mock"), base_url=self.url, **kwargs)
+
+    def reset_counters(self):
+        with self._lock:
+            self.requests = 0
+            self.throttled = 0
+            self.calls = {}
+
+    # ---------- Throttling ----------
+
+    def _throttle(self):
+        """Seconds to put in Retry-After if this request is throttled, else None; plus quota headers."""
+        with self._lock:
+            self.requests += 1
+            now = time.monotonic()
+            if now - self._window_started >= self.rate_window:
+                self._window_started = now
+                self._window_requests = 0
+            self._window_requests += 1
+            headers = {}
+            if self.rate_limit is not None:
+                reset = self.rate_window - (now - self._window_started)
+                headers = {
+                    "X-Ratelimit-Limit-User": str(self.rate_limit),
+                    "X-Ratelimit-Limit-User-Remaining": str(max(0, self.rate_limit - self._window_requests)),
+                    "X-Ratelimit-Limit-User-Reset": str(math.ceil(reset)),
+                }
+                if self._window_requests > self.rate_limit:
+                    self.throttled += 1
+                    return reset, headers
+            if self.throttle_every and self.requests % self.throttle_every == 0:
+                self.throttled += 1
+                return self.retry_after, headers
+            return None, headers
+
+    # ---------- Routes ----------
+
+    def handle(self, method: str, path: str, query: dict, body):
+        """(status, payload) for one request."""
+        route = route_of(path)
+        with self._lock:
+            self.calls[f"{method} {route}"] = self.calls.get(f"{method} {route}", 0) + 1
+        ids = [int(part) for part in re.findall(r"/(\d+)(?=/|$)", path)]
+        handler = _ROUTES.get((method, route))
+        if handler is None:
+            return 404, {"message": f"No route for {method} {route}"}
+        try:
+            with self._lock:
+                return 200, handler(self, ids, query, body)
+        except _NotFound as e:
+            return 404, {"message": str(e)}
+        except (KeyError, TypeError, ValueError) as e:
+            return 422, {"message": f"Invalid request: {e}"}
+
+    def _get(self, table: str, id: int) -> dict:
+        row = self.tables[table].get(id)
+        if row is None:
+            raise _NotFound(f"{table[:-1].replace('_', ' ').capitalize()} not found")
+        return row
+
+    def _insert(self, table: str, row: dict) -> dict:
+        row["id"] = self._next_id[table]
+        self._next_id[table] += 1
+        self.tables[table][row["id"]] = row
+        return row
+
+    @staticmethod
+    def _page(rows: list, query: dict, key: str) -> dict:
+        page_size = min(int(query.get("page_size", DEFAULT_PAGE_SIZE)), MAX_PAGE_SIZE)
+        offset = int(query.get("page_token") or 0)
+        end = offset + page_size
+        return {key: rows[offset:end], "next_page_token": str(end) if end < len(rows) else None}
+
+    def _search(self, table: str, query: dict, key: str, text_of) -> dict:
+        rows = list(self.tables[table].values())
+        term = (query.get("term") or "").lower()
+        if term:
+            rows = [row for row in rows if term in text_of(row).lower()]
+        return self._page(rows, query, key)
+
+    def list_persons(self, ids, query, body):
+        return self._search("persons", query, "persons", lambda p: " ".join([p.get("first_name") or "", p.get("last_name") or ""] + list(p.get("emails") or [])))
+
+    def list_organizations(self, ids, query, body):
+        return self._search("organizations", query, "organizations", lambda o: f"{o.get('name') or ''} {o.get('domain') or ''}")
+
+    def list_opportunities(self, ids, query, body):
+        return self._search("opportunities", query, "opportunities", lambda o: o.get("name") or "")
+
+    def create_person(self, ids, query, body):
+        emails = body.get("emails") or []
+        return self._insert("persons", {"type": 0, "first_name": body["first_name"], "last_name": body["last_name"], "primary_email": emails[0] if emails else None, "emails": emails, "organization_ids": body.get("organization_ids") or []})
+
+    def create_organization(self, ids, query, body):
+        domain = body.get("domain")
+        return self._insert("organizations", {"name": body["name"], "domain": domain, "domains": [domain] if domain else [], "global": False})
+
+    def create_opportunity(self, ids, query, body):
+        return self._insert("opportunities", {"name": body["name"], "person_ids": body.get("person_ids") or [], "organization_ids": body.get("organization_ids") or [], "list_id": body.get("list_id")})
+
+    def list_list_entries(self, ids, query, body):
+        self._get("lists", ids[0])
+        entries = [e for e in self.tables["list_entries"].values() if e["list_id"] == ids[0]]
+        # Like the API: a bare list unless paging was asked for
+        if "page_size" not in query and "page_token" not in query:
+            return entries
+        return self._page(entries, query, "list_entries")
+
+    def add_list_entry(self, ids, query, body):
+        self._get("lists", ids[0])
+        entity_id = body["entity_id"]
+        for table, entity_type in (("persons", 0), ("organizations", 1), ("opportunities", 8)):
+            if entity_id in self.tables[table]:
+                return self._insert("list_entries", {"list_id": ids[0], "creator_id": body.get("creator_id") or 1, "entity_id": entity_id, "entity_type": entity_type, "created_at": "2024-01-01T00:00:00.000Z", "entity": self.tables[table][entity_id]})
+        raise _NotFound("Entity not found")
+
+    def list_fields(self, ids, query, body):
+        fields = list(self.tables["fields"].values())
+        if "list_id" in query:
+            fields = [f for f in fields if f.get("list_id") == int(query["list_id"])]
+        return fields
+
+    def list_field_values(self, ids, query, body):
+        params = [name for name in ENTITY_PARAMS if name in query]
+        if len(params) != 1:
+            raise ValueError("exactly one of person_id, organization_id, opportunity_id, list_entry_id is required")
+        param = params[0]
+        entity_id = int(query[param])
+        self._get(ENTITY_PARAMS[param], entity_id)
+        key = "list_entry_id" if param == "list_entry_id" else "entity_id"
+        values = [v for v in self.tables["field_values"].values() if v.get(key) == entity_id]
+        if "field_id" in query:
+            values = [v for v in values if v["field_id"] == int(query["field_id"])]
+        return values
+
+    def create_field_value(self, ids, query, body):
+        self._get("fields", body["field_id"])
+        entity_id = body["entity_id"]
+        entity_type = next((code for table, code in (("persons", 0), ("organizations", 1), ("opportunities", 8)) if entity_id in self.tables[table]), None)
+        if entity_type is None:
+            raise _NotFound("Entity not found")
+        row = self._insert("field_values", {"field_id": body["field_id"], "entity_id": entity_id, "entity_type": entity_type, "list_entry_id": body.get("list_entry_id"), "value": body["value"]})
+        self._log_change(CHANGE_CREATED, row)
+        return row
+
+    def update_field_value(self, ids, query, body):
+        row = self._get("field_values", ids[0])
+        row["value"] = body["value"]
+        self._log_change(CHANGE_UPDATED, row)
+        return row
+
+    def delete_field_value(self, ids, query, body):
+        row = self._get("field_values", ids[0])
+        del self.tables["field_values"][ids[0]]
+        self._log_change(CHANGE_DELETED, row)
+        return {"success": True}
+
+    def _log_change(self, action_type: int, row: dict):
+        self._insert("field_value_changes", {
+            "field_id": row["field_id"], "entity_id": row["entity_id"], "list_entry_id": row.get("list_entry_id"),
+            "action_type": action_type, "value": row["value"], "changed_at": datetime.now(timezone.utc).isoformat(),
+            "changer": {"id": 1, "first_name": "Mock", "last_name": "User"},
+        })
+
+    def list_field_value_changes(self, ids, query, body):
+        changes = [c for c in self.tables["field_value_changes"].values() if c["field_id"] == int(query["field_id"])]
+        for param in ENTITY_PARAMS:
+            if param in query:
+                key = "list_entry_id" if param == "list_entry_id" else "entity_id"
+                self._get(ENTITY_PARAMS[param], int(query[param]))
+                changes = [c for c in changes if c.get(key) == int(query[param])]
+        if "action_type" in query:
+            changes = [c for c in changes if c["action_type"] == int(query["action_type"])]
+        return changes
+
+    def rate_limit_status(self, ids, query, body):
+        limit = self.rate_limit or 900
+        remaining = max(0, limit - self._window_requests)
+        return {"rate": {"api_key_per_minute": {"limit": limit, "remaining": remaining, "reset": math.ceil(self.rate_window), "used": limit - remaining}}}
+
+    def whoami(self, ids, query, body):
+        return {"tenant": {"id": 1, "name": "Mock", "subdomain": "mock"}, "user": {"id": 1, "first_name": "Mock", "last_name": "User", "email": "mock@example.com"}}
+
+
+def _read(table):
+    return lambda self, ids, query, body: self._get(table, ids[0])
+
+
+def _update(table):
+    def update(self, ids, query, body):
+        row = self._get(table, ids[0])
+        row.update({k: v for k, v in body.items() if k != "id"})
+        if table == "persons" and body.get("emails"):
+            row["primary_email"] = body["emails"][0]
+        return row
+    return update
+
+
+def _delete(table):
+    def delete(self, ids, query, body):
+        self._get(table, ids[-1])
+        del self.tables[table][ids[-1]]
+        return {"success": True}
+    return delete
+
+
+_ROUTES = {
+    ("GET", "/persons"): MockAffinityServer.list_persons,
+    ("POST", "/persons"): MockAffinityServer.create_person,
+    ("GET", "/persons/{id}"): _read("persons"),
+    ("PUT", "/persons/{id}"): _update("persons"),
+    ("DELETE", "/persons/{id}"): _delete("persons"),
+    ("GET", "/organizations"): MockAffinityServer.list_organizations,
+    ("POST", "/organizations"): MockAffinityServer.create_organization,
+    ("GET", "/organizations/{id}"): _read("organizations"),
+    ("PUT", "/organizations/{id}"): _update("organizations"),
+    ("DELETE", "/organizations/{id}"): _delete("organizations"),
+    ("GET", "/opportunities"): MockAffinityServer.list_opportunities,
+    ("POST", "/opportunities"): MockAffinityServer.create_opportunity,
+    ("GET", "/opportunities/{id}"): _read("opportunities"),
+    ("PUT", "/opportunities/{id}"): _update("opportunities"),
+    ("DELETE", "/opportunities/{id}"): _delete("opportunities"),
+    ("GET", "/lists"): lambda self, ids, query, body: list(self.tables["lists"].values()),
+    ("GET", "/lists/{id}"): _read("lists"),
+    ("GET", "/lists/{id}/list-entries"): MockAffinityServer.list_list_entries,
+    ("POST", "/lists/{id}/list-entries"): MockAffinityServer.add_list_entry,
+    ("DELETE", "/lists/{id}/list-entries/{id}"): _delete("list_entries"),
+    ("GET", "/list-entries/{id}"): _read("list_entries"),
+    ("GET", "/fields"): MockAffinityServer.list_fields,
+    ("GET", "/fields/{id}"): _read("fields"),
+    ("GET", "/field-values"): MockAffinityServer.list_field_values,
+    ("POST", "/field-values"): MockAffinityServer.create_field_value,
+    ("PUT", "/field-values/{id}"): MockAffinityServer.update_field_value,
+    ("DELETE", "/field-values/{id}"): MockAffinityServer.delete_field_value,
+    ("GET", "/field-value-changes"): MockAffinityServer.list_field_value_changes,
+    ("GET", "/rate-limit"): MockAffinityServer.rate_limit_status,
+    ("GET", "/auth/whoami"): MockAffinityServer.whoami,
+}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; without TCP_NODELAY each response stalls on delayed ACKs
+    disable_nagle_algorithm = True
+
+    def _serve(self, method: str):
+        mock = self.server.mock
+        url = urlsplit(self.path)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length)) if length else None
+
+        if mock.latency:
+            time.sleep(mock.latency)
+        retry_after, headers = mock._throttle()
+        if retry_after is not None:
+            status, payload = 429, {"message": "Too many requests"}
+            headers["Retry-After"] = str(math.ceil(retry_after))
+        else:
+            status, payload = mock.handle(method, url.path, query, body)
+
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        self._serve("GET")
+
+    def do_POST(self):
+        self._serve("POST")
+
+    def do_PUT(self):
+        self._serve("PUT")
+
+    def do_DELETE(self):
+        self._serve("DELETE")
+
+    def log_message(self, *args):
+        pass
@@ -118,7 +118,7 @@ class ListFieldValuesParams(BaseModel):
 
 class ListFieldValueChangesParams(BaseModel):
     field_id: int
-    field_value_changes_query_id: int
+    field_value_changes_query_id: Optional[int] = None
     entity_type: Optional[int] = None  # 0=person, 1=organization, 8=opportunity
     action_type: Optional[int] = None
 
@@ -187,4 +187,14 @@ class GetRelationshipStrengthsParams(BaseModel):
 class GetInteractionParams(BaseModel):
     type: str
 
-# Rate Limits and Whoami endpoints do not require parameters. 
\ No newline at end of file
+# Rate Limits and Whoami endpoints do not require parameters. 
+
+def encode_query(params: BaseModel) -> dict:
+    """Query string dict for a params model: None values dropped, booleans as "true"/"false"."""
+    query = params.model_dump(exclude_none=True)
+    for key, value in query.items():
+        if value is True:
+            query[key] = "true"
+        elif value is False:
+            query[key] = "false"
+    return query
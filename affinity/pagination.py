@@ -0,0 +1,75 @@
+# affinity/pagination.py
+
+import queue
+import threading
+
+_DONE = object()
+
+
+class _Failure:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+def _fetch_ahead(fetch_page, pages: queue.Queue, stop: threading.Event):
+    token = None
+    try:
+        while not stop.is_set():
+            data = fetch_page(token)
+            pages.put(data)
+            token = data.get("next_page_token")
+            if not token:
+                break
+    except BaseException as e:
+        pages.put(_Failure(e))
+        return
+    pages.put(_DONE)
+
+
+def iter_pages(fetch_page, lookahead: int = 0):
+    """
+    Yield the pages of a token-paginated endpoint.
+
+    Args:
+        fetch_page: Callable taking a page token (None for the first page) and returning the page dict
+        lookahead: Number of pages fetched ahead in a background thread while the caller consumes
+            the current one. 0 fetches each page only when it is needed.
+    """
+    if lookahead <= 0:
+        token = None
+        while True:
+            data = fetch_page(token)
+            yield data
+            token = data.get("next_page_token")
+            if not token:
+                break
+        return
+
+    # The queue holds at most `lookahead` pages; the worker blocks on put() once it is full
+    pages = queue.Queue(maxsize=lookahead)
+    stop = threading.Event()
+    worker = threading.Thread(target=_fetch_ahead, args=(fetch_page, pages, stop), daemon=True)
+    worker.start()
+    try:
+        while True:
+            data = pages.get()
+            if data is _DONE:
+                break
+            if isinstance(data, _Failure):
+                raise data.error
+            yield data
+    finally:
+        # Consumer stopped early: unblock the worker so it can exit
+        stop.set()
+        while worker.is_alive():
+            try:
+                pages.get(timeout=0.05)
+            except queue.Empty:
+                pass
+
+
+def iter_items(fetch_page, key: str, lookahead: int = 0):
+    """Yield the records stored under `key` in every page; see iter_pages."""
+    for data in iter_pages(fetch_page, lookahead):
+        for item in data.get(key, []):
+            yield item
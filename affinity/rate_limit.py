@@ -0,0 +1,113 @@
+# affinity/rate_limit.py
+
+import asyncio
+import threading
+import time
+
+# Affinity v1 allows 900 requests per minute per API key
+DEFAULT_LIMIT = 900
+DEFAULT_WINDOW = 60.0
+
+
+def _header_int(headers, name):
+    try:
+        return int(float(headers.get(name)))
+    except (TypeError, ValueError):
+        return None
+
+
+class RateLimiter:
+    """
+    Client-side token bucket shared by every request of a client.
+
+    The bucket holds up to `limit` tokens and refills at `limit / window` tokens per second.
+    Callers reserve a token and sleep until it is available, so bursts queue smoothly instead
+    of hitting 429s. The bucket is kept in line with the server via `seed()` (the /rate-limit
+    payload) and `update_from_headers()` (the X-Ratelimit-* response headers).
+    """
+
+    def __init__(self, limit: int = DEFAULT_LIMIT, window: float = DEFAULT_WINDOW, clock=time.monotonic, sleep=time.sleep):
+        self.limit = limit
+        self.window = window
+        self.clock = clock
+        self.sleep = sleep
+        self.tokens = float(limit)
+        self.blocked_until = 0.0
+        self.seeded = False
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    @property
+    def rate(self) -> float:
+        return self.limit / self.window
+
+    def _refill(self, now: float):
+        self.tokens = min(float(self.limit), self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self) -> float:
+        """Take one token and return how many seconds the caller must wait before sending."""
+        with self._lock:
+            now = self.clock()
+            self._refill(now)
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            return max(wait, self.blocked_until - now)
+
+    def acquire(self):
+        wait = self.reserve()
+        if wait > 0:
+            self.sleep(wait)
+
+    async def acquire_async(self):
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def _apply(self, limit, remaining, reset):
+        with self._lock:
+            now = self.clock()
+            self._refill(now)
+            if limit:
+                self.limit = limit
+            if remaining is not None:
+                self.tokens = min(self.tokens, float(remaining))
+                if remaining <= 0 and reset:
+                    self.blocked_until = max(self.blocked_until, now + reset)
+
+    def seed(self, status: dict, per_key: bool = True):
+        """
+        Initialise the bucket from a `get_rate_limit_status()` response. With per_key=False the
+        key's own per-minute quota is ignored and only the org-wide quota applies.
+        """
+        rate = status.get("rate", status)
+        per_minute = rate.get("api_key_per_minute") or {}
+        monthly = rate.get("org_monthly") or {}
+        if per_key:
+            self._apply(per_minute.get("limit"), per_minute.get("remaining"), per_minute.get("reset"))
+        # The monthly org quota only matters once it runs out
+        monthly_remaining = monthly.get("remaining")
+        if monthly_remaining is not None and monthly_remaining <= 0:
+            self._apply(None, 0, monthly.get("reset"))
+        self.seeded = True
+
+    def update_from_headers(self, headers, per_key: bool = True):
+        """
+        Track the server's view of the quota from X-Ratelimit-* response headers. With
+        per_key=False (several API keys share this bucket, each with its own quota tracked by
+        their KeyPool) the X-Ratelimit-Limit-User* headers are ignored.
+        """
+        if per_key:
+            self._apply(
+                _header_int(headers, "X-Ratelimit-Limit-User"),
+                _header_int(headers, "X-Ratelimit-Limit-User-Remaining"),
+                _header_int(headers, "X-Ratelimit-Limit-User-Reset"),
+            )
+        org_remaining = _header_int(headers, "X-Ratelimit-Limit-Org-Remaining")
+        if org_remaining is not None and org_remaining <= 0:
+            self._apply(None, 0, _header_int(headers, "X-Ratelimit-Limit-Org-Reset"))
+
+    def block_for(self, seconds: float):
+        """Hold every caller back for `seconds` (e.g. after a 429 with Retry-After)."""
+        with self._lock:
+            self.blocked_until = max(self.blocked_until, self.clock() + seconds)
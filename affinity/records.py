@@ -0,0 +1,164 @@
+# affinity/records.py
+
+import re
+
+
+class Record:
+    """
+    Compact typed view of an API response object.
+
+    Known fields live in `__slots__` (no per-instance dict) and list values are stored as tuples,
+    so a record costs a fraction of the equivalent dict and attribute access is a direct slot read. Keys the class doesn't know are
+    kept in `extra`, so to_dict() round-trips the original response. Records also support
+    `record["key"]`, `record.get("key")` and `"key" in record`, so code written against the raw
+    dicts keeps working.
+    """
+
+    __slots__ = ("extra",)
+    fields = ()
+
+    def __init__(self, **values):
+        for name in self.fields:
+            value = values.pop(name, None)
+            # Tuples are smaller than lists, and the empty tuple is a shared singleton
+            object.__setattr__(self, name, tuple(value) if type(value) is list else value)
+        object.__setattr__(self, "extra", values or None)
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        return cls(**data)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    def __getitem__(self, key):
+        if key in self.fields:
+            return getattr(self, key)
+        if self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    # A field the response didn't include and a field that was null both read as None,
+    # so both count as absent for `in` and get()
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def __contains__(self, key):
+        if key in self.fields:
+            return getattr(self, key) is not None
+        return bool(self.extra and key in self.extra)
+
+    def to_dict(self) -> dict:
+        data = {name: _plain(getattr(self, name)) for name in self.fields}
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def __eq__(self, other):
+        if not isinstance(other, Record):
+            return NotImplemented
+        return type(self) is type(other) and self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        shown = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.fields[:3])
+        return f"{type(self).__name__}({shown}, ...)"
+
+    # Records are value objects; make pickling work without a __dict__
+    def __reduce__(self):
+        return type(self).from_dict, (self.to_dict(),)
+
+
+def _plain(value):
+    if isinstance(value, Record):
+        return value.to_dict()
+    if isinstance(value, (list, tuple)):
+        return [_plain(item) for item in value]
+    return value
+
+
+def _record_class(name: str, field_names: str):
+    fields = tuple(field_names.split())
+    return type(name, (Record,), {"__slots__": fields, "fields": fields, "__module__": __name__})
+
+
+Person = _record_class("Person", """
+    id type first_name last_name primary_email emails organization_ids opportunity_ids
+    list_entries interaction_dates interactions
+""")
+Organization = _record_class("Organization", """
+    id name domain domains crunchbase_uuid global person_ids opportunity_ids
+    list_entries interaction_dates interactions
+""")
+Opportunity = _record_class("Opportunity", "id name person_ids organization_ids list_entries")
+FieldValue = _record_class("FieldValue", "id field_id entity_id entity_type list_entry_id value")
+Note = _record_class("Note", """
+    id creator_id person_ids associated_person_ids interaction_person_ids interaction_id interaction_type
+    is_meeting mentioned_person_ids organization_ids opportunity_ids parent_id content type created_at updated_at
+""")
+Interaction = _record_class("Interaction", """
+    id type date subject start_time end_time manual_creation person_ids persons attendees notes direction
+""")
+
+# entity_type code of a list entry -> record class of its `entity`
+ENTITY_RECORDS = {0: Person, 1: Organization, 8: Opportunity}
+
+
+class ListEntry(Record):
+    __slots__ = ("id", "list_id", "creator_id", "entity_id", "entity_type", "created_at", "entity")
+    fields = __slots__
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        entity = data.get("entity")
+        record_class = ENTITY_RECORDS.get(data.get("entity_type"))
+        if isinstance(entity, dict) and record_class is not None:
+            data = dict(data, entity=record_class.from_dict(entity))
+        return cls(**data)
+
+
+# API path pattern -> record class, and the key holding the records in paginated responses
+RECORD_PATHS = [
+    (re.compile(r"^/persons(/\d+)?$"), Person, "persons"),
+    (re.compile(r"^/organizations(/\d+)?$"), Organization, "organizations"),
+    (re.compile(r"^/opportunities(/\d+)?$"), Opportunity, "opportunities"),
+    (re.compile(r"^/lists/\d+/list-entries(/\d+)?$"), ListEntry, "list_entries"),
+    (re.compile(r"^/field-values(/\d+)?$"), FieldValue, "field_values"),
+    (re.compile(r"^/notes(/\d+)?$"), Note, "notes"),
+    # /interactions pages are keyed by interaction type ("emails", "events", ...)
+    (re.compile(r"^/interactions(/\d+)?$"), Interaction, None),
+]
+
+
+def _convert(record_class, data):
+    if isinstance(data, dict) and "id" in data:
+        return record_class.from_dict(data)
+    return data
+
+
+def record_class_for(path: str):
+    """(record class, page key) for responses from `path`, or (None, None)."""
+    for pattern, record_class, key in RECORD_PATHS:
+        if pattern.match(path):
+            return record_class, key
+    return None, None
+
+
+def to_records(path: str, data):
+    """Convert a response body from `path` into records; anything unrecognized is returned as is."""
+    record_class, key = record_class_for(path)
+    if record_class is None:
+        return data
+    if isinstance(data, list):
+        return [_convert(record_class, item) for item in data]
+    if not isinstance(data, dict):
+        return data
+    if key is not None and isinstance(data.get(key), list):
+        return dict(data, **{key: [_convert(record_class, item) for item in data[key]]})
+    if key is None and "id" not in data:
+        return {k: [_convert(record_class, item) for item in v] if isinstance(v, list) else v for k, v in data.items()}
+    return _convert(record_class, data)
+
+
+def as_dict(value):
+    """Plain-dict form of a record (or list of records); dicts and other values pass through."""
+    return _plain(value)
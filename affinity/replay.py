@@ -0,0 +1,145 @@
+# affinity/replay.py
+
+import json
+import threading
+from collections import deque
+from urllib.parse import urlsplit
+
+from requests.structures import CaseInsensitiveDict
+
+from affinity.transport import RequestsTransport
+
+# Response headers not worth keeping in a cassette
+_SKIPPED_HEADERS = {"set-cookie", "date", "connection", "keep-alive", "transfer-encoding", "content-encoding"}
+
+
+class ReplayMissError(LookupError):
+    """Raised by ReplayTransport for a request the cassette has no (more) responses for."""
+
+
+def _query(params) -> list:
+    pairs = []
+    for name, value in sorted((params or {}).items()):
+        for item in value if isinstance(value, (list, tuple)) else [value]:
+            pairs.append([name, str(item)])
+    return pairs
+
+
+def request_key(method: str, url: str, params=None, json_body=None) -> str:
+    """
+    What identifies a request in a cassette: method, URL path, sorted query and JSON body.
+    The host is left out so a cassette recorded against the API replays against any base URL.
+    """
+    return json.dumps([method.upper(), urlsplit(url).path, _query(params), json_body], sort_keys=True)
+
+
+class CannedResponse:
+    """A recorded response, with the parts of the requests.Response interface the client uses."""
+
+    def __init__(self, status_code: int, headers: dict, content: bytes):
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers)
+        self.content = content
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8")
+
+    def json(self):
+        return json.loads(self.content)
+
+    def iter_content(self, chunk_size: int = None):
+        chunk_size = chunk_size or len(self.content) or 1
+        for start in range(0, len(self.content), chunk_size):
+            yield self.content[start:start + chunk_size]
+
+    def close(self):
+        pass
+
+
+class RecordingTransport:
+    """
+    Sends requests through `transport` (default RequestsTransport()) and appends every
+    request/response pair to the JSONL cassette at `path`, for ReplayTransport to serve later.
+    Request headers, and with them the API key, are never written.
+    """
+
+    def __init__(self, path: str, transport=None):
+        self.transport = transport if transport is not None else RequestsTransport()
+        self.errors = self.transport.errors
+        self.path = path
+        self._file = open(path, "a")
+        self._lock = threading.Lock()
+
+    def request(self, method: str, url: str, auth=None, params=None, json=None, headers=None, stream: bool = False):
+        response = self.transport.request(method, url, auth=auth, params=params, json=json, headers=headers, stream=stream)
+        try:
+            content = response.content
+        finally:
+            response.close()
+        kept = {name: value for name, value in response.headers.items() if name.lower() not in _SKIPPED_HEADERS}
+        entry = {
+            "request": request_key(method, url, params, json),
+            "status": response.status_code,
+            "headers": kept,
+            "body": content.decode("utf-8"),
+        }
+        self._write(entry)
+        return CannedResponse(response.status_code, kept, content)
+
+    def _write(self, entry: dict):
+        with self._lock:
+            self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self._file.flush()
+
+    def close(self):
+        self._file.close()
+        self.transport.close()
+
+
+class ReplayTransport:
+    """
+    Serves responses from a cassette written by RecordingTransport, without any network access.
+
+    Requests are matched on method, path, query and JSON body; identical requests get their
+    recorded responses in recording order, so retries and repeated reads replay exactly. An
+    unrecorded request raises ReplayMissError. With strict=False, a request whose recorded
+    responses are used up gets the last one again instead.
+    """
+
+    errors = ()
+
+    def __init__(self, path: str, strict: bool = True):
+        self.strict = strict
+        self._responses = {}
+        self._last = {}
+        self._lock = threading.Lock()
+        with open(path) as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    self._responses.setdefault(entry["request"], deque()).append(entry)
+
+    def request(self, method: str, url: str, auth=None, params=None, json=None, headers=None, stream: bool = False):
+        key = request_key(method, url, params, json)
+        with self._lock:
+            queue = self._responses.get(key)
+            if queue:
+                entry = self._last[key] = queue.popleft()
+            elif not self.strict and key in self._last:
+                entry = self._last[key]
+            else:
+                raise ReplayMissError(f"No recorded response for {method} {urlsplit(url).path} {_query(params)}")
+        return CannedResponse(entry["status"], entry["headers"], entry["body"].encode("utf-8"))
+
+    def remaining(self) -> int:
+        """Recorded responses not replayed yet."""
+        with self._lock:
+            return sum(len(queue) for queue in self._responses.values())
+
+    def close(self):
+        pass
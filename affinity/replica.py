@@ -0,0 +1,394 @@
+# affinity/replica.py
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+from affinity.changes import _changes_of
+from affinity.client import _field_values_of
+from affinity.exceptions import AffinityAPIError
+from affinity.field_registry import _all_fields
+from affinity.records import as_dict
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS persons (
+    id INTEGER PRIMARY KEY, first_name TEXT, last_name TEXT, primary_email TEXT, data TEXT NOT NULL, hash TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS person_emails (
+    person_id INTEGER NOT NULL, email TEXT NOT NULL, PRIMARY KEY (person_id, email));
+CREATE INDEX IF NOT EXISTS person_emails_email ON person_emails (email);
+CREATE TABLE IF NOT EXISTS organizations (
+    id INTEGER PRIMARY KEY, name TEXT, domain TEXT, data TEXT NOT NULL, hash TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS organization_domains (
+    organization_id INTEGER NOT NULL, domain TEXT NOT NULL, PRIMARY KEY (organization_id, domain));
+CREATE INDEX IF NOT EXISTS organization_domains_domain ON organization_domains (domain);
+CREATE TABLE IF NOT EXISTS opportunities (
+    id INTEGER PRIMARY KEY, name TEXT, data TEXT NOT NULL, hash TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS lists (
+    id INTEGER PRIMARY KEY, name TEXT, type INTEGER, data TEXT NOT NULL, hash TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS list_entries (
+    id INTEGER PRIMARY KEY, list_id INTEGER NOT NULL, entity_id INTEGER, entity_type INTEGER, created_at TEXT,
+    data TEXT NOT NULL, hash TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS list_entries_list ON list_entries (list_id);
+CREATE INDEX IF NOT EXISTS list_entries_entity ON list_entries (entity_type, entity_id);
+CREATE TABLE IF NOT EXISTS field_values (
+    id INTEGER PRIMARY KEY, field_id INTEGER, entity_type INTEGER, entity_id INTEGER, list_entry_id INTEGER,
+    value TEXT, data TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS field_values_entity ON field_values (entity_type, entity_id);
+CREATE TABLE IF NOT EXISTS sync_state (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+# Row columns (besides data/hash) stored for each entity table
+_COLUMNS = {
+    "persons": lambda p: (p.get("first_name"), p.get("last_name"), p.get("primary_email")),
+    "organizations": lambda o: (o.get("name"), o.get("domain")),
+    "opportunities": lambda o: (o.get("name"),),
+    "lists": lambda l: (l.get("name"), l.get("type")),
+    "list_entries": lambda e: (e.get("list_id"), e.get("entity_id"), e.get("entity_type"), e.get("created_at")),
+}
+_COLUMN_NAMES = {
+    "persons": ("first_name", "last_name", "primary_email"),
+    "organizations": ("name", "domain"),
+    "opportunities": ("name",),
+    "lists": ("name", "type"),
+    "list_entries": ("list_id", "entity_id", "entity_type", "created_at"),
+}
+# Entity type of the field values belonging to each entity table
+_ENTITY_TYPES = {"persons": 0, "organizations": 1, "opportunities": 8}
+
+
+WRITE_BATCH_SIZE = 500
+
+
+def _digest(record) -> str:
+    return hashlib.sha1(json.dumps(record, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class SyncStats:
+    """Per-table inserted/updated/deleted/unchanged counters of one sync run."""
+
+    def __init__(self):
+        self.tables = {}
+        self.started = time.monotonic()
+        self.seconds = 0.0
+
+    def count(self, table: str, outcome: str, n: int = 1):
+        counts = self.tables.setdefault(table, {"inserted": 0, "updated": 0, "deleted": 0, "unchanged": 0})
+        counts[outcome] += n
+
+    def __repr__(self):
+        return f"SyncStats({self.tables}, seconds={self.seconds:.1f})"
+
+
+class LocalReplica:
+    """
+    Normalized SQLite replica of the CRM, filled from the client's list_all_* generators.
+
+    sync() does a full load the first time and incremental refreshes afterwards. Affinity v1 has
+    no "modified since" filter for persons/organizations/opportunities/list entries, so refreshes
+    still page through them, but only rows whose content changed are rewritten and rows that
+    disappeared are deleted. Field values (one request per entity) are only fetched for new or
+    changed list entries and for entities with field value changes past each field's high-water
+    mark (kept in sync_state); fields that don't track changes are only picked up by a full sync
+    or refresh_field_values(). The query methods below never touch the network.
+    """
+
+    def __init__(self, client, path: str = ":memory:"):
+        self.client = client
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.RLock()
+        with self._lock, self._conn:
+            self._conn.executescript(SCHEMA)
+
+    def close(self):
+        self._conn.close()
+
+    # ---------- Sync ----------
+
+    def sync(self, list_ids=None, full: bool = False, field_values: bool = True) -> SyncStats:
+        """
+        Bring the replica up to date.
+
+        Args:
+            list_ids: Lists whose entries (and entry field values) are replicated; defaults to all lists
+            full: Force a full reload, refetching every list entry's field values
+            field_values: Replicate field values of list entries
+        """
+        stats = SyncStats()
+        full = full or self.get_state("last_sync") is None
+
+        self._sync_table("persons", self.client.list_all_persons(), stats)
+        self._sync_table("organizations", self.client.list_all_organizations(), stats)
+        self._sync_table("opportunities", self.client.list_all_opportunities(), stats)
+
+        lists = self.client.list_lists()
+        lists = lists.get("lists", []) if isinstance(lists, dict) else lists
+        self._sync_table("lists", lists, stats)
+
+        list_ids = list_ids if list_ids is not None else [l["id"] for l in lists]
+        to_refresh = set()
+        for list_id in list_ids:
+            changed = self._sync_table(
+                "list_entries",
+                (dict(as_dict(entry), list_id=entry.get("list_id", list_id)) for entry in self.client.list_all_list_entries(list_id)),
+                stats,
+                scope=("list_id", list_id),
+            )
+            if field_values:
+                to_refresh.update(self._entries_to_refresh(list_id, None if full else changed))
+
+        if field_values:
+            # Read the change log before the values, so edits made meanwhile are caught next sync
+            edited, marks = self._field_value_changes(list_ids)
+            if edited is None and not full:
+                for list_id in list_ids:
+                    to_refresh.update(self._entries_to_refresh(list_id, None))
+            to_refresh.update(edited or ())
+            for entity_type, entity_id in sorted(to_refresh):
+                self.refresh_field_values(entity_id, entity_type, stats)
+            for field_id, mark in marks.items():
+                self.set_state(f"field_value_changes:{field_id}", str(mark))
+
+        self.set_state("last_sync", time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()))
+        if full:
+            self.set_state("last_full_sync", self.get_state("last_sync"))
+        stats.seconds = time.monotonic() - stats.started
+        return stats
+
+    def _sync_table(self, table: str, records, stats: SyncStats, scope=None) -> set:
+        """Upsert changed rows, delete vanished ones; returns the IDs inserted or updated."""
+        where, args = (f" WHERE {scope[0]} = ?", (scope[1],)) if scope else ("", ())
+        with self._lock:
+            known = dict(self._conn.execute(f"SELECT id, hash FROM {table}{where}", args).fetchall())
+
+        seen, changed, batch = set(), set(), []
+        for record in records:
+            record = as_dict(record)
+            record_id = record["id"]
+            seen.add(record_id)
+            digest = _digest(record)
+            if known.get(record_id) == digest:
+                stats.count(table, "unchanged")
+                continue
+            stats.count(table, "updated" if record_id in known else "inserted")
+            changed.add(record_id)
+            batch.append((record, digest))
+            # Write in batches so the lock isn't held while the next page is being fetched
+            if len(batch) >= WRITE_BATCH_SIZE:
+                self._write_rows(table, batch)
+                batch = []
+        self._write_rows(table, batch)
+
+        vanished = [record_id for record_id in known if record_id not in seen]
+        with self._lock, self._conn:
+            for record_id in vanished:
+                self._delete_row(table, record_id)
+        stats.count(table, "deleted", len(vanished))
+        return changed
+
+    def _write_rows(self, table: str, rows: list):
+        columns = _COLUMN_NAMES[table]
+        placeholders = ", ".join("?" * (len(columns) + 3))
+        with self._lock, self._conn:
+            for record, digest in rows:
+                self._conn.execute(
+                    f"INSERT OR REPLACE INTO {table} (id, {', '.join(columns)}, data, hash) VALUES ({placeholders})",
+                    (record["id"], *_COLUMNS[table](record), json.dumps(record), digest),
+                )
+                self._write_children(table, record)
+
+    def _write_children(self, table: str, record: dict):
+        if table == "persons":
+            self._conn.execute("DELETE FROM person_emails WHERE person_id = ?", (record["id"],))
+            emails = set(record.get("emails") or []) | ({record["primary_email"]} if record.get("primary_email") else set())
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO person_emails VALUES (?, ?)", [(record["id"], e.strip().lower()) for e in emails]
+            )
+        elif table == "organizations":
+            self._conn.execute("DELETE FROM organization_domains WHERE organization_id = ?", (record["id"],))
+            domains = set(record.get("domains") or []) | ({record["domain"]} if record.get("domain") else set())
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO organization_domains VALUES (?, ?)", [(record["id"], d.strip().lower()) for d in domains]
+            )
+
+    def _delete_row(self, table: str, record_id: int):
+        self._conn.execute(f"DELETE FROM {table} WHERE id = ?", (record_id,))
+        if table == "persons":
+            self._conn.execute("DELETE FROM person_emails WHERE person_id = ?", (record_id,))
+        elif table == "organizations":
+            self._conn.execute("DELETE FROM organization_domains WHERE organization_id = ?", (record_id,))
+        if table == "list_entries":
+            self._conn.execute("DELETE FROM field_values WHERE list_entry_id = ?", (record_id,))
+        elif table in _ENTITY_TYPES:
+            self._conn.execute(
+                "DELETE FROM field_values WHERE entity_id = ? AND entity_type = ?", (record_id, _ENTITY_TYPES[table])
+            )
+
+    def _field_value_changes(self, list_ids) -> tuple:
+        """
+        (entities, marks): the (entity_type, entity_id) of the lists' entries with field value
+        changes past each field's high-water mark, and the fields' new marks. entities is None
+        when a field's changes couldn't be read.
+        """
+        scope = set(list_ids)
+        fields = [
+            f for f in map(as_dict, _all_fields(self.client))
+            if (f.get("list_id") is None or f.get("list_id") in scope) and f.get("track_changes") is not False
+        ]
+        entry_ids, entity_ids, marks, complete = set(), set(), {}, True
+        for field in fields:
+            mark = int(self.get_state(f"field_value_changes:{field['id']}") or 0)
+            try:
+                changes = _changes_of(self.client.list_field_value_changes(field["id"]))
+            except AffinityAPIError:
+                complete = False
+                continue
+            for change in changes:
+                if change["id"] > mark:
+                    entry_ids.add(change.get("list_entry_id"))
+                    entity_ids.add(change.get("entity_id"))
+                    marks[field["id"]] = max(marks.get(field["id"], mark), change["id"])
+        if not complete:
+            return None, marks
+
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT id, entity_type, entity_id FROM list_entries WHERE list_id IN ({', '.join('?' * len(scope))})",
+                tuple(scope),
+            ).fetchall()
+        # Global field changes carry no list entry, so match on the entity too
+        return {(entity_type, entity_id) for entry_id, entity_type, entity_id in rows if entry_id in entry_ids or entity_id in entity_ids}, marks
+
+    def _entries_to_refresh(self, list_id: int, entry_ids) -> list:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, entity_type, entity_id FROM list_entries WHERE list_id = ?", (list_id,)
+            ).fetchall()
+        return sorted({(entity_type, entity_id) for entry_id, entity_type, entity_id in rows if entry_ids is None or entry_id in entry_ids})
+
+    def refresh_field_values(self, entity_id: int, entity_type: int = None, stats: SyncStats = None):
+        """Re-read one entity's field values from the API and replace them in the replica."""
+        values = as_dict(_field_values_of(self.client.list_field_values(entity_id, entity_type=entity_type)))
+        self.replace_field_values(entity_id, entity_type, values)
+        if stats is not None:
+            stats.count("field_values", "updated", len(values))
+
+    def replace_field_values(self, entity_id: int, entity_type, values: list):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM field_values WHERE entity_id = ? AND entity_type IS ?", (entity_id, entity_type)
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO field_values VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (fv["id"], fv.get("field_id"), entity_type, entity_id, fv.get("list_entry_id"), json.dumps(fv.get("value")), json.dumps(fv))
+                    for fv in values
+                ],
+            )
+
+    # ---------- Single-row writes (used for webhook updates) ----------
+
+    def upsert(self, table: str, record: dict):
+        record = as_dict(record)
+        self._write_rows(table, [(record, _digest(record))])
+
+    def delete(self, table: str, record_id: int):
+        with self._lock, self._conn:
+            self._delete_row(table, record_id)
+
+    def upsert_field_value(self, field_value: dict):
+        """
+        Insert or replace a single field value. Its entity type is taken from the record, the
+        row it replaces, or its list entry, in that order.
+        """
+        with self._lock, self._conn:
+            entity_type = field_value.get("entity_type")
+            if entity_type is None:
+                row = self._conn.execute(
+                    "SELECT entity_type FROM field_values WHERE id = ?", (field_value["id"],)
+                ).fetchone() or self._conn.execute(
+                    "SELECT entity_type FROM list_entries WHERE id = ?", (field_value.get("list_entry_id"),)
+                ).fetchone()
+                entity_type = row[0] if row else None
+            self._conn.execute(
+                "INSERT OR REPLACE INTO field_values VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    field_value["id"], field_value.get("field_id"), entity_type, field_value.get("entity_id"),
+                    field_value.get("list_entry_id"), json.dumps(field_value.get("value")), json.dumps(field_value),
+                ),
+            )
+
+    def delete_field_value(self, field_value_id: int):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM field_values WHERE id = ?", (field_value_id,))
+
+    # ---------- State ----------
+
+    def get_state(self, key: str):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM sync_state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_state(self, key: str, value: str):
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO sync_state VALUES (?, ?)", (key, value))
+
+    # ---------- Queries (local only) ----------
+
+    def _one(self, sql: str, args=()):
+        with self._lock:
+            row = self._conn.execute(sql, args).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _all(self, sql: str, args=()) -> list:
+        with self._lock:
+            rows = self._conn.execute(sql, args).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def get_person(self, person_id: int):
+        return self._one("SELECT data FROM persons WHERE id = ?", (person_id,))
+
+    def get_organization(self, org_id: int):
+        return self._one("SELECT data FROM organizations WHERE id = ?", (org_id,))
+
+    def get_opportunity(self, opp_id: int):
+        return self._one("SELECT data FROM opportunities WHERE id = ?", (opp_id,))
+
+    def find_persons_by_email(self, email: str) -> list:
+        return self._all(
+            "SELECT p.data FROM persons p JOIN person_emails e ON e.person_id = p.id WHERE e.email = ? ORDER BY p.id",
+            (email.strip().lower(),),
+        )
+
+    def find_organizations_by_domain(self, domain: str) -> list:
+        return self._all(
+            "SELECT o.data FROM organizations o JOIN organization_domains d ON d.organization_id = o.id WHERE d.domain = ? ORDER BY o.id",
+            (domain.strip().lower(),),
+        )
+
+    def search_organizations(self, term: str) -> list:
+        return self._all("SELECT data FROM organizations WHERE name LIKE ? ORDER BY name", (f"%{term}%",))
+
+    def lists(self) -> list:
+        return self._all("SELECT data FROM lists ORDER BY id")
+
+    def list_entries(self, list_id: int) -> list:
+        return self._all("SELECT data FROM list_entries WHERE list_id = ? ORDER BY id", (list_id,))
+
+    def field_values(self, entity_id: int, entity_type: int = None, field_id: int = None) -> list:
+        sql = "SELECT data FROM field_values WHERE entity_id = ?"
+        args = [entity_id]
+        if entity_type is not None:
+            sql += " AND entity_type = ?"
+            args.append(entity_type)
+        if field_id is not None:
+            sql += " AND field_id = ?"
+            args.append(field_id)
+        return self._all(sql + " ORDER BY id", args)
+
+    def query(self, sql: str, args=()) -> list:
+        """Run a read-only SQL query against the replica (rows as tuples)."""
+        with self._lock:
+            return self._conn.execute(sql, args).fetchall()
@@ -0,0 +1,53 @@
+# affinity/retry.py
+
+import random
+import time
+from typing import Optional
+
+IDEMPOTENT_METHODS = ("GET", "PUT", "DELETE")
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class RetryPolicy:
+    """
+    When and how long AffinityClient waits before re-sending a failed request.
+
+    Idempotent methods (GET/PUT/DELETE) are retried on `retry_statuses` and on connection
+    errors; POST is only retried when `retry_posts=True`. Delays grow exponentially with
+    full jitter, a server-sent Retry-After always wins, and no retry is scheduled once the
+    total time spent would exceed `max_elapsed` seconds.
+    """
+
+    def __init__(self, max_retries: int = 5, backoff_factor: float = 0.5, max_backoff: float = 30.0, max_elapsed: float = 120.0, retry_statuses=RETRY_STATUSES, retry_posts: bool = False, jitter: bool = True, sleep=time.sleep, clock=time.monotonic):
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.max_elapsed = max_elapsed
+        self.retry_statuses = tuple(retry_statuses)
+        self.retry_posts = retry_posts
+        self.jitter = jitter
+        self.sleep = sleep
+        self.clock = clock
+
+    def is_retryable(self, method: str, status_code: Optional[int]) -> bool:
+        method = method.upper()
+        if method not in IDEMPOTENT_METHODS and not (method == "POST" and self.retry_posts):
+            return False
+        # status_code is None for connection errors / timeouts
+        return status_code is None or status_code in self.retry_statuses
+
+    def backoff(self, attempt: int) -> float:
+        delay = min(self.max_backoff, self.backoff_factor * (2 ** attempt))
+        return random.uniform(0, delay) if self.jitter else delay
+
+    def next_delay(self, method: str, status_code: Optional[int], attempt: int, started: float, retry_after: Optional[float] = None) -> Optional[float]:
+        """Seconds to wait before retry number `attempt + 1`, or None to give up."""
+        if attempt >= self.max_retries or not self.is_retryable(method, status_code):
+            return None
+        delay = retry_after if retry_after is not None else self.backoff(attempt)
+        if self.clock() - started + delay > self.max_elapsed:
+            return None
+        return delay
+
+
+NO_RETRY = RetryPolicy(max_retries=0)
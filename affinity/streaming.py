@@ -0,0 +1,177 @@
+# affinity/streaming.py
+
+import codecs
+import json
+
+_WHITESPACE = " \t\n\r"
+_INCOMPLETE = object()
+
+
+class JSONRecordParser:
+    """
+    Incremental (push) parser for API pages shaped like `[record, ...]` or
+    `{"<key>": [record, ...], "next_page_token": ...}`.
+
+    feed() takes raw chunks as they arrive and returns the records completed so far, so the
+    caller never holds more than one chunk plus one record in memory. The other top-level
+    keys of an object page (e.g. next_page_token) are collected in `meta`.
+    """
+
+    def __init__(self, key: str = None):
+        self.key = key
+        self.meta = {}
+        self._decoder = json.JSONDecoder()
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._buf = ""
+        self._pos = 0
+        self._state = "start"
+        self._in_object = False
+        self._current_key = None
+        self._eof = False
+
+    def feed(self, chunk) -> list:
+        if isinstance(chunk, bytes):
+            chunk = self._utf8.decode(chunk)
+        self._buf = self._buf[self._pos:] + chunk
+        self._pos = 0
+        return self._parse()
+
+    def close(self) -> list:
+        self._buf = self._buf[self._pos:] + self._utf8.decode(b"", final=True)
+        self._pos = 0
+        self._eof = True
+        records = self._parse()
+        if self._state != "done":
+            raise ValueError("Truncated JSON response")
+        return records
+
+    def _skip_whitespace(self) -> bool:
+        buf, pos = self._buf, self._pos
+        while pos < len(buf) and buf[pos] in _WHITESPACE:
+            pos += 1
+        self._pos = pos
+        return pos < len(buf)
+
+    def _decode(self):
+        try:
+            value, end = self._decoder.raw_decode(self._buf, self._pos)
+        except json.JSONDecodeError:
+            if self._eof:
+                raise
+            return _INCOMPLETE
+        # A number or literal ending exactly at the buffer end may continue in the next chunk
+        if end == len(self._buf) and not self._eof and self._buf[self._pos] not in '{["':
+            return _INCOMPLETE
+        self._pos = end
+        return value
+
+    def _parse(self) -> list:
+        records = []
+        while self._skip_whitespace():
+            char = self._buf[self._pos]
+            state = self._state
+
+            if state == "start":
+                if char == "[":
+                    self._state = "array"
+                elif char == "{":
+                    self._state = "key"
+                    self._in_object = True
+                else:
+                    raise ValueError(f"Expected a JSON array or object, got {char!r}")
+                self._pos += 1
+
+            elif state == "array":
+                if char == ",":
+                    self._pos += 1
+                elif char == "]":
+                    self._pos += 1
+                    self._state = "key" if self._in_object else "done"
+                else:
+                    record = self._decode()
+                    if record is _INCOMPLETE:
+                        break
+                    records.append(record)
+
+            elif state == "key":
+                if char == ",":
+                    self._pos += 1
+                elif char == "}":
+                    self._pos += 1
+                    self._state = "done"
+                else:
+                    key = self._decode()
+                    if key is _INCOMPLETE:
+                        break
+                    self._current_key = key
+                    self._state = "colon"
+
+            elif state == "colon":
+                if char != ":":
+                    raise ValueError(f"Expected ':' after key {self._current_key!r}")
+                self._pos += 1
+                self._state = "value"
+
+            elif state == "value":
+                if char == "[" and self._current_key == self.key:
+                    self._pos += 1
+                    self._state = "array"
+                else:
+                    value = self._decode()
+                    if value is _INCOMPLETE:
+                        break
+                    self.meta[self._current_key] = value
+                    self._state = "key"
+
+            else:
+                raise ValueError("Unexpected data after the end of the JSON document")
+        return records
+
+
+class StreamedPage:
+    """
+    Iterable over the records of a streamed response body.
+    `meta` (e.g. next_page_token) is complete once iteration has finished.
+    `convert`, if given, is applied to every record (e.g. a typed record class's from_dict).
+    """
+
+    def __init__(self, chunks, key: str = None, close=None, convert=None):
+        self.key = key
+        self.meta = {}
+        self._chunks = chunks
+        self._close = close
+        self._convert = convert
+
+    def _converted(self, records: list):
+        return map(self._convert, records) if self._convert is not None else records
+
+    def __iter__(self):
+        parser = JSONRecordParser(self.key)
+        self.meta = parser.meta
+        try:
+            for chunk in self._chunks:
+                yield from self._converted(parser.feed(chunk))
+            yield from self._converted(parser.close())
+        finally:
+            if self._close is not None:
+                self._close()
+
+
+class AsyncStreamedPage(StreamedPage):
+    """StreamedPage over an async chunk iterator (httpx aiter_bytes)."""
+
+    def __aiter__(self):
+        return self._records()
+
+    async def _records(self):
+        parser = JSONRecordParser(self.key)
+        self.meta = parser.meta
+        try:
+            async for chunk in self._chunks:
+                for record in self._converted(parser.feed(chunk)):
+                    yield record
+            for record in self._converted(parser.close()):
+                yield record
+        finally:
+            if self._close is not None:
+                await self._close()
@@ -0,0 +1,154 @@
+# affinity/transport.py
+
+import asyncio
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_TIMEOUT = (10.0, 60.0)  # (connect, read) seconds
+
+
+class RequestsTransport:
+    """
+    Default transport: one requests.Session with a tunable urllib3 connection pool.
+
+    requests' stock adapter keeps at most 10 connections per host, so with more threads than that
+    connections are dropped after each request and re-established (TCP + TLS handshake) on the
+    next one. Size `pool_maxsize` to the number of threads that share the client.
+
+    Args:
+        pool_connections: Number of per-host pools to cache
+        pool_maxsize: Connections kept alive per host
+        pool_block: Make threads wait for a free connection instead of opening throwaway ones
+        keep_alive: Reuse connections across requests (False sends "Connection: close")
+        timeout: Seconds, or a (connect, read) tuple, applied to every request
+    """
+
+    errors = (requests.ConnectionError, requests.Timeout)
+
+    def __init__(self, pool_connections: int = 10, pool_maxsize: int = 32, pool_block: bool = False, keep_alive: bool = True, timeout=DEFAULT_TIMEOUT):
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers.update({"Content-Type": "application/json"})
+        if not keep_alive:
+            self.session.headers["Connection"] = "close"
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, pool_block=pool_block)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def request(self, method: str, url: str, auth=None, params=None, json=None, headers=None, stream: bool = False):
+        return self.session.request(method, url, auth=auth, params=params, json=json, headers=headers, stream=stream, timeout=self.timeout)
+
+    def close(self):
+        self.session.close()
+
+
+class _HTTPXResponse:
+    """Gives an httpx.Response the parts of the requests.Response interface the client uses."""
+
+    __slots__ = ("_response", "_run")
+
+    def __init__(self, response, run):
+        self._response = response
+        self._run = run
+
+    @property
+    def ok(self) -> bool:
+        # Like requests.Response.ok: a 304 from cache revalidation is not an error
+        return self._response.status_code < 400
+
+    @property
+    def status_code(self) -> int:
+        return self._response.status_code
+
+    @property
+    def headers(self):
+        return self._response.headers
+
+    @property
+    def text(self) -> str:
+        return self._response.text
+
+    @property
+    def content(self) -> bytes:
+        return self._response.content
+
+    def json(self):
+        return self._response.json()
+
+    def iter_content(self, chunk_size: int = None):
+        chunks = self._response.aiter_bytes(chunk_size)
+        while True:
+            try:
+                yield self._run(_next_chunk(chunks))
+            except StopAsyncIteration:
+                return
+
+    def close(self):
+        self._run(self._response.aclose())
+
+
+async def _next_chunk(chunks):
+    return await chunks.__anext__()
+
+
+class HTTPXTransport:
+    """
+    httpx-based transport with HTTP/2 (`pip install affinity-crm-python-client[http2]`).
+
+    With http2=True, concurrent requests from many threads are multiplexed as streams over a
+    single TLS connection instead of each needing a pooled connection (and handshake) of its own.
+    All connection I/O runs on one background event loop thread: httpx's synchronous HTTP/2
+    connection isn't safe to share between threads, while its asyncio one serializes stream
+    setup correctly. Calling threads block on their own request only.
+
+    Args:
+        http2: Negotiate HTTP/2 (falls back to HTTP/1.1 if the server doesn't offer it)
+        max_connections: Upper bound on open connections
+        max_keepalive_connections: Idle connections kept for reuse
+        keepalive_expiry: Seconds an idle connection is kept
+        timeout: Seconds, or a (connect, read) tuple, applied to every request
+        transport: Optional httpx async transport (e.g. httpx.MockTransport in tests)
+    """
+
+    def __init__(self, http2: bool = True, max_connections: int = 100, max_keepalive_connections: int = 20, keepalive_expiry: float = 30.0, timeout=DEFAULT_TIMEOUT, transport=None):
+        try:
+            import httpx
+        except ImportError:
+            raise ImportError("HTTPXTransport requires httpx: pip install affinity-crm-python-client[http2]")
+        if isinstance(timeout, tuple):
+            timeout = httpx.Timeout(timeout[1], connect=timeout[0])
+        self.errors = (httpx.TransportError,)
+        self.client = httpx.AsyncClient(
+            http2=http2,
+            headers={"Content-Type": "application/json"},
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive_connections, keepalive_expiry=keepalive_expiry),
+            timeout=timeout,
+            transport=transport,
+        )
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="affinity-httpx", daemon=True)
+        self._thread.start()
+
+    def _run(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    async def _send(self, request, auth, stream: bool):
+        response = await self.client.send(request, auth=auth, stream=stream)
+        if stream and response.status_code >= 400:
+            # Error bodies are small and the client reads them for the exception message
+            await response.aread()
+        return response
+
+    def request(self, method: str, url: str, auth=None, params=None, json=None, headers=None, stream: bool = False):
+        request = self.client.build_request(method, url, params=params, json=json, headers=headers)
+        return _HTTPXResponse(self._run(self._send(request, auth, stream)), self._run)
+
+    def close(self):
+        if self._loop.is_closed():
+            return
+        self._run(self.client.aclose())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
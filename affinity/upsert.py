@@ -0,0 +1,277 @@
+# affinity/upsert.py
+
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from affinity.indexes import normalize_domain, normalize_email, normalize_name
+from affinity.rate_limit import RateLimiter
+
+# Row outcomes
+CREATED = "created"
+UPDATED = "updated"
+UNCHANGED = "unchanged"
+DUPLICATE = "duplicate"  # same key as an earlier row of this run
+RESUMED = "resumed"      # already done according to the checkpoint
+FAILED = "failed"
+
+
+class RowResult:
+    """Outcome of one input row: `action` is one of the constants above."""
+
+    __slots__ = ("row", "key", "action", "id", "error")
+
+    def __init__(self, row: int, key: str, action: str, id: int = None, error: Exception = None):
+        self.row = row
+        self.key = key
+        self.action = action
+        self.id = id
+        self.error = error
+
+    def __repr__(self):
+        return f"RowResult(row={self.row}, key={self.key!r}, action={self.action!r}, id={self.id!r})"
+
+
+class UpsertReport:
+    """Per-row results of a bulk upsert plus throughput."""
+
+    def __init__(self):
+        self.results = []
+        self.requests = 0
+        self.seconds = 0.0
+
+    @property
+    def counts(self) -> dict:
+        counts = {}
+        for result in self.results:
+            counts[result.action] = counts.get(result.action, 0) + 1
+        return counts
+
+    @property
+    def failed(self) -> list:
+        return [result for result in self.results if result.action == FAILED]
+
+    @property
+    def rows_per_second(self) -> float:
+        return len(self.results) / self.seconds if self.seconds else 0.0
+
+    def __repr__(self):
+        return f"UpsertReport({self.counts}, requests={self.requests}, rows_per_second={self.rows_per_second:.1f})"
+
+
+class _Persons:
+    index_attribute = "person_index"
+
+    @staticmethod
+    def build_index(client):
+        return client.build_person_index()
+
+    @staticmethod
+    def emails(record) -> list:
+        emails = list(record.get("emails") or [])
+        if record.get("email"):
+            emails.insert(0, record["email"])
+        return list(dict.fromkeys(normalize_email(e) for e in emails if normalize_email(e)))
+
+    def key(self, record):
+        emails = self.emails(record)
+        return emails[0] if emails else None
+
+    def match(self, index, record):
+        for email in self.emails(record):
+            person = index.by_email(email)
+            if person is not None:
+                return person
+        return None
+
+    def changes(self, existing, record) -> dict:
+        changes = {}
+        for name in ("first_name", "last_name"):
+            if record.get(name) and record[name] != existing.get(name):
+                changes[name] = record[name]
+        known = {normalize_email(e) for e in existing.get("emails") or []}
+        new_emails = [e for e in self.emails(record) if e not in known]
+        if new_emails:
+            changes["emails"] = list(existing.get("emails") or []) + new_emails
+        # Records from list_all_persons carry no organization_ids; only extend them when known,
+        # since update_person replaces the whole list
+        if record.get("organization_ids") and "organization_ids" in existing:
+            missing = [i for i in record["organization_ids"] if i not in existing["organization_ids"]]
+            if missing:
+                changes["organization_ids"] = list(existing["organization_ids"]) + missing
+        return changes
+
+    def create(self, client, record):
+        return client.create_person(
+            first_name=record.get("first_name"),
+            last_name=record.get("last_name"),
+            emails=self.emails(record),
+            organization_ids=record.get("organization_ids"),
+        )
+
+    def update(self, client, existing_id, changes):
+        return client.update_person(existing_id, **changes)
+
+
+class _Organizations:
+    index_attribute = "organization_index"
+
+    @staticmethod
+    def build_index(client):
+        return client.build_organization_index()
+
+    def key(self, record):
+        domain = normalize_domain(record.get("domain"))
+        if domain:
+            return domain
+        name = normalize_name(record.get("name"))
+        return f"name:{name}" if name else None
+
+    def match(self, index, record):
+        if record.get("domain"):
+            return index.by_domain(record["domain"])
+        matches = index.by_name(record.get("name"))
+        # Without a domain, only an unambiguous name match counts
+        return matches[0] if len(matches) == 1 else None
+
+    def changes(self, existing, record) -> dict:
+        if record.get("name") and record["name"] != existing.get("name"):
+            return {"name": record["name"]}
+        return {}
+
+    def create(self, client, record):
+        return client.create_organization(name=record.get("name"), domain=normalize_domain(record.get("domain")) or None)
+
+    def update(self, client, existing_id, changes):
+        return client.update_organization(existing_id, **changes)
+
+
+class BulkUpserter:
+    """
+    Idempotent bulk create-or-update of persons (matched by email) or organizations
+    (matched by domain, else by unambiguous name) against the client's local index.
+
+    Rows that match and differ become one update, rows that match and agree cost no request,
+    the rest become creates. Writes run on `max_workers` threads, paced by the client's own
+    RateLimiter when it has one, else by `rate_limiter` (default RateLimiter(), Affinity's
+    per-key limit), so the pool stays within the API quota. With `checkpoint_path`, every
+    completed row is appended to a JSONL file, and a re-run skips rows already recorded there,
+    so a crashed import can simply be restarted.
+    """
+
+    def __init__(self, client, kind: str, max_workers: int = 8, checkpoint_path: str = None, rate_limiter: RateLimiter = None):
+        kinds = {"persons": _Persons, "organizations": _Organizations}
+        if kind not in kinds:
+            raise ValueError(f"Invalid kind: {kind}. Must be 'persons' or 'organizations'")
+        self.client = client
+        self.kind = kinds[kind]()
+        self.max_workers = max_workers
+        self.checkpoint_path = checkpoint_path
+        # The client paces its own requests; only add pacing when it doesn't
+        self.budget = None if client.rate_limiter is not None else (rate_limiter or RateLimiter())
+
+    def _load_checkpoint(self) -> dict:
+        done = {}
+        if self.checkpoint_path and os.path.exists(self.checkpoint_path):
+            with open(self.checkpoint_path) as f:
+                for line in f:
+                    # A crash mid-write can leave a truncated last line
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    done[entry["key"]] = entry.get("id")
+        return done
+
+    def _open_checkpoint(self):
+        if not self.checkpoint_path:
+            return None
+        checkpoint = open(self.checkpoint_path, "a+")
+        # Terminate a truncated last line so the next entry doesn't get glued onto it
+        if checkpoint.tell():
+            checkpoint.seek(checkpoint.tell() - 1)
+            if checkpoint.read(1) != "\n":
+                checkpoint.write("\n")
+        return checkpoint
+
+    def _write(self, record, existing_id, changes):
+        if self.budget is not None:
+            self.budget.acquire()
+        if existing_id is None:
+            return CREATED, self.kind.create(self.client, record)["id"]
+        self.kind.update(self.client, existing_id, changes)
+        return UPDATED, existing_id
+
+    def run(self, records) -> UpsertReport:
+        report = UpsertReport()
+        started = time.monotonic()
+        index = getattr(self.client, self.kind.index_attribute)
+        if index is None:
+            index = self.kind.build_index(self.client)
+        done = self._load_checkpoint()
+        checkpoint = self._open_checkpoint()
+        seen = set()
+        pending = {}
+
+        def finish(result):
+            report.results.append(result)
+            if checkpoint is not None and result.action in (CREATED, UPDATED, UNCHANGED):
+                checkpoint.write(json.dumps({"key": result.key, "action": result.action, "id": result.id}) + "\n")
+                checkpoint.flush()
+
+        def collect(futures):
+            for future in futures:
+                row, key = pending.pop(future)
+                try:
+                    action, record_id = future.result()
+                    finish(RowResult(row, key, action, record_id))
+                except Exception as e:
+                    finish(RowResult(row, key, FAILED, error=e))
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                for row, record in enumerate(records):
+                    key = self.kind.key(record)
+                    if key is None:
+                        finish(RowResult(row, None, FAILED, error=ValueError("Row has no email/domain/name to match on")))
+                        continue
+                    if key in done:
+                        finish(RowResult(row, key, RESUMED, done[key]))
+                        continue
+                    if key in seen:
+                        finish(RowResult(row, key, DUPLICATE))
+                        continue
+                    seen.add(key)
+
+                    existing = self.kind.match(index, record)
+                    changes = self.kind.changes(existing, record) if existing is not None else None
+                    if existing is not None and not changes:
+                        finish(RowResult(row, key, UNCHANGED, existing["id"]))
+                        continue
+
+                    report.requests += 1
+                    future = pool.submit(self._write, record, existing["id"] if existing else None, changes)
+                    pending[future] = (row, key)
+                    # Bound the rows in flight so huge inputs are streamed, not queued up front
+                    if len(pending) >= self.max_workers * 4:
+                        finished, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+                        collect(finished)
+                collect(list(pending))
+        finally:
+            if checkpoint is not None:
+                checkpoint.close()
+
+        report.results.sort(key=lambda result: result.row)
+        report.seconds = time.monotonic() - started
+        return report
+
+
+def upsert_persons(client, records, max_workers: int = 8, checkpoint_path: str = None, rate_limiter: RateLimiter = None) -> UpsertReport:
+    """Create or update persons ({"first_name", "last_name", "email"/"emails", "organization_ids"}) by email."""
+    return BulkUpserter(client, "persons", max_workers, checkpoint_path, rate_limiter).run(records)
+
+
+def upsert_organizations(client, records, max_workers: int = 8, checkpoint_path: str = None, rate_limiter: RateLimiter = None) -> UpsertReport:
+    """Create or update organizations ({"name", "domain"}) by domain, or by name when there is no domain."""
+    return BulkUpserter(client, "organizations", max_workers, checkpoint_path, rate_limiter).run(records)
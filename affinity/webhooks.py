@@ -0,0 +1,181 @@
+# affinity/webhooks.py
+
+import fnmatch
+import hmac
+import json
+import logging
+from urllib.parse import parse_qs
+
+logger = logging.getLogger(__name__)
+
+# Webhook resource prefix -> (replica table, entity_type_cache parameter)
+_ENTITY_EVENTS = {
+    "person": ("persons", "person_id"),
+    "organization": ("organizations", "organization_id"),
+    "opportunity": ("opportunities", "opportunity_id"),
+    "list_entry": ("list_entries", "list_entry_id"),
+}
+
+# Webhook resource prefix -> API path whose cached responses an event makes stale
+_CACHED_PATHS = {
+    "list": "/lists",
+    "list_entry": "/lists",
+    "field": "/fields",
+    "field_value": "/field-values",
+    "person": "/persons",
+    "organization": "/organizations",
+    "opportunity": "/opportunities",
+}
+
+
+class WebhookDispatcher:
+    """
+    Routes Affinity webhook events ({"type": "person.updated", "body": {...}, "sent_at": ...})
+    to the handlers registered for their type. Types may be glob patterns ("person.*", "*").
+    """
+
+    def __init__(self):
+        self._handlers = []
+
+    def on(self, event_type: str, handler=None):
+        """Register `handler(body, event)` for `event_type`; usable as a decorator."""
+        if handler is None:
+            return lambda fn: self.on(event_type, fn)
+        self._handlers.append((event_type, handler))
+        return handler
+
+    def dispatch(self, event: dict) -> int:
+        """Call every matching handler; returns how many ran."""
+        event_type = event.get("type", "")
+        body = event.get("body") or {}
+        called = 0
+        for pattern, handler in self._handlers:
+            if fnmatch.fnmatchcase(event_type, pattern):
+                handler(body, event)
+                called += 1
+        if not called:
+            logger.debug("No handler for webhook event %s", event_type)
+        return called
+
+
+class WebhookReceiver:
+    """
+    Minimal WSGI app that accepts Affinity webhook POSTs and dispatches them.
+
+    Serve it with any WSGI server (e.g. `wsgiref.simple_server.make_server("", 8080, receiver)`)
+    and register its public URL with `client.create_webhook(url, event)`. If `token` is set, the
+    URL must carry it as `?token=...` (put it in the subscribed URL).
+    """
+
+    def __init__(self, dispatcher: WebhookDispatcher, token: str = None):
+        self.dispatcher = dispatcher
+        self.token = token
+
+    def handle(self, body: bytes) -> int:
+        return self.dispatcher.dispatch(json.loads(body))
+
+    def __call__(self, environ, start_response):
+        if environ.get("REQUEST_METHOD") != "POST":
+            start_response("405 Method Not Allowed", [("Content-Type", "text/plain")])
+            return [b"POST only"]
+        if self.token is not None and not self._token_ok(environ.get("QUERY_STRING", "")):
+            start_response("403 Forbidden", [("Content-Type", "text/plain")])
+            return [b"bad token"]
+        try:
+            length = int(environ.get("CONTENT_LENGTH") or 0)
+            event = json.loads(environ["wsgi.input"].read(length))
+        except ValueError:
+            event = None
+        if not isinstance(event, dict):
+            start_response("400 Bad Request", [("Content-Type", "text/plain")])
+            return [b"invalid JSON"]
+        try:
+            self.dispatcher.dispatch(event)
+        except Exception:
+            # The event itself was fine: report the handler's failure as a server error
+            logger.exception("Webhook handler failed for event %s", event.get("type"))
+            start_response("500 Internal Server Error", [("Content-Type", "text/plain")])
+            return [b"handler error"]
+        start_response("200 OK", [("Content-Type", "text/plain")])
+        return [b"ok"]
+
+    def _token_ok(self, query_string: str) -> bool:
+        sent = parse_qs(query_string).get("token", [""])[-1]
+        return hmac.compare_digest(sent.encode(), self.token.encode())
+
+
+def apply_to_client(dispatcher: WebhookDispatcher, client):
+    """Keep the client's response cache, entity type cache and organization/person indexes consistent with incoming events."""
+
+    for prefix, path in _CACHED_PATHS.items():
+        def invalidate(body, event, path=path):
+            if client.cache is not None:
+                client.cache.invalidate(path)
+
+        dispatcher.on(f"{prefix}.*", invalidate)
+
+    for prefix, (_, param_name) in _ENTITY_EVENTS.items():
+        def remember(body, event, param_name=param_name):
+            if "id" in body:
+                client.entity_type_cache.set(body["id"], param_name)
+
+        def forget(body, event):
+            if "id" in body:
+                client.entity_type_cache.discard(body["id"])
+
+        dispatcher.on(f"{prefix}.created", remember)
+        dispatcher.on(f"{prefix}.deleted", forget)
+
+    for prefix, attribute in (("organization", "organization_index"), ("person", "person_index")):
+        def update_index(body, event, attribute=attribute):
+            index = getattr(client, attribute)
+            if index is not None and "id" in body:
+                if event["type"].endswith(".deleted"):
+                    index.remove(body["id"])
+                else:
+                    index.add(body)
+
+        dispatcher.on(f"{prefix}.*", update_index)
+    return dispatcher
+
+
+def apply_to_replica(dispatcher: WebhookDispatcher, replica):
+    """Apply person, organization, opportunity, list entry and field value events to a LocalReplica."""
+    for prefix, (table, _) in _ENTITY_EVENTS.items():
+        def upsert(body, event, table=table):
+            replica.upsert(table, body)
+
+        def delete(body, event, table=table):
+            replica.delete(table, body["id"])
+
+        dispatcher.on(f"{prefix}.created", upsert)
+        dispatcher.on(f"{prefix}.updated", upsert)
+        dispatcher.on(f"{prefix}.deleted", delete)
+
+    dispatcher.on("field_value.created", lambda body, event: replica.upsert_field_value(body))
+    dispatcher.on("field_value.updated", lambda body, event: replica.upsert_field_value(body))
+    dispatcher.on("field_value.deleted", lambda body, event: replica.delete_field_value(body["id"]))
+    return dispatcher
+
+
+def load_events(path: str) -> list:
+    """Read recorded webhook payloads, one JSON object per line."""
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def replay_events(target, events) -> int:
+    """
+    Test harness: feed recorded payloads (a JSONL path or an iterable of dicts) through a
+    WebhookDispatcher or WebhookReceiver, in order. Returns the number of events replayed.
+    """
+    if isinstance(events, str):
+        events = load_events(events)
+    count = 0
+    for event in events:
+        if isinstance(target, WebhookReceiver):
+            target.handle(json.dumps(event).encode())
+        else:
+            target.dispatch(event)
+        count += 1
+    return count
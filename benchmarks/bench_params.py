@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: per-page query parameter overhead in the list_all_* loops.
+
+"before" is what every page used to cost (build the pydantic params model, model_dump,
+lowercase booleans); "after" is the prebuilt query reused by AffinityClient._paged_query,
+which only swaps in the page token.
+
+    python benchmarks/bench_params.py
+"""
+
+import timeit
+
+from affinity.client import AffinityClient
+from affinity.models import ListOrganizationsParams, encode_query
+
+ROUNDS = 20000
+
+
+def before(token):
+    params = ListOrganizationsParams(term=None, page_size=50, page_token=token, list_id=None, person_id=None, opportunity_id=None)
+    return {k: str(v).lower() if isinstance(v, bool) else v for k, v in params.model_dump(exclude_none=True).items()}
+
+
+QUERY = encode_query(ListOrganizationsParams(page_size=50))
+
+
+def after(token):
+    return {**QUERY, "page_token": token} if token else QUERY
+
+
+class StubClient(AffinityClient):
+    """Serves in-memory pages so the loop measures client overhead only."""
+
+    def __init__(self, pages):
+        super().__init__(api_key="bench")
+        self.pages = pages
+
+    def _request(self, method, path, params=None, data=None):
+        return self.pages[(params or {}).get("page_token")]
+
+
+def make_pages(count):
+    pages = {}
+    for i in range(count):
+        token = None if i == 0 else f"t{i}"
+        pages[token] = {"organizations": [{"id": i}], "next_page_token": f"t{i + 1}" if i + 1 < count else None}
+    return pages
+
+
+def main():
+    assert before("abc") == after("abc")
+
+    for name, encode in (("before", before), ("after", after)):
+        seconds = timeit.timeit(lambda: encode("abc"), number=ROUNDS)
+        print(f"{name:>6}: {seconds / ROUNDS * 1e6:7.2f} µs per page (params encoding)")
+
+    client = StubClient(make_pages(ROUNDS))
+    seconds = timeit.timeit(lambda: sum(1 for _ in client.list_all_organizations()), number=1)
+    print(f"list_all_organizations: {seconds / ROUNDS * 1e6:7.2f} µs per page of client overhead ({ROUNDS} pages)")
+
+
+if __name__ == "__main__":
+    main()
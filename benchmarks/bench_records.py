@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: memory and attribute access of typed records vs raw response dicts.
+
+Builds N organization records the way list_all_organizations returns them, once as the dicts
+from response.json() and once as affinity.records.Organization (typed_records=True).
+
+    python benchmarks/bench_records.py
+"""
+
+import timeit
+import tracemalloc
+
+from affinity.records import Organization
+
+COUNT = 100000
+
+
+def make_org(i):
+    return {
+        "id": i,
+        "name": f"Company {i}",
+        "domain": f"company{i}.com",
+        "domains": [f"company{i}.com"],
+        "crunchbase_uuid": None,
+        "global": False,
+        "person_ids": [],
+        "opportunity_ids": [],
+    }
+
+
+def measure(build):
+    tracemalloc.start()
+    records = [build(make_org(i)) for i in range(COUNT)]
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return records, size
+
+
+def main():
+    dicts, dict_bytes = measure(lambda org: org)
+    records, record_bytes = measure(Organization.from_dict)
+    print(f"  dicts: {dict_bytes / COUNT:7.0f} bytes per organization")
+    print(f"records: {record_bytes / COUNT:7.0f} bytes per organization")
+
+    d, r = dicts[0], records[0]
+    rounds = 1000000
+    print(f"  dict['name']: {timeit.timeit(lambda: d['name'], number=rounds) / rounds * 1e9:5.1f} ns")
+    print(f"  record.name:  {timeit.timeit(lambda: r.name, number=rounds) / rounds * 1e9:5.1f} ns")
+
+
+if __name__ == "__main__":
+    main()
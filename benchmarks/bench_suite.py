@@ -0,0 +1,177 @@
+"""
+Offline performance suite: the client against affinity.mock_server.MockAffinityServer.
+
+Each benchmark times one workload and asserts the number of API requests it needed, so a change
+that adds requests (an extra probe, a lost cache hit, a page too many) fails even where timings are
+noisy. Uses pytest-benchmark when installed, a minimal timer otherwise (see conftest.py):
+
+    python -m pytest benchmarks/bench_suite.py
+    python -m pytest benchmarks/bench_suite.py --benchmark-compare   # with pytest-benchmark
+"""
+
+import pytest
+
+from affinity.entity_cache import EntityTypeCache
+from affinity.export import export_lists
+from affinity.mock_server import ORGANIZATION_IDS, MockAffinityServer, generate_data
+from affinity.replay import RecordingTransport, ReplayTransport
+from affinity.rate_limit import RateLimiter
+from affinity.retry import RetryPolicy
+from affinity.upsert import upsert_organizations
+
+LATENCY = 0.001
+ORGANIZATIONS = 5000
+LIST_ENTRIES = 1000
+FIELDS = 8
+ENTITIES = 100  # entities touched by the per-entity workloads
+
+
+@pytest.fixture(scope="module")
+def server():
+    data = generate_data(persons=1000, organizations=ORGANIZATIONS, list_entries=LIST_ENTRIES, fields=FIELDS, field_values=4)
+    with MockAffinityServer(data, latency=LATENCY) as server:
+        yield server
+
+
+def counted(server, workload):
+    """Run `workload`, returning (its result, requests the server saw)."""
+    def run():
+        server.reset_counters()
+        result = workload()
+        return result, server.requests
+    return run
+
+
+# ---------- Pagination ----------
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_list_all_organizations(benchmark, server, stream):
+    client = server.client()
+    count, requests = benchmark(counted(server, lambda: sum(1 for _ in client.list_all_organizations(page_size=500, stream=stream))))
+    assert count == ORGANIZATIONS
+    assert requests == ORGANIZATIONS // 500
+
+
+def test_list_all_list_entries_prefetch(benchmark, server):
+    client = server.client()
+    count, requests = benchmark(counted(server, lambda: sum(1 for _ in client.list_all_list_entries(10, page_size=100, prefetch=2))))
+    assert count == LIST_ENTRIES
+    assert requests == LIST_ENTRIES // 100
+
+
+def test_pagination_with_429s(benchmark):
+    data = generate_data(organizations=2000)
+    with MockAffinityServer(data, latency=LATENCY, throttle_every=4) as server:
+        client = server.client(retry_policy=RetryPolicy(jitter=False, sleep=lambda seconds: None))
+        count, requests = benchmark(counted(server, lambda: sum(1 for _ in client.list_all_organizations(page_size=100))))
+    assert count == 2000
+    # 20 pages, and every 4th request answered 429 and retried
+    assert 20 < requests <= 27
+
+
+# ---------- Entity type probing ----------
+
+ORGANIZATION_ENTITY_IDS = [ORGANIZATION_IDS + i for i in range(ENTITIES)]
+
+
+def test_list_field_values_probing_cold(benchmark, server):
+    def workload():
+        client = server.client(entity_type_cache=EntityTypeCache())
+        return sum(len(client.list_field_values(entity_id)) for entity_id in ORGANIZATION_ENTITY_IDS)
+
+    values, requests = benchmark(counted(server, workload))
+    assert values == 4 * ENTITIES
+    # person_id is tried (404) before organization_id
+    assert requests == 2 * ENTITIES
+
+
+def test_list_field_values_probing_warm(benchmark, server):
+    client = server.client()
+    for entity_id in ORGANIZATION_ENTITY_IDS:
+        client.list_field_values(entity_id)
+
+    values, requests = benchmark(counted(server, lambda: sum(len(client.list_field_values(entity_id)) for entity_id in ORGANIZATION_ENTITY_IDS)))
+    assert values == 4 * ENTITIES
+    assert requests == ENTITIES
+
+
+# ---------- Writes ----------
+
+def test_set_field_value(benchmark, server):
+    client = server.client()
+    entity_ids = ORGANIZATION_ENTITY_IDS[:50]
+    field_ids = {entity_id: next(v["field_id"] for v in server.tables["field_values"].values() if v["entity_id"] == entity_id) for entity_id in entity_ids}
+
+    def workload():
+        for entity_id in entity_ids:
+            client.set_field_value(field_ids[entity_id], "benchmark", entity_id, entity_type=1)
+
+    _, requests = benchmark(counted(server, workload))
+    # One read and one update per entity
+    assert requests == 2 * len(entity_ids)
+
+
+def test_set_field_values_bulk(benchmark, server):
+    client = server.client()
+    entity_ids = ORGANIZATION_ENTITY_IDS[50:]
+    field_ids = [100 + i for i in range(FIELDS)]
+
+    def workload():
+        for entity_id in entity_ids:
+            client.set_field_values(entity_id, {field_id: "bulk" for field_id in field_ids}, entity_type=1)
+
+    benchmark.pedantic(counted(server, workload), rounds=1)
+    # Already-set values cost nothing on the next run: one read per entity
+    _, requests = counted(server, workload)()
+    assert requests == len(entity_ids)
+
+
+def test_bulk_upsert_organizations(benchmark):
+    rows = [{"name": f"Company {i}", "domain": f"company{i}.com"} for i in range(0, 1000, 2)]
+    rows += [{"name": f"New Co {i}", "domain": f"newco{i}.com"} for i in range(500)]
+
+    def setup():
+        server = MockAffinityServer(generate_data(organizations=1000), latency=LATENCY)
+        server.start()
+        return (server,), {}
+
+    def workload(server):
+        try:
+            return upsert_organizations(server.client(), rows, max_workers=8), server.requests
+        finally:
+            server.stop()
+
+    report, requests = benchmark.pedantic(workload, setup=setup, rounds=3)
+    assert report.counts == {"unchanged": 500, "created": 500}
+    # Index build (2 pages of 500) plus one create per new organization
+    assert requests == 2 + 500
+
+
+# ---------- Export ----------
+
+def test_export_lists(benchmark, server):
+    client = server.client()
+    budget = RateLimiter(limit=100_000)  # well above what the mock server can serve
+
+    def workload():
+        return export_lists(client, [10], lambda record: None, max_workers=16, rate_limiter=budget)["records"]
+
+    records, requests = benchmark(counted(server, workload))
+    assert records == LIST_ENTRIES
+    # /fields, the entry pages, one field value fetch per entry
+    assert requests == 1 + LIST_ENTRIES // 500 + LIST_ENTRIES
+
+
+# ---------- Replay ----------
+
+def test_replay_list_all_organizations(benchmark, server, tmp_path):
+    cassette = str(tmp_path / "organizations.jsonl")
+    recorder = server.client(transport=RecordingTransport(cassette))
+    recorded = list(recorder.list_all_organizations(page_size=500))
+    recorder.close()
+
+    def workload():
+        client = server.client(transport=ReplayTransport(cassette))
+        return list(client.list_all_organizations(page_size=500))
+
+    assert benchmark(workload) == recorded
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Benchmark: connections opened and wall time for concurrent requests, per transport.
+
+Runs THREADS threads sharing one AffinityClient against local mock servers that sleep
+HANDSHAKE_DELAY on every new connection, standing in for the TCP + TLS handshake with the
+real API, and answer each request after SERVER_LATENCY, so all threads really have a request
+in flight at once. Compared:
+
+  requests, stock pool (10)   - what AffinityClient used before: a connection returned while
+                                10 others sit idle is dropped and re-opened on a later request
+  requests, pool_maxsize=32   - RequestsTransport tuned to the thread count
+  httpx, HTTP/2               - HTTPXTransport multiplexing every request over one connection
+                                (h2c with prior knowledge here, since the mock server has no TLS)
+
+    python benchmarks/bench_transport.py
+
+Against localhost the client's own CPU time dominates, so the numbers show connection counts
+more than savings; over a real network each avoided handshake is a full round trip or two.
+"""
+
+import json
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from affinity.client import AffinityClient
+from affinity.retry import NO_RETRY
+from affinity.transport import HTTPXTransport, RequestsTransport
+
+THREADS = 32
+REQUESTS = 2000
+HANDSHAKE_DELAY = 0.05
+SERVER_LATENCY = 0.1
+BODY = json.dumps({"id": 1, "name": "Acme"}).encode()
+
+
+class Counter:
+    def __init__(self):
+        self.connections = 0
+        self.lock = threading.Lock()
+
+    def opened(self):
+        with self.lock:
+            self.connections += 1
+        time.sleep(HANDSHAKE_DELAY)
+
+
+class HTTP1Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        self.server.counter.opened()
+
+    def do_GET(self):
+        time.sleep(SERVER_LATENCY)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(BODY)))
+        self.end_headers()
+        self.wfile.write(BODY)
+
+    def log_message(self, *args):
+        pass
+
+
+def serve_http1(counter):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), HTTP1Handler)
+    server.daemon_threads = True
+    server.counter = counter
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def serve_h2(counter):
+    import h2.config
+    import h2.connection
+    import h2.events
+
+    listener = socket.socket()
+    listener.bind(("127.0.0.1", 0))
+    listener.listen(64)
+
+    def handle(sock):
+        counter.opened()
+        conn = h2.connection.H2Connection(h2.config.H2Configuration(client_side=False))
+        lock = threading.Lock()
+
+        def respond(stream_id):
+            with lock:
+                conn.send_headers(stream_id, [(":status", "200"), ("content-type", "application/json"), ("content-length", str(len(BODY)))])
+                conn.send_data(stream_id, BODY, end_stream=True)
+                sock.sendall(conn.data_to_send())
+
+        with lock:
+            conn.initiate_connection()
+            sock.sendall(conn.data_to_send())
+        while True:
+            data = sock.recv(65535)
+            if not data:
+                break
+            with lock:
+                for event in conn.receive_data(data):
+                    if isinstance(event, h2.events.RequestReceived):
+                        # Streams are answered independently, like a real server would
+                        threading.Timer(SERVER_LATENCY, respond, args=(event.stream_id,)).start()
+                sock.sendall(conn.data_to_send())
+        sock.close()
+
+    def accept():
+        while True:
+            sock, _ = listener.accept()
+            threading.Thread(target=handle, args=(sock,), daemon=True).start()
+
+    threading.Thread(target=accept, daemon=True).start()
+    return listener, f"http://127.0.0.1:{listener.getsockname()[1]}"
+
+
+def run(name, transport, serve):
+    counter = Counter()
+    server, base_url = serve(counter)
+    client = AffinityClient(api_key="bench", retry_policy=NO_RETRY, transport=transport)
+    client.base_url = base_url
+    started = time.perf_counter()
+    with ThreadPoolExecutor(THREADS) as pool:
+        list(pool.map(lambda i: client.get_organization(1), range(REQUESTS)))
+    seconds = time.perf_counter() - started
+    client.close()
+    print(f"{name:<28} {counter.connections:5d} connections  {seconds:6.2f}s  {REQUESTS / seconds:7.0f} req/s")
+
+
+def main():
+    import httpx
+
+    print(f"{REQUESTS} GETs from {THREADS} threads, {HANDSHAKE_DELAY * 1000:.0f} ms per new connection, {SERVER_LATENCY * 1000:.0f} ms per request")
+    run("requests, stock pool (10)", RequestsTransport(pool_maxsize=10), serve_http1)
+    run(f"requests, pool_maxsize={THREADS}", RequestsTransport(pool_maxsize=THREADS), serve_http1)
+    run("httpx, HTTP/2", HTTPXTransport(transport=httpx.AsyncHTTPTransport(http1=False, http2=True)), serve_h2)
+
+
+if __name__ == "__main__":
+    main()
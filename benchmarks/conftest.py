@@ -0,0 +1,44 @@
+import time
+
+import pytest
+
+try:
+    import pytest_benchmark  # noqa: F401
+except ImportError:
+    _results = []
+
+    class _Benchmark:
+        """Stand-in for pytest-benchmark's `benchmark` fixture when the plugin isn't installed."""
+
+        def __init__(self, name):
+            self.name = name
+
+        def __call__(self, fn, *args, **kwargs):
+            return self.pedantic(fn, args=args, kwargs=kwargs, rounds=3)
+
+        def pedantic(self, fn, args=(), kwargs=None, setup=None, rounds=1, iterations=1):
+            times = []
+            for _ in range(rounds):
+                if setup is not None:
+                    prepared = setup()
+                    if prepared is not None:
+                        args, kwargs = prepared
+                started = time.perf_counter()
+                for _ in range(iterations):
+                    result = fn(*args, **(kwargs or {}))
+                times.append((time.perf_counter() - started) / iterations)
+            _results.append((self.name, min(times), sum(times) / len(times), rounds))
+            return result
+
+    @pytest.fixture
+    def benchmark(request):
+        return _Benchmark(request.node.name)
+
+    def pytest_terminal_summary(terminalreporter):
+        if not _results:
+            return
+        terminalreporter.section("benchmarks (install pytest-benchmark for full statistics)")
+        width = max(len(name) for name, *_ in _results)
+        terminalreporter.write_line(f"{'name':<{width}}  {'min (ms)':>10}  {'mean (ms)':>10}  rounds")
+        for name, best, mean, rounds in _results:
+            terminalreporter.write_line(f"{name:<{width}}  {best * 1000:10.1f}  {mean * 1000:10.1f}  {rounds:6d}")
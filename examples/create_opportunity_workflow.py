@@ -8,43 +8,16 @@ API_KEY = os.getenv("AFFINITY_API_KEY")
 TARGET_DOMAIN = "positronic.vc"  # Replace by an actual domain
 LIST_ID = 263367  # Use the list ID of the list you want to add the opportunity to
 
-# Sample field configurations for the opportunity with various field types
-FIELD_CONFIG = {
-    "status": {
-        "field_id": 4707433,
-        "value_type": 7,  # Dropdown
-        "value": 19697139  # "Identified" option ID
-    },
-    "deal_owner": {
-        "field_id": 4707435,
-        "value_type": 0,  # Person
-        "value": 194355246  # Person ID
-    },
-    "current_deal_stage": {
-        "field_id": 5000141,
-        "value_type": 7,  # Dropdown
-        "value": 19060786  # "Stealth" 
-    },
-    "origination_serena": {
-        "field_id": 4707483,
-        "value_type": 2,  # Dropdown
-        "value": "Guillaume Decugis"  # Dropdown option text
-    },
-    "deal_fund": {
-        "field_id": 4707461,
-        "value_type": 2,  # Dropdown
-        "value": "Data Ventures II"  # Dropdown option text
-    },
-    "origin": {
-        "field_id": 4707487,
-        "value_type": 2,  # Dropdown
-        "value": "Serena Huntress"  # Dropdown option text
-    },
-    "fundraising_amount": {
-        "field_id": 4707434,
-        "value_type": 3,  # Number
-        "value": 2500000  # Amount in euros
-    }
+# Field values for the opportunity, by field name; dropdowns take the option text.
+# The client's field registry resolves names and options to the IDs the API expects.
+FIELD_VALUES = {
+    "Status": "Identified",                   # Ranked dropdown
+    "Deal Owner": 194355246,                  # Person ID
+    "Current Deal Stage": "Stealth",          # Ranked dropdown
+    "Origination Serena": "Guillaume Decugis",  # Dropdown
+    "Deal Fund": "Data Ventures II",          # Dropdown
+    "Origin": "Serena Huntress",              # Dropdown
+    "Fundraising Amount €": 2500000           # Number, in euros
 }
 
 client = AffinityClient(api_key=API_KEY)
@@ -54,11 +27,12 @@ def check_organization_exists(domain):
     print(f"🔍 Checking if organization exists for domain: {domain}")
     
     try:
-        result = client.list_organizations(term=domain)
-        organizations = result.get("organizations", [])
+        # Built once; lookups after that are local and the client keeps it current on writes
+        if client.organization_index is None:
+            client.build_organization_index()
+        org = client.organization_index.by_domain(domain)
         
-        if organizations:
-            org = organizations[0]  # Take the first match
+        if org:
             print(f"✅ Found existing organization: {org['name']} (ID: {org['id']})")
             return org
         else:
@@ -121,25 +95,26 @@ def create_opportunity_with_fields(org_id, org_name, list_id):
         list_entry_id = new_opportunity['list_entries'][0]['id']
         print(f"✅ List entry ID: {list_entry_id}")
         
-        # Step 3: Create field values
+        # Step 3: Set all field values with a single read and concurrent writes
         print("🔧 Setting custom field values...")
-        field_values_created = 0
+        if client.field_registry is None:
+            client.build_field_registry(list_ids=[list_id])
+        summary = client.set_field_values(
+            opportunity_id,
+            FIELD_VALUES,
+            entity_type=8,
+            list_entry_id=list_entry_id,
+            list_id=list_id
+        )
         
-        for field_name, config in FIELD_CONFIG.items():
-            try:
-                print(config["field_id"], config["value"], opportunity_id, list_entry_id)
-                result = client.set_field_value(
-                    field_id=config["field_id"],
-                    value=config["value"],
-                    entity_id=opportunity_id,
-                    list_entry_id=list_entry_id
-                )
-                print(f"   ✅ {field_name}: {config['value']}")
-                field_values_created += 1
-            except Exception as e:
-                print(f"   ❌ {field_name}: Error - {e}")
+        for field_name, value in FIELD_VALUES.items():
+            error = summary["errors"].get(client.field_registry.field_id(field_name, list_id))
+            if error:
+                print(f"   ❌ {field_name}: Error - {error}")
+            else:
+                print(f"   ✅ {field_name}: {value}")
         
-        print(f"✅ Created {field_values_created} field values")
+        print(f"✅ Created {len(summary['created'])}, updated {len(summary['updated'])}, unchanged {len(summary['unchanged'])} field values")
         
         return new_opportunity
         
@@ -183,7 +158,7 @@ def main():
         print(f"   Organization: {org_name} (ID: {org_id})")
         print(f"   Opportunity: {opportunity['name']} (ID: {opportunity['id']})")
         print(f"   List: {LIST_ID}")
-        print(f"   Custom fields set: {len(FIELD_CONFIG)}")
+        print(f"   Custom fields set: {len(FIELD_VALUES)}")
     else:
         print("\n❌ Workflow failed at opportunity creation step.")
 
@@ -12,15 +12,16 @@ client = AffinityClient(api_key=API_KEY)
 print(f"🔍 Listing fields for list ID: {LIST_ID}")
 
 try:
-    # Get the list details which includes the fields
-    list_details = client.get_list(LIST_ID)
+    # One load of all field metadata (plus this list's details); lookups after that are local
+    registry = client.build_field_registry(list_ids=[LIST_ID])
+    list_details = registry.lists[LIST_ID]
     
     print(f"📋 List: {list_details.get('name', 'Unknown')} (ID: {LIST_ID})")
     print(f"   📝 Description: {list_details.get('description', 'No description')}")
     print()
     
-    # Get fields from the list response
-    fields = list_details.get("fields", [])
+    # Fields of the list, as indexed by the registry
+    fields = registry.fields(LIST_ID)
     
     if fields:
         print(f"📊 Found {len(fields)} fields for list {LIST_ID}:")
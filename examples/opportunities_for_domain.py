@@ -12,8 +12,13 @@ client = AffinityClient(api_key=API_KEY)
 
 print(f"🔍 Searching for organizations with domain: {TARGET_DOMAIN}")
 try:
-    result = client.list_organizations(term=TARGET_DOMAIN)
-    organizations = result.get("organizations", [])
+    if client.organization_index is not None:
+        # Exact domain match from an already built local index, without a request
+        org = client.organization_index.by_domain(TARGET_DOMAIN)
+        organizations = [org] if org else []
+    else:
+        result = client.list_organizations(term=TARGET_DOMAIN)
+        organizations = result.get("organizations", [])
     
     if organizations:
         print(f"✅ Found {len(organizations)} organization(s) with domain '{TARGET_DOMAIN}'")
@@ -36,13 +41,12 @@ try:
                         for opportunity in opportunities:
                             print(f"      💼 {opportunity['name']} (ID: {opportunity['id']})")
                     else:
-                        # Fallback: fetch opportunities individually if not included
-                        for opp_id in opportunity_ids:
-                            try:
-                                opportunity = client.get_opportunity(opp_id)
-                                print(f"      💼 {opportunity['name']} (ID: {opp_id})")
-                            except Exception as e:
-                                print(f"      ❌ Error retrieving opportunity {opp_id}: {e}")
+                        # Fallback: fetch opportunities concurrently if not included
+                        for fetched in client.get_opportunities_many(opportunity_ids):
+                            if fetched.ok:
+                                print(f"      💼 {fetched.result['name']} (ID: {fetched.id})")
+                            else:
+                                print(f"      ❌ Error retrieving opportunity {fetched.id}: {fetched.error}")
                     
                     print(f"   📊 Total opportunities: {len(opportunity_ids)}")
                 else:
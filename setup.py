@@ -13,9 +13,22 @@ setup(
         "pydantic[email]>=2.0.0",
     ],
     extras_require={
+        "async": [
+            "httpx>=0.23.0",
+        ],
+        "http2": [
+            "httpx[http2]>=0.23.0",
+        ],
+        "otel": [
+            "opentelemetry-api>=1.0.0",
+        ],
+        "arrow": [
+            "pyarrow>=10.0.0",
+        ],
         "dev": [
             "pytest>=6.0.0",
             "responses>=0.13.0",
+            "httpx>=0.23.0",
         ],
     },
     classifiers=[
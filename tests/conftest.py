@@ -0,0 +1,21 @@
+import pytest
+
+
+class FakeClock:
+    """Manually advanced clock; sleep() records the wait and moves the clock forward."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
@@ -0,0 +1,316 @@
+import asyncio
+import json
+import pytest
+
+httpx = pytest.importorskip("httpx")
+
+from affinity.async_client import AsyncAffinityClient
+from affinity.auth import basic_auth_header
+from affinity.exceptions import AffinityAPIError
+from affinity.retry import NO_RETRY, RetryPolicy
+
+
+def make_client(handler, **kwargs):
+    return AsyncAffinityClient(api_key="test", transport=httpx.MockTransport(handler), **kwargs)
+
+
+def test_get_organization():
+    def handler(request):
+        assert request.url.path == "/organizations/456"
+        assert request.url.params["with_opportunities"] == "true"
+        return httpx.Response(200, json={"id": 456, "name": "Serena Capital"})
+
+    async def run():
+        async with make_client(handler) as client:
+            return await client.get_organization(456, with_opportunities=True)
+
+    result = asyncio.run(run())
+    assert result["name"] == "Serena Capital"
+
+
+def test_create_person_sends_json_body():
+    def handler(request):
+        assert request.method == "POST"
+        body = json.loads(request.content)
+        assert body["emails"] == ["new.person@example.com"]
+        return httpx.Response(200, json={"id": 321})
+
+    async def run():
+        async with make_client(handler) as client:
+            return await client.create_person("New", "Person", ["new.person@example.com"])
+
+    assert asyncio.run(run())["id"] == 321
+
+
+def test_list_all_organizations():
+    pages = {
+        None: {"organizations": [{"id": 1}], "next_page_token": "next1"},
+        "next1": {"organizations": [{"id": 2}], "next_page_token": None},
+    }
+
+    def handler(request):
+        return httpx.Response(200, json=pages[request.url.params.get("page_token")])
+
+    async def run(prefetch):
+        async with make_client(handler) as client:
+            return [org["id"] async for org in client.list_all_organizations(prefetch=prefetch)]
+
+    assert asyncio.run(run(0)) == [1, 2]
+    assert asyncio.run(run(2)) == [1, 2]
+
+
+def test_list_field_values_probes_entity_types():
+    def handler(request):
+        if "opportunity_id" in request.url.params:
+            return httpx.Response(200, json={"field_values": [{"id": 7}]})
+        return httpx.Response(404, json={"error": "not found"})
+
+    async def run():
+        async with make_client(handler) as client:
+            return await client.list_field_values(123)
+
+    assert asyncio.run(run())["field_values"][0]["id"] == 7
+
+
+def test_probing_stops_on_server_errors():
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(503, text="unavailable")
+
+    async def run():
+        async with make_client(handler, retry_policy=NO_RETRY) as client:
+            await client.list_field_values(123)
+
+    with pytest.raises(AffinityAPIError):
+        asyncio.run(run())
+    assert len(requests) == 1
+
+
+def test_api_error_raises():
+    def handler(request):
+        return httpx.Response(500, text="boom")
+
+    async def run():
+        async with make_client(handler, retry_policy=NO_RETRY) as client:
+            await client.whoami()
+
+    with pytest.raises(Exception) as excinfo:
+        asyncio.run(run())
+    assert "Affinity API error 500" in str(excinfo.value)
+
+
+def test_concurrency_is_bounded():
+    in_flight = 0
+    peak = 0
+
+    async def handler(request):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return httpx.Response(200, json={"id": int(request.url.path.rsplit("/", 1)[-1])})
+
+    async def run():
+        async with make_client(handler, max_concurrency=3) as client:
+            return await asyncio.gather(*(client.get_person(i) for i in range(20)))
+
+    results = asyncio.run(run())
+    assert [r["id"] for r in results] == list(range(20))
+    assert peak <= 3
+
+
+def test_retries_transient_errors():
+    statuses = [503, 502, 200]
+
+    def handler(request):
+        status = statuses.pop(0)
+        return httpx.Response(status, json={"id": 1} if status == 200 else {"error": "unavailable"})
+
+    async def run():
+        async with make_client(handler, retry_policy=RetryPolicy(backoff_factor=0)) as client:
+            return await client.whoami()
+
+    assert asyncio.run(run())["id"] == 1
+    assert statuses == []
+
+
+def test_get_opportunities_many():
+    def handler(request):
+        opp_id = int(request.url.path.rsplit("/", 1)[-1])
+        if opp_id == 2:
+            return httpx.Response(404, json={"message": "not found"})
+        return httpx.Response(200, json={"id": opp_id})
+
+    async def run():
+        async with make_client(handler) as client:
+            ordered = await client.get_opportunities_many([1, 2, 1, 3])
+            completed = [r async for r in client.get_opportunities_many([1, 3], as_completed=True)]
+            return ordered, completed
+
+    ordered, completed = asyncio.run(run())
+    assert [r.id for r in ordered] == [1, 2, 3]
+    assert not ordered[1].ok
+    assert sorted(r.id for r in completed) == [1, 3]
+
+
+def test_set_field_values():
+    calls = []
+
+    def handler(request):
+        calls.append(request.method)
+        if request.method == "GET":
+            return httpx.Response(200, json=[{"id": 1, "field_id": 10, "value": "Active"}])
+        return httpx.Response(200, json={"id": 2})
+
+    async def run():
+        async with make_client(handler) as client:
+            return await client.set_field_values(555, {10: "Active", 11: 3}, entity_type=8)
+
+    summary = asyncio.run(run())
+    assert summary["unchanged"] == [10]
+    assert summary["created"] == [{"id": 2}]
+    assert calls == ["GET", "POST"]
+
+
+def test_set_field_values_propagates_read_errors():
+    calls = []
+
+    def handler(request):
+        calls.append(request.method)
+        return httpx.Response(500, text="boom")
+
+    async def run():
+        async with make_client(handler, retry_policy=NO_RETRY) as client:
+            await client.set_field_values(555, {10: "x"}, entity_type=8)
+
+    with pytest.raises(AffinityAPIError):
+        asyncio.run(run())
+    assert calls == ["GET"]
+
+
+def test_list_all_list_entries_stream():
+    pages = {
+        None: {"list_entries": [{"id": 1}], "next_page_token": "next1"},
+        "next1": {"list_entries": [{"id": 2}], "next_page_token": None},
+    }
+
+    def handler(request):
+        return httpx.Response(200, json=pages[request.url.params.get("page_token")])
+
+    async def run():
+        async with make_client(handler) as client:
+            return [e["id"] async for e in client.list_all_list_entries(101, stream=True)]
+
+    assert asyncio.run(run()) == [1, 2]
+
+
+def test_async_build_organization_index():
+    def handler(request):
+        return httpx.Response(200, json={"organizations": [{"id": 1, "name": "Acme", "domain": "acme.com"}], "next_page_token": None})
+
+    async def run():
+        async with make_client(handler) as client:
+            index = await client.build_organization_index()
+            assert client.organization_index is index
+            return index.by_domain("acme.com")
+
+    assert asyncio.run(run())["id"] == 1
+
+
+def test_async_resolve_emails():
+    def handler(request):
+        assert request.url.params["term"] == "ada@acme.com"
+        return httpx.Response(200, json={"persons": [{"id": 1, "emails": ["ada@acme.com"]}]})
+
+    async def run():
+        async with make_client(handler) as client:
+            return await client.resolve_emails(["Ada@Acme.com", "ada@acme.com"])
+
+    resolved = asyncio.run(run())
+    assert resolved["Ada@Acme.com"]["id"] == 1 and resolved["ada@acme.com"]["id"] == 1
+
+
+def test_async_typed_records():
+    def handler(request):
+        return httpx.Response(200, json={"persons": [{"id": 1, "first_name": "Ada"}], "next_page_token": None})
+
+    async def run():
+        async with make_client(handler, typed_records=True) as client:
+            return [person.first_name async for person in client.list_all_persons(stream=True)]
+
+    assert asyncio.run(run()) == ["Ada"]
+
+
+def test_key_pool_failover():
+    seen = []
+
+    def handler(request):
+        seen.append(request.headers["Authorization"])
+        if len(seen) == 1:
+            return httpx.Response(429, json={"message": "Too many requests"}, headers={"Retry-After": "30"})
+        return httpx.Response(200, json={"id": 1})
+
+    async def run():
+        async with AsyncAffinityClient(api_key=["a", "b"], transport=httpx.MockTransport(handler)) as client:
+            return await client.get_organization(1)
+
+    assert asyncio.run(run())["id"] == 1
+    assert seen == [basic_auth_header("a"), basic_auth_header("b")]
+
+
+def test_hooks_collect_metrics():
+    from affinity.instrumentation import MetricsCollector
+
+    def handler(request):
+        return httpx.Response(200, json={"id": 456})
+
+    metrics = MetricsCollector()
+
+    async def run():
+        async with make_client(handler, hooks=[metrics]) as client:
+            await client.get_organization(456)
+
+    asyncio.run(run())
+    assert metrics.snapshot()["GET /organizations/{id}"]["statuses"] == {"200": 1}
+
+
+def test_field_registry_resolves_names():
+    posted = []
+
+    def handler(request):
+        if request.url.path == "/fields":
+            return httpx.Response(200, json=[{"id": 10, "name": "Status", "value_type": 7, "dropdown_options": [{"id": 77, "text": "Identified"}]}])
+        if request.url.path == "/field-values" and request.method == "GET":
+            return httpx.Response(200, json=[])
+        posted.append(json.loads(request.content))
+        return httpx.Response(200, json={"id": 1})
+
+    async def run():
+        async with make_client(handler) as client:
+            await client.build_field_registry()
+            return await client.set_field_value("status", "identified", 555, entity_type=8)
+
+    assert asyncio.run(run()) == {"id": 1}
+    assert posted == [{"field_id": 10, "value": 77, "entity_id": 555}]
+
+
+def test_base_url_and_sync_close():
+    def handler(request):
+        assert str(request.url) == "http://localhost:8080/organizations/1"
+        return httpx.Response(200, json={"id": 1})
+
+    client = make_client(handler, base_url="http://localhost:8080/")
+    with pytest.raises(TypeError):
+        client.close()
+    with pytest.raises(TypeError):
+        with client:
+            pass
+
+    async def run():
+        async with client:
+            return await client.get_organization(1)
+
+    assert asyncio.run(run()) == {"id": 1}
@@ -0,0 +1,47 @@
+import responses
+from affinity.client import AffinityClient
+from affinity.exceptions import AffinityAPIError
+from affinity.retry import NO_RETRY
+
+
+@responses.activate
+def test_get_opportunities_many_keeps_order_and_collapses_duplicates():
+    for opp_id in (1, 2, 3):
+        responses.add(
+            responses.GET,
+            f"https://api.affinity.co/opportunities/{opp_id}",
+            json={"id": opp_id, "name": f"Deal {opp_id}"},
+            status=200,
+        )
+    client = AffinityClient(api_key="test")
+    results = client.get_opportunities_many([3, 1, 3, 2, 1])
+    assert [r.id for r in results] == [3, 1, 2]
+    assert [r.result["id"] for r in results] == [3, 1, 2]
+    assert all(r.ok for r in results)
+    assert len(responses.calls) == 3
+
+
+@responses.activate
+def test_get_organizations_many_captures_errors_per_id():
+    responses.add(responses.GET, "https://api.affinity.co/organizations/1", json={"id": 1}, status=200)
+    responses.add(responses.GET, "https://api.affinity.co/organizations/2", json={"message": "not found"}, status=404)
+    client = AffinityClient(api_key="test", retry_policy=NO_RETRY)
+    ok, missing = client.get_organizations_many([1, 2])
+    assert ok.result["id"] == 1
+    assert not missing.ok
+    assert isinstance(missing.error, AffinityAPIError)
+    assert missing.error.status_code == 404
+
+
+@responses.activate
+def test_get_persons_many_as_completed_passes_params():
+    for person_id in (10, 20):
+        responses.add(
+            responses.GET,
+            f"https://api.affinity.co/persons/{person_id}?with_opportunities=true",
+            json={"id": person_id},
+            status=200,
+        )
+    client = AffinityClient(api_key="test")
+    results = client.get_persons_many([10, 20], as_completed=True, with_opportunities=True)
+    assert sorted(r.result["id"] for r in results) == [10, 20]
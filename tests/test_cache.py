@@ -0,0 +1,83 @@
+import responses
+from affinity.client import AffinityClient
+from affinity.cache import ResponseCache, SQLiteCache
+
+
+def make_client(clock, backend=None):
+    cache = ResponseCache(backend=backend, clock=clock)
+    return AffinityClient(api_key="test", cache=cache)
+
+
+@responses.activate
+def test_metadata_responses_are_served_from_cache_until_ttl(clock):
+    responses.add(responses.GET, "https://api.affinity.co/lists", json={"lists": [{"id": 1}]}, status=200)
+    client = make_client(clock)
+    assert client.list_lists() == {"lists": [{"id": 1}]}
+    assert client.list_lists() == {"lists": [{"id": 1}]}
+    assert len(responses.calls) == 1
+
+    clock.now += 301
+    client.list_lists()
+    assert len(responses.calls) == 2
+    # The first read found nothing cached, the last one an expired entry
+    assert (client.cache.hits, client.cache.misses) == (1, 2)
+
+
+@responses.activate
+def test_cached_results_cannot_be_mutated_by_callers(clock):
+    responses.add(responses.GET, "https://api.affinity.co/fields/42", json={"id": 42, "name": "Stage"}, status=200)
+    client = make_client(clock)
+    client.get_field(42)["name"] = "changed"
+    assert client.get_field(42)["name"] == "Stage"
+
+
+@responses.activate
+def test_query_params_are_part_of_the_key(clock):
+    responses.add(responses.GET, "https://api.affinity.co/fields?list_id=1", json={"fields": [{"id": 1}]}, status=200)
+    responses.add(responses.GET, "https://api.affinity.co/fields?list_id=2", json={"fields": [{"id": 2}]}, status=200)
+    client = make_client(clock)
+    assert client.list_fields(list_id=1)["fields"][0]["id"] == 1
+    assert client.list_fields(list_id=2)["fields"][0]["id"] == 2
+
+
+@responses.activate
+def test_uncached_endpoints_always_hit_the_api(clock):
+    responses.add(responses.GET, "https://api.affinity.co/persons/1", json={"id": 1}, status=200)
+    client = make_client(clock)
+    client.get_person(1)
+    client.get_person(1)
+    assert len(responses.calls) == 2
+
+
+@responses.activate
+def test_writes_invalidate_the_resource(clock):
+    responses.add(responses.GET, "https://api.affinity.co/lists/101", json={"id": 101, "fields": []}, status=200)
+    responses.add(responses.POST, "https://api.affinity.co/fields", json={"id": 7}, status=200)
+    client = make_client(clock)
+    client.get_list(101)
+    client.create_field(name="Stage", entity_type=8, value_type=7, list_id=101)
+    client.get_list(101)
+    assert [call.request.method for call in responses.calls] == ["GET", "POST", "GET"]
+
+
+@responses.activate
+def test_stale_entry_is_revalidated_with_etag(clock):
+    responses.add(responses.GET, "https://api.affinity.co/auth/whoami", json={"id": 1}, status=200, headers={"ETag": '"v1"'})
+    responses.add(responses.GET, "https://api.affinity.co/auth/whoami", status=304)
+    client = make_client(clock)
+    client.whoami()
+    clock.now += 3601
+    assert client.whoami() == {"id": 1}
+    assert responses.calls[1].request.headers["If-None-Match"] == '"v1"'
+    assert client.cache.revalidations == 1
+
+
+@responses.activate
+def test_sqlite_backend_persists_between_clients(tmp_path, clock):
+    responses.add(responses.GET, "https://api.affinity.co/lists", json={"lists": [{"id": 1}]}, status=200)
+    path = str(tmp_path / "cache.sqlite")
+    first = make_client(clock, SQLiteCache(path))
+    first.list_lists()
+    second = make_client(clock, SQLiteCache(path))
+    assert second.list_lists() == {"lists": [{"id": 1}]}
+    assert len(responses.calls) == 1
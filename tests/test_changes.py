@@ -0,0 +1,96 @@
+import json
+import pytest
+import responses
+from affinity.changes import ChangeCheckpoint, ChangeFeed
+from affinity.client import AffinityClient
+from affinity.mock_server import CHANGE_CREATED, CHANGE_UPDATED, LIST_ENTRY_IDS, ORGANIZATION_IDS, MockAffinityServer, generate_data
+from affinity.retry import NO_RETRY
+
+FIELD_A, FIELD_B = 100, 101
+
+
+@pytest.fixture
+def server():
+    with MockAffinityServer(generate_data(organizations=10, list_entries=10, fields=2)) as server:
+        yield server
+
+
+def write_values(client, entity_ids, field_id, value):
+    for entity_id in entity_ids:
+        client.set_field_value(field_id, value, entity_id, entity_type=1, list_entry_id=LIST_ENTRY_IDS + entity_id - ORGANIZATION_IDS)
+
+
+def test_incremental_runs(server, tmp_path):
+    client = server.client()
+    path = str(tmp_path / "changes.json")
+    write_values(client, [ORGANIZATION_IDS, ORGANIZATION_IDS + 1], FIELD_A, "one")
+    write_values(client, [ORGANIZATION_IDS], FIELD_B, "two")
+
+    seen = []
+    stats = ChangeFeed(client, [FIELD_A, FIELD_B], checkpoint=path).run(seen.append)
+    assert stats["changes"] == 3 and stats["errors"] == {}
+    assert sorted(c["field_id"] for c in seen) == [FIELD_A, FIELD_A, FIELD_B]
+    with open(path) as f:
+        marks = json.load(f)["fields"]
+    assert set(marks) == {str(FIELD_A), str(FIELD_B)}
+
+    # Nothing new: nothing delivered
+    seen.clear()
+    stats = ChangeFeed(client, [FIELD_A, FIELD_B], checkpoint=path).run(seen.append)
+    assert seen == [] and stats["skipped"] == 3
+
+    write_values(client, [ORGANIZATION_IDS], FIELD_A, "three")
+    stats = ChangeFeed(client, [FIELD_A, FIELD_B], checkpoint=path).run(seen.append)
+    assert [(c["action_type"], c["value"]) for c in seen] == [(CHANGE_UPDATED, "three")]
+
+
+def test_entities_deduplicated(server):
+    client = server.client()
+    write_values(client, [ORGANIZATION_IDS, ORGANIZATION_IDS + 1], FIELD_A, "x")
+    # The organization and its list entry both answer with the same change
+    feed = ChangeFeed(client, [FIELD_A], entity_ids=[ORGANIZATION_IDS, LIST_ENTRY_IDS, ORGANIZATION_IDS + 1], max_workers=3)
+    changes = list(feed)
+    assert [c["action_type"] for c in changes] == [CHANGE_CREATED, CHANGE_CREATED]
+    assert changes[0]["id"] < changes[1]["id"]
+    assert feed.duplicates == 1
+
+
+def test_iterate_then_commit(server):
+    client = server.client()
+    write_values(client, [ORGANIZATION_IDS, ORGANIZATION_IDS + 1, ORGANIZATION_IDS + 2], FIELD_A, "x")
+    checkpoint = ChangeCheckpoint()
+
+    feed = ChangeFeed(client, [FIELD_A], checkpoint=checkpoint)
+    for change in feed:
+        break  # stopped after processing only the first change
+    feed.commit()
+    # The change being processed when iteration stopped isn't committed: delivered again
+    assert len(list(ChangeFeed(client, [FIELD_A], checkpoint=checkpoint))) == 3
+
+    feed = ChangeFeed(client, [FIELD_A], checkpoint=checkpoint)
+    assert len(list(feed)) == 3
+    feed.commit()
+    assert list(ChangeFeed(client, [FIELD_A], checkpoint=checkpoint)) == []
+
+
+@responses.activate
+def test_failed_query_holds_field_back():
+    responses.add(responses.GET, "https://api.affinity.co/field-value-changes?field_id=1&organization_id=10", json=[{"id": 5, "field_id": 1}], status=200)
+    responses.add(responses.GET, "https://api.affinity.co/field-value-changes?field_id=1&organization_id=11", json={"message": "boom"}, status=500)
+    responses.add(responses.GET, "https://api.affinity.co/field-value-changes?field_id=2&organization_id=10", json=[{"id": 6, "field_id": 2}], status=200)
+    responses.add(responses.GET, "https://api.affinity.co/field-value-changes?field_id=2&organization_id=11", json=[], status=200)
+
+    client = AffinityClient(api_key="test", retry_policy=NO_RETRY)
+    checkpoint = ChangeCheckpoint()
+    seen = []
+    stats = ChangeFeed(client, [1, 2], entity_ids=[10, 11], entity_type=1, checkpoint=checkpoint).run(seen.append)
+    assert [c["id"] for c in seen] == [6]
+    assert list(stats["errors"]) == [1]
+    assert checkpoint.marks == {2: 6}
+
+
+@responses.activate
+def test_list_field_value_changes_without_entity():
+    responses.add(responses.GET, "https://api.affinity.co/field-value-changes?field_id=7", json=[{"id": 1, "field_id": 7}], status=200)
+    client = AffinityClient(api_key="test")
+    assert client.list_field_value_changes(7) == [{"id": 1, "field_id": 7}]
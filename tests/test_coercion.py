@@ -0,0 +1,112 @@
+import json
+import pytest
+import responses
+from datetime import date, datetime
+from affinity.client import AffinityClient
+from affinity.coercion import CoercionError, coerce_field_values
+from affinity.field_registry import FieldRegistry
+from affinity.indexes import OrganizationIndex, PersonIndex
+
+FIELDS = [
+    {"id": 1, "name": "Owner", "value_type": 0, "allows_multiple": False},
+    {"id": 2, "name": "Investors", "value_type": 1, "allows_multiple": True},
+    {"id": 3, "name": "Fund", "value_type": 2, "allows_multiple": False, "dropdown_options": [{"id": 30, "text": "Fund I"}, {"id": 31, "text": "Fund II"}]},
+    {"id": 4, "name": "Amount", "value_type": 3, "allows_multiple": False},
+    {"id": 5, "name": "Close Date", "value_type": 4, "allows_multiple": False},
+    {"id": 6, "name": "HQ", "value_type": 5, "allows_multiple": False},
+    {"id": 7, "name": "Notes", "value_type": 6, "allows_multiple": False},
+    {"id": 8, "name": "Status", "value_type": 7, "allows_multiple": False, "dropdown_options": [{"id": 80, "text": "Identified"}, {"id": 81, "text": "Qualified"}]},
+]
+
+
+@pytest.fixture
+def registry():
+    registry = FieldRegistry()
+    registry.load(FIELDS)
+    return registry
+
+
+def test_encodes_each_value_type(registry):
+    report = coerce_field_values(registry, [{
+        "Owner": "42",
+        "Investors": [7, {"id": 8}],
+        "Fund": "fund ii",
+        "Amount": "2,500,000",
+        "Close Date": date(2025, 3, 31),
+        "HQ": {"city": "Paris", "country": "France"},
+        "Notes": 12.5,
+        "Status": {"text": "Qualified"},
+    }])
+    assert report.rejects == []
+    assert report.rows == [{
+        1: 42,
+        2: [7, 8],
+        3: "Fund II",
+        4: 2500000,
+        5: "2025-03-31",
+        6: {"street_address": None, "city": "Paris", "state": None, "country": "France", "continent": None},
+        7: "12.5",
+        8: 81,
+    }]
+
+
+def test_reports_every_reject(registry):
+    rows = [
+        {"Amount": 10, "Close Date": "2025-01-01T09:30:00Z", "Status": 80},
+        {"Amount": "ten", "Close Date": "31/01/2025", "Status": "Lost"},
+        {"Owner": [1, 2], "HQ": "Paris", "Nope": 1, "Notes": None},
+        {"Amount": float("nan"), 999: "passes through"},
+    ]
+    report = coerce_field_values(registry, rows)
+    assert [(r.row, r.field) for r in report.rejects] == [
+        (1, "Amount"), (1, "Close Date"), (1, "Status"),
+        (2, "Owner"), (2, "HQ"), (2, "Nope"),
+        (3, "Amount"),
+    ]
+    assert report.rows[0] == {4: 10, 5: "2025-01-01T09:30:00+00:00", 8: 80}
+    assert report.rows[2] == {7: None}
+    assert report.rows[3] == {999: "passes through"}
+    assert [i for i, _ in report.valid] == [0]
+    with pytest.raises(CoercionError) as exc_info:
+        report.raise_for_rejects()
+    assert len(exc_info.value.rejects) == 7
+
+
+def test_references_through_indexes(registry):
+    persons = PersonIndex([{"id": 5, "emails": ["ada@acme.com"]}])
+    organizations = OrganizationIndex([{"id": 9, "name": "Acme", "domain": "acme.com"}])
+    report = coerce_field_values(registry, [{"Owner": "Ada@Acme.com", "Investors": ["www.acme.com", "globex.com"]}], person_index=persons, organization_index=organizations)
+    assert report.rows[0] == {1: 5}
+    assert [r.reason for r in report.rejects] == ["no organization with this domain"]
+
+
+@responses.activate
+def test_set_field_values_rejects_before_any_request():
+    responses.add(responses.GET, "https://api.affinity.co/fields", json=FIELDS, status=200)
+    client = AffinityClient(api_key="test")
+    client.build_field_registry()
+    with pytest.raises(CoercionError) as exc_info:
+        client.set_field_values(555, {"Amount": "lots", "Close Date": datetime(2025, 1, 1), "Status": "Lost"}, entity_type=8)
+    assert [r.field for r in exc_info.value.rejects] == ["Amount", "Status"]
+    assert len(responses.calls) == 1  # only the /fields load
+
+
+@responses.activate
+def test_client_coerce_builds_registry():
+    responses.add(responses.GET, "https://api.affinity.co/fields", json=FIELDS, status=200)
+    client = AffinityClient(api_key="test")
+    report = client.coerce_field_values([{"Amount": 1}, {"Amount": "x"}])
+    assert client.field_registry is not None
+    assert report.rows == [{4: 1}, {}]
+    assert report.rejected_rows == {1}
+
+
+@responses.activate
+def test_set_field_values_resolves_through_client_indexes():
+    responses.add(responses.GET, "https://api.affinity.co/fields", json=FIELDS, status=200)
+    responses.add(responses.GET, "https://api.affinity.co/field-values?opportunity_id=555", json=[], status=200)
+    responses.add(responses.POST, "https://api.affinity.co/field-values", json={"id": 1}, status=200)
+    client = AffinityClient(api_key="test", person_index=PersonIndex([{"id": 5, "emails": ["ada@acme.com"]}]))
+    client.build_field_registry()
+    client.set_field_values(555, {"Owner": "ada@acme.com"}, entity_type=8)
+    assert json.loads(responses.calls[-1].request.body) == {"field_id": 1, "value": 5, "entity_id": 555}
@@ -0,0 +1,95 @@
+import pytest
+import responses
+from responses import matchers
+from affinity.client import AffinityClient
+from affinity.entity_cache import EntityTypeCache
+from affinity.exceptions import AffinityAPIError
+from affinity.retry import NO_RETRY
+
+
+def add_field_values(param_name, entity_id, status=200):
+    responses.add(
+        responses.GET,
+        "https://api.affinity.co/field-values",
+        match=[matchers.query_param_matcher({param_name: str(entity_id)})],
+        json={"field_values": [{"id": 1}]} if status == 200 else {"message": "not found"},
+        status=status,
+    )
+
+
+@responses.activate
+def test_second_lookup_skips_failed_probes():
+    add_field_values("person_id", 123, status=404)
+    add_field_values("organization_id", 123, status=404)
+    add_field_values("opportunity_id", 123)
+    client = AffinityClient(api_key="test")
+
+    client.list_field_values(123)
+    assert len(responses.calls) == 3
+
+    client.list_field_values(123)
+    assert len(responses.calls) == 4
+    assert responses.calls[-1].request.params == {"opportunity_id": "123"}
+
+    stats = client.entity_type_cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["failed_probes"] == 2
+    assert stats["saved_probes"] == 2
+
+
+@responses.activate
+def test_stale_entry_falls_back_to_probing():
+    add_field_values("person_id", 5)
+    cache = EntityTypeCache()
+    cache.set(5, "organization_id")
+    add_field_values("organization_id", 5, status=404)
+    client = AffinityClient(api_key="test", entity_type_cache=cache)
+
+    assert client.list_field_values(5)["field_values"][0]["id"] == 1
+    assert cache.get(5) == "person_id"
+
+
+@responses.activate
+def test_server_errors_are_not_probe_misses():
+    add_field_values("organization_id", 5, status=500)
+    cache = EntityTypeCache()
+    cache.set(5, "organization_id")
+    client = AffinityClient(api_key="test", entity_type_cache=cache, retry_policy=NO_RETRY)
+
+    with pytest.raises(AffinityAPIError) as exc_info:
+        client.list_field_values(5)
+    assert exc_info.value.status_code == 500
+    # No other entity type was tried and the mapping survives
+    assert len(responses.calls) == 1
+    assert cache.get(5) == "organization_id"
+    assert cache.stats()["failed_probes"] == 0
+
+
+@responses.activate
+def test_explicit_entity_type_populates_cache():
+    add_field_values("organization_id", 77)
+    client = AffinityClient(api_key="test")
+    client.list_field_values(77, entity_type=1)
+    assert client.entity_type_cache.get(77) == "organization_id"
+
+
+def test_lru_eviction():
+    cache = EntityTypeCache(maxsize=2)
+    cache.set(1, "person_id")
+    cache.set(2, "organization_id")
+    cache.get(1)
+    cache.set(3, "opportunity_id")
+    assert cache.get(2) is None
+    assert cache.get(1) == "person_id"
+    assert len(cache) == 2
+
+
+def test_persistence(tmp_path):
+    path = str(tmp_path / "entity_types.json")
+    cache = EntityTypeCache(path=path)
+    cache.set(42, "list_entry_id")
+    cache.save()
+
+    reloaded = EntityTypeCache(path=path)
+    assert reloaded.get(42) == "list_entry_id"
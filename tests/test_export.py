@@ -0,0 +1,82 @@
+import pytest
+import responses
+
+pa = pytest.importorskip("pyarrow")
+
+from affinity.client import AffinityClient
+from affinity.export import ListExporter, export_list
+
+FIELDS = [
+    {"id": 1, "name": "Status", "value_type": 7, "allows_multiple": False, "list_id": 9},
+    {"id": 2, "name": "Amount", "value_type": 3, "allows_multiple": False, "list_id": 9},
+    {"id": 3, "name": "Owners", "value_type": 0, "allows_multiple": True, "list_id": 9},
+    {"id": 4, "name": "Closed", "value_type": 4, "allows_multiple": False, "list_id": 9},
+    {"id": 5, "name": "HQ", "value_type": 5, "allows_multiple": False, "list_id": 9},
+]
+
+
+def mock_list():
+    responses.add(responses.GET, "https://api.affinity.co/fields", json=FIELDS, status=200)
+    responses.add(responses.GET, "https://api.affinity.co/lists/9/list-entries", json={"list_entries": [
+        {"id": 100, "entity_id": 10, "entity_type": 8, "created_at": "2024-01-02T03:04:05Z", "entity": {"id": 10, "name": "Series A"}},
+        {"id": 101, "entity_id": 11, "entity_type": 8, "created_at": "2024-02-02T00:00:00Z", "entity": {"id": 11, "name": "Seed"}},
+        {"id": 102, "entity_id": 12, "entity_type": 8, "created_at": "2024-03-02T00:00:00Z", "entity": {"id": 12, "name": "Bridge"}},
+    ], "next_page_token": None}, status=200)
+    responses.add(responses.GET, "https://api.affinity.co/field-values?opportunity_id=10", json=[
+        {"id": 1000, "field_id": 1, "list_entry_id": 100, "value": {"id": 77, "text": "Won", "rank": 1}},
+        {"id": 1001, "field_id": 2, "list_entry_id": 100, "value": 2500000},
+        {"id": 1002, "field_id": 3, "list_entry_id": 100, "value": 501},
+        {"id": 1003, "field_id": 3, "list_entry_id": 100, "value": 502},
+        {"id": 1004, "field_id": 4, "list_entry_id": 100, "value": "2024-06-30T00:00:00.000-07:00"},
+        {"id": 1005, "field_id": 5, "list_entry_id": 100, "value": {"city": "Paris", "state": None, "country": "France"}},
+        # Another list's entry for the same entity
+        {"id": 1006, "field_id": 1, "list_entry_id": 999, "value": {"id": 78, "text": "Lost"}},
+    ], status=200)
+    responses.add(responses.GET, "https://api.affinity.co/field-values?opportunity_id=11", json=[], status=200)
+    responses.add(responses.GET, "https://api.affinity.co/field-values?opportunity_id=12", json=[
+        {"id": 1200, "field_id": 2, "list_entry_id": 102, "value": 10.5},
+    ], status=200)
+
+
+@responses.activate
+def test_record_batches_pivot_and_type_field_values():
+    mock_list()
+    exporter = ListExporter(AffinityClient(api_key="test"), 9, batch_size=2)
+    batches = list(exporter.record_batches())
+
+    assert [batch.num_rows for batch in batches] == [2, 1]
+    table = pa.Table.from_batches(batches)
+    assert table.schema.field("Amount").type == pa.float64()
+    assert table.schema.field("Owners").type == pa.list_(pa.int64())
+    rows = table.to_pylist()
+    assert rows[0]["entity_name"] == "Series A"
+    assert rows[0]["Status"] == "Won"
+    assert rows[0]["Owners"] == [501, 502]
+    assert rows[0]["Closed"].isoformat() == "2024-06-30T07:00:00+00:00"
+    assert rows[0]["HQ"] == "Paris, France"
+    assert rows[1]["Status"] is None and rows[1]["Owners"] == []
+    assert rows[2]["Amount"] == 10.5
+
+
+@responses.activate
+@pytest.mark.parametrize("filename", ["export.parquet", "export.arrow"])
+def test_export_list_writes_file(tmp_path, filename):
+    mock_list()
+    path = str(tmp_path / filename)
+    stats = export_list(AffinityClient(api_key="test"), 9, path, batch_size=2)
+    assert stats["rows"] == 3 and stats["batches"] == 2
+
+    if filename.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        table = pq.read_table(path)
+    else:
+        table = pa.ipc.open_file(path).read_all()
+    assert table.column("list_entry_id").to_pylist() == [100, 101, 102]
+    assert table.column("Status").to_pylist() == ["Won", None, None]
+
+
+def test_duplicate_field_names_get_ids():
+    exporter = ListExporter(AffinityClient(api_key="test"), 9, fields=[
+        {"id": 1, "name": "Stage", "value_type": 6}, {"id": 2, "name": "Stage", "value_type": 6}, {"id": 3, "name": "created_at", "value_type": 6},
+    ])
+    assert exporter.schema.names[5:] == ["Stage (1)", "Stage (2)", "created_at (3)"]
@@ -0,0 +1,97 @@
+import csv
+import io
+import json
+import pytest
+import responses
+from affinity.client import AffinityClient
+from affinity.export import CSVSink, MultiListExporter, RecordSink, export_lists
+from affinity.mock_server import LIST_ENTRY_IDS, ORGANIZATION_IDS, MockAffinityServer, generate_data
+from affinity.rate_limit import RateLimiter
+from affinity.retry import NO_RETRY
+
+
+def two_lists():
+    """List 10 with 30 entries and 3 text fields (generate_data), plus list 11 with 5 of the same organizations."""
+    data = generate_data(organizations=40, list_entries=30, fields=3, field_values=2)
+    data["lists"].append({"id": 11, "type": 1, "name": "Portfolio", "public": True, "owner_id": 1, "list_size": 5})
+    data["fields"].append({"id": 200, "name": "Stage", "list_id": 11, "entity_type": 1, "value_type": 2, "allows_multiple": True, "dropdown_options": []})
+    for i, org in enumerate(data["organizations"][:5]):
+        entry_id = LIST_ENTRY_IDS + 100 + i
+        data["list_entries"].append({"id": entry_id, "list_id": 11, "creator_id": 1, "entity_id": org["id"], "entity_type": 1, "created_at": "2024-02-01T00:00:00.000Z", "entity": org})
+        for k, text in enumerate(("Seed", "Series A")):
+            data["field_values"].append({"id": 9_000_000 + 2 * i + k, "field_id": 200, "entity_id": org["id"], "entity_type": 1, "list_entry_id": entry_id, "value": {"id": 1, "text": text}})
+    return data
+
+
+@pytest.fixture
+def server():
+    with MockAffinityServer(two_lists()) as server:
+        yield server
+
+
+def test_export_lists_to_callback(server):
+    records = []
+    stats = export_lists(server.client(), [10, 11], records.append, max_workers=4, page_size=10)
+
+    assert stats["records"] == 35 and stats["per_list"] == {10: 30, 11: 5}
+    assert stats["errors"] == []
+    by_entry = {(r["list_id"], r["list_entry_id"]): r for r in records}
+    portfolio = by_entry[(11, LIST_ENTRY_IDS + 100)]
+    assert portfolio["entity_id"] == ORGANIZATION_IDS and portfolio["entity_name"] == "Company 0"
+    # Only the list's own fields and the entry's own values
+    assert portfolio["fields"] == {"Stage": ["Seed", "Series A"]}
+    pipeline = by_entry[(10, LIST_ENTRY_IDS)]
+    assert set(pipeline["fields"]) == {"Field 0", "Field 1", "Field 2"}
+    assert sum(value is not None for value in pipeline["fields"].values()) == 2
+    # 2 /fields, 3 + 1 list entry pages, one field value fetch per entry
+    assert server.requests == 2 + 4 + 35
+
+
+def test_export_lists_to_files(server, tmp_path):
+    jsonl = str(tmp_path / "export.jsonl")
+    export_lists(server.client(), [10, 11], jsonl)
+    with open(jsonl) as f:
+        assert len([json.loads(line) for line in f]) == 35
+
+    out = io.StringIO()
+    export_lists(server.client(), [11, 10], CSVSink(out))
+    rows = list(csv.DictReader(io.StringIO(out.getvalue())))
+    assert list(rows[0])[:7] == ["list_id", "list_entry_id", "entity_id", "entity_type", "entity_name", "created_at", "Stage"]
+    assert {row["Stage"] for row in rows if row["list_id"] == "11"} == {"Seed; Series A"}
+
+
+def test_export_lists_records_errors(server):
+    records = []
+    stats = export_lists(server.client(retry_policy=NO_RETRY), [10, 99], records.append, fields={99: []})
+    assert stats["per_list"] == {10: 30, 99: 0}
+    assert [(list_id, entry_id) for list_id, entry_id, _ in stats["errors"]] == [(99, None)]
+
+
+def test_export_lists_paces_requests(server):
+    clock = [0.0]
+    waits = []
+
+    def sleep(seconds):
+        waits.append(seconds)
+        clock[0] += seconds
+
+    budget = RateLimiter(limit=10, window=1.0, clock=lambda: clock[0], sleep=sleep)
+    stats = export_lists(server.client(), [11], [].append, rate_limiter=budget, max_workers=1)
+    assert stats["records"] == 5
+    # 1 page + 5 fetches fit in the 10-token burst
+    assert waits == []
+    export_lists(server.client(), [11], [].append, rate_limiter=budget, max_workers=1)
+    assert waits
+
+
+def test_record_sink_requires_write():
+    with pytest.raises(TypeError):
+        RecordSink()
+
+
+@responses.activate
+def test_paged_fields_filtered_by_list():
+    responses.add(responses.GET, "https://api.affinity.co/fields?list_id=9", json={"fields": [{"id": 1, "name": "Stage", "list_id": 9}, {"id": 2, "name": "Global", "list_id": None}], "next_page_token": "p2"}, status=200)
+    responses.add(responses.GET, "https://api.affinity.co/fields?list_id=9&page_token=p2", json={"fields": [{"id": 3, "name": "Owner", "list_id": 9}], "next_page_token": None}, status=200)
+    exporter = MultiListExporter(AffinityClient(api_key="test", retry_policy=NO_RETRY), [9])
+    assert [f["id"] for f in exporter.fields[9]] == [1, 3]
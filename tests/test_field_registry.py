@@ -0,0 +1,157 @@
+import json
+import os
+import pytest
+import responses
+from affinity.client import AffinityClient
+from affinity.field_registry import FieldRegistry
+from affinity.retry import NO_RETRY
+
+SAMPLE_FIELDS = os.path.join(os.path.dirname(__file__), "..", "examples", "sample_affinity_fields.json")
+LIST_ID = 263367
+
+
+def sample_fields():
+    with open(SAMPLE_FIELDS) as f:
+        return json.load(f)
+
+
+def test_lookup_by_name_and_id():
+    registry = FieldRegistry()
+    registry.load(sample_fields())
+    assert registry.field("status")["id"] == 4707433
+    assert registry.field(4707433)["name"] == "Status"
+    assert registry.field_id("  Deal FUND ") == 4707461
+    assert len(registry.fields(LIST_ID)) == 20
+    assert [f["id"] for f in registry.fields(LIST_ID, entity_type=8)] == []
+    with pytest.raises(ValueError):
+        registry.field("No such field")
+
+
+def test_option_resolution():
+    registry = FieldRegistry()
+    registry.load(sample_fields())
+    assert registry.option_id("Status", "identified") == 19697139
+    assert registry.option("Status", 19697139)["text"] == "Identified"
+    # Ranked dropdowns (value_type 7) are written by option ID, dropdowns (2) by option text
+    assert registry.resolve("Status", "Identified") == (4707433, 19697139)
+    assert registry.resolve("Deal Fund", "data ventures ii") == (4707461, "Data Ventures II")
+    assert registry.resolve("Fundraising Amount €", 2500000) == (4707434, 2500000)
+    # IDs the registry doesn't know pass through
+    assert registry.resolve(999, "x") == (999, "x")
+    with pytest.raises(ValueError):
+        registry.resolve("Status", "Unheard of")
+
+
+def test_list_fields_win_over_global_fields():
+    registry = FieldRegistry()
+    registry.load([
+        {"id": 1, "name": "Stage", "list_id": None},
+        {"id": 2, "name": "Stage", "list_id": 10},
+        {"id": 3, "name": "Stage", "list_id": 11},
+    ])
+    with pytest.raises(ValueError) as exc_info:
+        registry.field("Stage")
+    assert "Ambiguous" in str(exc_info.value)
+    assert registry.field_id("Stage", list_id=10) == 2
+    assert registry.field_id("Stage", list_id=12) == 1
+
+
+def test_load_merges_list_fields():
+    registry = FieldRegistry()
+    registry.load(
+        [{"id": 1, "name": "Stage", "list_id": 10, "entity_type": 8}],
+        [{"id": 10, "name": "Deals", "fields": [{"id": 1, "name": "Stage"}, {"id": 2, "name": "Owner"}]}],
+    )
+    assert [f["id"] for f in registry.fields(10)] == [2, 1]
+    assert [f["id"] for f in registry.fields(entity_type=8)] == [1]
+
+
+def add_fields(fields):
+    responses.add(responses.GET, "https://api.affinity.co/fields", json=fields, status=200)
+
+
+@responses.activate
+def test_refreshes_lazily(clock):
+    add_fields([{"id": 1, "name": "Stage"}])
+    responses.add(responses.GET, f"https://api.affinity.co/lists/{LIST_ID}", json={"id": LIST_ID, "fields": []}, status=200)
+    client = AffinityClient(api_key="test", retry_policy=NO_RETRY)
+    registry = FieldRegistry(client, list_ids=[LIST_ID], max_age=600, min_refresh_interval=60, clock=clock)
+    client.field_registry = registry
+
+    assert registry.field_id("Stage") == 1
+    assert registry.refreshes == 1
+    assert len(responses.calls) == 2
+
+    # Misses reload at most once per min_refresh_interval
+    with pytest.raises(ValueError):
+        registry.field("Owner")
+    assert registry.refreshes == 1
+    clock.now = 61
+    with pytest.raises(ValueError):
+        registry.field("Owner")
+    assert registry.refreshes == 2
+
+    clock.now = 61 + 601
+    registry.field("Stage")
+    assert registry.refreshes == 3
+
+
+@responses.activate
+def test_paged_fields():
+    responses.add(responses.GET, "https://api.affinity.co/fields", json={"fields": [{"id": 1, "name": "A"}], "next_page_token": "p2"}, status=200)
+    responses.add(responses.GET, "https://api.affinity.co/fields", json={"fields": [{"id": 2, "name": "B"}], "next_page_token": None}, status=200)
+    client = AffinityClient(api_key="test")
+    registry = client.build_field_registry()
+    assert client.field_registry is registry
+    assert [f["id"] for f in registry.fields()] == [1, 2]
+    assert "page_token=p2" in responses.calls[1].request.url
+
+
+@responses.activate
+def test_set_field_values_by_name():
+    add_fields(sample_fields())
+    responses.add(responses.GET, "https://api.affinity.co/field-values?opportunity_id=555", json=[
+        {"id": 1, "field_id": 4707433, "value": {"id": 19697139, "text": "Identified"}, "list_entry_id": 99},
+    ], status=200)
+    responses.add(responses.POST, "https://api.affinity.co/field-values", json={"id": 2, "field_id": 4707461}, status=200)
+
+    client = AffinityClient(api_key="test")
+    client.build_field_registry()
+    summary = client.set_field_values(555, {"Status": "Identified", "Deal Fund": "Data Ventures II"}, entity_type=8, list_entry_id=99)
+
+    assert summary["unchanged"] == [4707433]
+    assert summary["created"] == [{"id": 2, "field_id": 4707461}]
+    assert json.loads(responses.calls[-1].request.body) == {"field_id": 4707461, "value": "Data Ventures II", "entity_id": 555, "list_entry_id": 99}
+    # /fields was read once, when the registry was built
+    assert sum(1 for call in responses.calls if "/fields" in call.request.url) == 1
+
+
+@responses.activate
+def test_create_field_invalidates():
+    add_fields([{"id": 1, "name": "Stage"}])
+    responses.add(responses.POST, "https://api.affinity.co/fields", json={"id": 2, "name": "Owner"}, status=200)
+    client = AffinityClient(api_key="test")
+    registry = client.build_field_registry()
+    client.create_field("Owner", entity_type=8, value_type=0)
+    assert registry.stale
+
+
+@responses.activate
+def test_write_paths_take_list_id():
+    add_fields([
+        {"id": 11, "name": "Status", "list_id": 1, "value_type": 6},
+        {"id": 22, "name": "Status", "list_id": 2, "value_type": 6},
+    ])
+    responses.add(responses.GET, "https://api.affinity.co/field-values?opportunity_id=555", json=[], status=200)
+    responses.add(responses.GET, "https://api.affinity.co/field-values?opportunity_id=555&field_id=11", json=[], status=200)
+    responses.add(responses.POST, "https://api.affinity.co/field-values", json={"id": 1}, status=200)
+    client = AffinityClient(api_key="test", retry_policy=NO_RETRY)
+    client.build_field_registry()
+
+    with pytest.raises(ValueError):
+        client.set_field_values(555, {"Status": "Open"}, entity_type=8)
+    client.set_field_values(555, {"Status": "Open"}, entity_type=8, list_id=2)
+    client.set_field_value("Status", "Open", 555, entity_type=8, list_id=1)
+    client.create_field_value("Status", "Open", 555, list_id=2)
+    posted = [json.loads(call.request.body)["field_id"] for call in responses.calls if call.request.method == "POST"]
+    assert posted == [22, 11, 22]
@@ -0,0 +1,115 @@
+import pytest
+import responses
+from responses import matchers
+from affinity.client import AffinityClient
+from affinity.exceptions import AffinityAPIError
+from affinity.indexes import OrganizationIndex, PersonIndex, normalize_domain
+from affinity.retry import NO_RETRY
+from affinity.webhooks import WebhookDispatcher, apply_to_client
+
+
+def test_normalize_domain():
+    assert normalize_domain("https://www.Acme.com/about?x=1") == "acme.com"
+    assert normalize_domain("ada@Acme.com") == "acme.com"
+    assert normalize_domain(" acme.com:443 ") == "acme.com"
+    assert normalize_domain("") == ""
+
+
+def test_organization_index_lookups():
+    index = OrganizationIndex([
+        {"id": 1, "name": "Acme  Inc", "domain": "acme.com", "domains": ["acme.com", "acme.io"]},
+        {"id": 2, "name": "acme inc", "domain": None, "domains": []},
+    ])
+    assert len(index) == 2
+    assert index.by_domain("WWW.ACME.IO")["id"] == 1
+    assert [o["id"] for o in index.by_name("ACME Inc")] == [1, 2]
+    assert index.match_domains(["acme.com", "unknown.com"]) == {"acme.com": index.get(1), "unknown.com": None}
+
+    index.add({"id": 1, "name": "Acme Corp", "domain": "acme.com", "domains": ["acme.com"]})
+    assert index.by_domain("acme.io") is None
+    assert [o["id"] for o in index.by_name("acme inc")] == [2]
+
+    index.remove(1)
+    assert index.by_domain("acme.com") is None
+    assert 1 not in index
+
+
+@responses.activate
+def test_client_builds_index_and_keeps_it_fresh():
+    responses.add(responses.GET, "https://api.affinity.co/organizations", json={
+        "organizations": [{"id": 1, "name": "Acme", "domain": "acme.com", "domains": ["acme.com"]}],
+        "next_page_token": None,
+    }, status=200)
+    responses.add(responses.POST, "https://api.affinity.co/organizations", json={"id": 2, "name": "Globex", "domain": "globex.com", "domains": ["globex.com"]}, status=200)
+    responses.add(responses.PUT, "https://api.affinity.co/organizations/1", json={"id": 1, "name": "Acme", "domain": "acme.io", "domains": ["acme.io"]}, status=200)
+    responses.add(responses.DELETE, "https://api.affinity.co/organizations/2", json={"success": True}, status=200)
+    client = AffinityClient(api_key="test")
+
+    index = client.build_organization_index()
+    assert client.organization_index is index
+    assert index.by_domain("acme.com")["id"] == 1
+
+    client.create_organization(name="Globex", domain="globex.com")
+    assert index.by_domain("globex.com")["id"] == 2
+    client.update_organization(1, domain="acme.io")
+    assert index.by_domain("acme.com") is None and index.by_domain("acme.io")["id"] == 1
+    client.delete_organization(2)
+    assert index.by_domain("globex.com") is None
+    assert len(responses.calls) == 4
+
+    dispatcher = apply_to_client(WebhookDispatcher(), client)
+    dispatcher.dispatch({"type": "organization.created", "body": {"id": 3, "name": "Initech", "domain": "initech.com"}})
+    assert index.by_domain("initech.com")["id"] == 3
+    dispatcher.dispatch({"type": "organization.deleted", "body": {"id": 3}})
+    assert index.by_domain("initech.com") is None
+
+
+@responses.activate
+def test_resolve_emails_answers_from_index_and_searches_misses():
+    responses.add(responses.GET, "https://api.affinity.co/persons", json={
+        "persons": [{"id": 1, "first_name": "Ada", "primary_email": "ada@acme.com", "emails": ["ada@acme.com", "Ada@Home.org"]}],
+        "next_page_token": None,
+    }, status=200, match=[matchers.query_param_matcher({"page_size": "500"})])
+    # Term search is fuzzy: only an exact email match counts
+    responses.add(responses.GET, "https://api.affinity.co/persons", json={
+        "persons": [{"id": 2, "first_name": "Bob", "emails": ["bob@globex.com.au"]}, {"id": 3, "first_name": "Bob", "emails": ["bob@globex.com"]}],
+    }, status=200, match=[matchers.query_param_matcher({"term": "bob@globex.com", "page_size": "50"})])
+    responses.add(responses.GET, "https://api.affinity.co/persons", json={"persons": []}, status=200,
+                  match=[matchers.query_param_matcher({"term": "nobody@nowhere.com", "page_size": "50"})])
+    client = AffinityClient(api_key="test")
+    index = client.build_person_index()
+
+    resolved = client.resolve_emails(["ADA@home.org", " Bob@Globex.com", "nobody@nowhere.com", "bob@globex.com"])
+    assert resolved["ADA@home.org"]["id"] == 1
+    assert resolved[" Bob@Globex.com"]["id"] == 3 and resolved["bob@globex.com"]["id"] == 3
+    assert resolved["nobody@nowhere.com"] is None
+    # One listing page plus one search per distinct miss
+    assert len(responses.calls) == 3
+    assert index.by_email("bob@globex.com")["id"] == 3
+
+    client.resolve_emails(["bob@globex.com"])
+    assert len(responses.calls) == 3
+
+
+@responses.activate
+def test_person_writes_update_index():
+    responses.add(responses.POST, "https://api.affinity.co/persons", json={"id": 4, "first_name": "Cy", "last_name": "D", "emails": ["cy@acme.com"]}, status=200)
+    responses.add(responses.PUT, "https://api.affinity.co/persons/4", json={"id": 4, "first_name": "Cy", "last_name": "D", "emails": ["cy@initech.com"]}, status=200)
+    responses.add(responses.DELETE, "https://api.affinity.co/persons/4", json={"success": True}, status=200)
+    client = AffinityClient(api_key="test", person_index=PersonIndex())
+
+    client.create_person(first_name="Cy", last_name="D", emails=["cy@acme.com"])
+    assert client.person_index.by_email("cy@acme.com")["id"] == 4
+    client.update_person(4, emails=["cy@initech.com"])
+    assert client.person_index.by_email("cy@acme.com") is None
+    assert client.person_index.by_email("CY@initech.com")["id"] == 4
+    client.delete_person(4)
+    assert 4 not in client.person_index
+
+
+@responses.activate
+def test_resolve_emails_raises_search_errors():
+    responses.add(responses.GET, "https://api.affinity.co/persons", json={"message": "boom"}, status=400)
+    client = AffinityClient(api_key="test", retry_policy=NO_RETRY)
+    with pytest.raises(AffinityAPIError):
+        client.resolve_emails(["ada@acme.com"])
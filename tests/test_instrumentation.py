@@ -0,0 +1,121 @@
+import pytest
+import responses
+from affinity.client import AffinityClient
+from affinity.exceptions import AffinityAPIError
+from affinity.instrumentation import Hook, MetricsCollector, metrics_app, route_of
+from affinity.retry import NO_RETRY, RetryPolicy
+
+
+class Recorder(Hook):
+    def __init__(self):
+        self.events = []
+
+    def before_request(self, call):
+        self.events.append(("before", call.endpoint))
+
+    def after_request(self, call):
+        self.events.append(("after", call.endpoint, call.status_code, call.retries))
+
+
+def test_route_of():
+    assert route_of("/lists/12/list-entries/34") == "/lists/{id}/list-entries/{id}"
+    assert route_of("/field-values") == "/field-values"
+
+
+@responses.activate
+def test_hooks_see_each_call():
+    responses.add(responses.GET, "https://api.affinity.co/organizations/1", json={"id": 1}, status=200)
+    recorder = Recorder()
+    client = AffinityClient(api_key="test", hooks=[recorder])
+    client.get_organization(1)
+    assert recorder.events == [("before", "GET /organizations/{id}"), ("after", "GET /organizations/{id}", 200, 0)]
+
+
+@responses.activate
+def test_metrics_collector():
+    responses.add(responses.GET, "https://api.affinity.co/organizations/1", json={"message": "busy"}, status=503)
+    responses.add(responses.GET, "https://api.affinity.co/organizations/1", json={"id": 1}, status=200, headers={"X-Ratelimit-Limit-User-Remaining": "899"})
+    responses.add(responses.POST, "https://api.affinity.co/organizations", json={"message": "bad"}, status=422)
+    metrics = MetricsCollector()
+    client = AffinityClient(api_key="test", hooks=[metrics], retry_policy=RetryPolicy(sleep=lambda seconds: None))
+
+    client.get_organization(1)
+    with pytest.raises(AffinityAPIError):
+        client.create_organization(name="Acme")
+
+    snapshot = metrics.snapshot()
+    get = snapshot["GET /organizations/{id}"]
+    assert get["count"] == 1 and get["retries"] == 1 and get["errors"] == 0
+    assert get["statuses"] == {"200": 1}
+    assert get["response_bytes"] == len(b'{"id": 1}')
+    post = snapshot["POST /organizations"]
+    assert post["errors"] == 1 and post["statuses"] == {"422": 1}
+    assert post["request_bytes"] > 0
+    assert metrics.rate_limit_remaining == 899
+    assert 0 < metrics.quantile("GET /organizations/{id}", 0.99) <= 0.005
+
+
+def test_quantile_estimate():
+    metrics = MetricsCollector()
+
+    class Call:
+        endpoint = "GET /field-values"
+        status_code = 200
+        error = None
+        retries = 0
+        request_bytes = 0
+        response_bytes = 10
+        rate_limit_remaining = None
+
+    for seconds in [0.02] * 90 + [0.4] * 10:
+        Call.seconds = seconds
+        metrics.after_request(Call)
+    assert 0.01 < metrics.quantile("GET /field-values", 0.5) <= 0.025
+    assert 0.25 < metrics.quantile("GET /field-values", 0.99) <= 0.5
+    assert metrics.quantile("GET /persons", 0.5) is None
+
+
+@responses.activate
+def test_prometheus_text():
+    responses.add(responses.GET, "https://api.affinity.co/lists", json=[], status=200)
+    metrics = MetricsCollector()
+    client = AffinityClient(api_key="test", hooks=[metrics], retry_policy=NO_RETRY)
+    client.list_lists()
+
+    text = metrics.prometheus_text()
+    assert '# TYPE affinity_client_request_duration_seconds histogram' in text
+    assert 'affinity_client_request_duration_seconds_bucket{method="GET",route="/lists",le="+Inf"} 1' in text
+    assert 'affinity_client_responses_total{method="GET",route="/lists",status="200"} 1' in text
+    assert 'affinity_client_retries_total{method="GET",route="/lists"} 0' in text
+
+    statuses = []
+    body = b"".join(metrics_app(metrics)({}, lambda status, headers: statuses.append(status)))
+    assert statuses == ["200 OK"] and body.decode() == text
+
+
+@responses.activate
+def test_opentelemetry_spans():
+    pytest.importorskip("opentelemetry.sdk")
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+    from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+    from opentelemetry.trace import StatusCode
+    from affinity.instrumentation import OpenTelemetryHook
+
+    exporter = InMemorySpanExporter()
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    responses.add(responses.GET, "https://api.affinity.co/persons/7", json={"id": 7}, status=200)
+    responses.add(responses.GET, "https://api.affinity.co/persons/8", json={"message": "missing"}, status=404)
+    client = AffinityClient(api_key="test", hooks=[OpenTelemetryHook(provider.get_tracer("test"))], retry_policy=NO_RETRY)
+
+    client.get_person(7)
+    with pytest.raises(AffinityAPIError):
+        client.get_person(8)
+
+    ok, failed = exporter.get_finished_spans()
+    assert ok.name == "GET /persons/{id}"
+    assert ok.attributes["http.response.status_code"] == 200
+    assert ok.attributes["url.path"] == "/persons/7"
+    assert failed.status.status_code == StatusCode.ERROR
+    assert failed.attributes["http.response.status_code"] == 404
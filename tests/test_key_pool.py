@@ -0,0 +1,123 @@
+import pytest
+import responses
+from affinity.auth import FAILOVER, KeyPool, basic_auth_header
+from affinity.client import AffinityClient
+from affinity.rate_limit import RateLimiter
+from affinity.retry import RetryPolicy
+
+URL = "https://api.affinity.co/organizations/1"
+
+
+def sent_headers():
+    return [call.request.headers["Authorization"] for call in responses.calls]
+
+
+def test_basic_auth_header():
+    assert basic_auth_header("test") == "Basic OnRlc3Q="
+
+
+@responses.activate
+def test_single_key_header():
+    responses.add(responses.GET, URL, json={"id": 1}, status=200)
+    client = AffinityClient(api_key="test")
+    client.get_organization(1)
+    assert sent_headers() == [basic_auth_header("test")]
+    assert client.api_key == "test"
+
+
+@responses.activate
+def test_round_robin():
+    responses.add(responses.GET, URL, json={"id": 1}, status=200)
+    client = AffinityClient(api_key=["a", "b", "c"])
+    for _ in range(4):
+        client.get_organization(1)
+    assert sent_headers() == [basic_auth_header(k) for k in "abca"]
+
+
+@responses.activate
+def test_failover_on_429(clock):
+    responses.add(responses.GET, URL, json={"message": "Too many requests"}, status=429, headers={"Retry-After": "30"})
+    responses.add(responses.GET, URL, json={"id": 1}, status=200)
+    sleeps = []
+    keys = KeyPool(["a", "b"], strategy=FAILOVER, clock=clock)
+    client = AffinityClient(api_key=keys, retry_policy=RetryPolicy(sleep=sleeps.append, clock=clock))
+
+    assert client.get_organization(1)["id"] == 1
+    assert sent_headers() == [basic_auth_header("a"), basic_auth_header("b")]
+    assert sleeps == []
+
+    # "a" stays skipped until its Retry-After has passed
+    assert keys.acquire().key == "b"
+    clock.now = 31
+    assert keys.acquire().key == "a"
+
+
+def test_exhausted_quota_header(clock):
+    keys = KeyPool(["a", "b"], clock=clock)
+    first = keys.acquire()
+    keys.report(first, 200, {"X-Ratelimit-Limit-User-Remaining": "0", "X-Ratelimit-Limit-User-Reset": "12"})
+    assert [keys.acquire().key for _ in range(3)] == ["b", "b", "b"]
+    clock.now = 12
+    assert keys.acquire().key == "a"
+
+
+def test_all_keys_exhausted_uses_first_to_recover(clock):
+    keys = KeyPool(["a", "b"], clock=clock)
+    a, b = keys.acquire(), keys.acquire()
+    keys.report(a, 429, {"Retry-After": "50"})
+    keys.report(b, 429, {"Retry-After": "20"})
+    assert not keys.available()
+    assert keys.acquire().key == "b"
+
+
+@responses.activate
+def test_exhausted_key_does_not_hold_back_the_others(clock):
+    responses.add(responses.GET, URL, json={"id": 1}, status=200, headers={
+        "X-Ratelimit-Limit-User": "900", "X-Ratelimit-Limit-User-Remaining": "0", "X-Ratelimit-Limit-User-Reset": "60",
+    })
+    responses.add(responses.GET, URL, json={"id": 1}, status=200, headers={
+        "X-Ratelimit-Limit-User": "900", "X-Ratelimit-Limit-User-Remaining": "850", "X-Ratelimit-Limit-User-Reset": "60",
+    })
+    sleeps = []
+    limiter = RateLimiter(limit=900 * 2, clock=clock, sleep=sleeps.append)
+    limiter.seeded = True
+    client = AffinityClient(api_key=KeyPool(["a", "b"], clock=clock), rate_limiter=limiter)
+
+    client.get_organization(1)
+    client.get_organization(1)
+    assert sent_headers() == [basic_auth_header("a"), basic_auth_header("b")]
+    assert sleeps == []
+    assert limiter.limit == 1800 and limiter.blocked_until == 0.0
+
+
+@responses.activate
+def test_429_without_spare_key_backs_off():
+    responses.add(responses.GET, URL, json={"message": "Too many requests"}, status=429, headers={"Retry-After": "2"})
+    responses.add(responses.GET, URL, json={"id": 1}, status=200)
+    sleeps = []
+    client = AffinityClient(api_key="test", retry_policy=RetryPolicy(sleep=sleeps.append))
+    client.get_organization(1)
+    assert sleeps == [2.0]
+
+
+@responses.activate
+def test_rotate_key():
+    responses.add(responses.GET, URL, json={"id": 1}, status=200)
+    client = AffinityClient(api_key="old")
+    client.get_organization(1)
+    client.api_key = "new"
+    client.get_organization(1)
+    assert sent_headers() == [basic_auth_header("old"), basic_auth_header("new")]
+
+    client.keys.replace(["x", "y"])
+    client.keys.rotate("y", "z")
+    assert client.keys.keys == ["x", "z"]
+    with pytest.raises(ValueError):
+        client.keys.rotate("missing", "w")
+
+
+def test_invalid_pool():
+    with pytest.raises(ValueError):
+        KeyPool([])
+    with pytest.raises(ValueError):
+        KeyPool(["a"], strategy="random")
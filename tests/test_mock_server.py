@@ -0,0 +1,65 @@
+import pytest
+from affinity.exceptions import AffinityAPIError, RateLimitError
+from affinity.mock_server import ORGANIZATION_IDS, PERSON_IDS, MockAffinityServer, generate_data
+from affinity.retry import NO_RETRY, RetryPolicy
+
+
+@pytest.fixture
+def server():
+    with MockAffinityServer(generate_data(persons=30, organizations=120, list_entries=20, fields=3, field_values=2)) as server:
+        yield server
+
+
+def test_paging(server):
+    client = server.client()
+    page = client.list_organizations(page_size=50)
+    assert len(page["organizations"]) == 50 and page["next_page_token"] == "50"
+    assert len(list(client.list_all_organizations(page_size=50))) == 120
+    assert server.calls["GET /organizations"] == 4
+
+
+def test_term_search_and_writes(server):
+    client = server.client()
+    assert [p["id"] for p in client.list_persons(term="person7@")["persons"]] == [PERSON_IDS + 7]
+
+    created = client.create_person("New", "Person", ["new@example.com"])
+    assert client.get_person(created["id"])["primary_email"] == "new@example.com"
+    client.update_organization(ORGANIZATION_IDS, name="Renamed")
+    assert client.get_organization(ORGANIZATION_IDS)["name"] == "Renamed"
+
+
+def test_field_values_by_entity_type(server):
+    client = server.client()
+    assert len(client.list_field_values(ORGANIZATION_IDS + 3)) == 2
+    # Probed person_id first (404), then organization_id
+    assert server.calls["GET /field-values"] == 2
+    with pytest.raises(AffinityAPIError) as exc_info:
+        client.list_field_values(ORGANIZATION_IDS + 3, entity_type=0)
+    assert exc_info.value.status_code == 404
+
+
+def test_set_field_value_updates_existing(server):
+    client = server.client()
+    entity_id = ORGANIZATION_IDS + 5
+    field_id = client.list_field_values(entity_id, entity_type=1)[0]["field_id"]
+    client.set_field_value(field_id, "changed", entity_id, entity_type=1)
+    values = [v for v in client.list_field_values(entity_id, entity_type=1) if v["field_id"] == field_id]
+    assert [v["value"] for v in values] == ["changed"]
+
+
+def test_throttle_every():
+    with MockAffinityServer(generate_data(organizations=10), throttle_every=2) as server:
+        client = server.client(retry_policy=RetryPolicy(sleep=lambda seconds: None))
+        for _ in range(3):
+            client.get_organization(ORGANIZATION_IDS)
+        assert server.requests == 5 and server.throttled == 2
+
+
+def test_rate_limit_window():
+    with MockAffinityServer(generate_data(organizations=10), rate_limit=2, rate_window=60) as server:
+        client = server.client(retry_policy=NO_RETRY)
+        client.get_organization(ORGANIZATION_IDS)
+        client.get_organization(ORGANIZATION_IDS)
+        with pytest.raises(RateLimitError) as exc_info:
+            client.get_organization(ORGANIZATION_IDS)
+    assert 0 < exc_info.value.retry_after <= 60
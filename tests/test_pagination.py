@@ -0,0 +1,106 @@
+import threading
+import time
+import pytest
+import responses
+from affinity.client import AffinityClient
+from affinity.pagination import iter_items, iter_pages
+
+
+def make_pages(count):
+    pages = {}
+    for i in range(count):
+        token = None if i == 0 else f"t{i}"
+        pages[token] = {"items": [i], "next_page_token": f"t{i + 1}" if i + 1 < count else None}
+    return pages
+
+
+@pytest.mark.parametrize("lookahead", [0, 1, 3])
+def test_iter_items_yields_every_page_in_order(lookahead):
+    pages = make_pages(5)
+    assert list(iter_items(pages.__getitem__, "items", lookahead)) == [0, 1, 2, 3, 4]
+
+
+def test_prefetch_fetches_next_page_while_consuming():
+    pages = make_pages(3)
+    fetched = []
+    second_page_fetched = threading.Event()
+
+    def fetch(token):
+        fetched.append(token)
+        if token == "t1":
+            second_page_fetched.set()
+        return pages[token]
+
+    it = iter_pages(fetch, lookahead=1)
+    next(it)
+    # The background worker fetches page 2 without the caller asking for it
+    assert second_page_fetched.wait(timeout=1)
+    assert [p["items"][0] for p in it] == [1, 2]
+
+
+def test_prefetch_propagates_errors():
+    def fetch(token):
+        if token is None:
+            return {"items": [0], "next_page_token": "t1"}
+        raise RuntimeError("page failed")
+
+    it = iter_items(fetch, "items", lookahead=2)
+    assert next(it) == 0
+    with pytest.raises(RuntimeError):
+        next(it)
+
+
+def test_prefetch_worker_stops_when_consumer_stops_early():
+    def fetch(token):
+        time.sleep(0.001)
+        return {"items": [1], "next_page_token": "more"}
+
+    threads_before = threading.active_count()
+    it = iter_items(fetch, "items", lookahead=2)
+    next(it)
+    it.close()
+    assert threading.active_count() == threads_before
+
+
+@responses.activate
+def test_list_all_organizations_with_prefetch():
+    responses.add(
+        responses.GET,
+        "https://api.affinity.co/organizations",
+        json={"organizations": [{"id": 1}], "next_page_token": "next1"},
+        status=200,
+    )
+    responses.add(
+        responses.GET,
+        "https://api.affinity.co/organizations",
+        json={"organizations": [{"id": 2}], "next_page_token": None},
+        status=200,
+    )
+    client = AffinityClient(api_key="test")
+    results = list(client.list_all_organizations(prefetch=2))
+    assert [org["id"] for org in results] == [1, 2]
+
+
+@responses.activate
+def test_list_all_reuses_validated_query_across_pages():
+    responses.add(
+        responses.GET,
+        "https://api.affinity.co/persons?page_size=25",
+        json={"persons": [{"id": 1}], "next_page_token": "next1"},
+        status=200,
+    )
+    responses.add(
+        responses.GET,
+        "https://api.affinity.co/persons?page_size=25&page_token=next1",
+        json={"persons": [{"id": 2}], "next_page_token": None},
+        status=200,
+    )
+    client = AffinityClient(api_key="test")
+    assert [p["id"] for p in client.list_all_persons(page_size=25)] == [1, 2]
+
+
+def test_list_all_validates_params_up_front():
+    client = AffinityClient(api_key="test")
+    with pytest.raises(ValueError) as excinfo:
+        next(client.list_all_organizations(page_size="many"))
+    assert "Parameter validation error" in str(excinfo.value)
@@ -0,0 +1,84 @@
+import responses
+import pytest
+from affinity.client import AffinityClient
+from affinity.exceptions import AffinityAPIError, RateLimitError
+from affinity.rate_limit import RateLimiter
+from affinity.retry import NO_RETRY
+
+
+def make_limiter(clock, **kwargs):
+    return RateLimiter(clock=clock, sleep=clock.sleep, **kwargs)
+
+
+def test_bucket_queues_requests_once_empty(clock):
+    limiter = make_limiter(clock, limit=2, window=1.0)
+    limiter.acquire()
+    limiter.acquire()
+    assert clock.sleeps == []
+    limiter.acquire()
+    assert clock.sleeps == [pytest.approx(0.5)]
+
+
+def test_seed_from_rate_limit_status(clock):
+    limiter = make_limiter(clock)
+    limiter.seed({
+        "rate": {
+            "org_monthly": {"limit": 40000, "remaining": 39000, "reset": 3600, "used": 1000},
+            "api_key_per_minute": {"limit": 900, "remaining": 1, "reset": 30, "used": 899},
+        }
+    })
+    assert limiter.seeded
+    limiter.acquire()
+    limiter.acquire()
+    assert clock.sleeps == [pytest.approx(60.0 / 900)]
+
+
+def test_headers_block_until_reset_when_exhausted(clock):
+    limiter = make_limiter(clock)
+    limiter.update_from_headers({
+        "X-Ratelimit-Limit-User": "900",
+        "X-Ratelimit-Limit-User-Remaining": "0",
+        "X-Ratelimit-Limit-User-Reset": "12",
+    })
+    limiter.acquire()
+    assert clock.sleeps == [pytest.approx(12.0)]
+
+
+@responses.activate
+def test_client_seeds_limiter_and_tracks_headers(clock):
+    responses.add(
+        responses.GET,
+        "https://api.affinity.co/rate-limit",
+        json={"rate": {"api_key_per_minute": {"limit": 900, "remaining": 500, "reset": 10}}},
+        status=200,
+    )
+    responses.add(
+        responses.GET,
+        "https://api.affinity.co/auth/whoami",
+        json={"id": 1},
+        status=200,
+        headers={"X-Ratelimit-Limit-User-Remaining": "42"},
+    )
+    limiter = make_limiter(clock)
+    client = AffinityClient(api_key="test", rate_limiter=limiter)
+    assert client.whoami()["id"] == 1
+    assert limiter.seeded
+    assert len(responses.calls) == 2
+    assert limiter.tokens <= 42
+
+
+@responses.activate
+def test_429_raises_rate_limit_error():
+    responses.add(
+        responses.GET,
+        "https://api.affinity.co/auth/whoami",
+        json={"message": "Too many requests"},
+        status=429,
+        headers={"Retry-After": "3"},
+    )
+    client = AffinityClient(api_key="test", retry_policy=NO_RETRY)
+    with pytest.raises(RateLimitError) as excinfo:
+        client.whoami()
+    assert excinfo.value.retry_after == 3.0
+    assert isinstance(excinfo.value, AffinityAPIError)
+    assert "Affinity API error 429" in str(excinfo.value)
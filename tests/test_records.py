@@ -0,0 +1,74 @@
+import pickle
+import sys
+
+import responses
+from affinity.client import AffinityClient
+from affinity.records import FieldValue, ListEntry, Organization, Person, as_dict, to_records
+from affinity.replica import LocalReplica
+
+
+def test_record_behaves_like_the_response_dict():
+    data = {"id": 1, "name": "Acme", "domain": "acme.com", "domains": ["acme.com"], "custom": {"a": 1}}
+    org = Organization.from_dict(data)
+
+    assert org.name == "Acme" and org["name"] == "Acme" and org.get("domain") == "acme.com"
+    assert org.domains == ("acme.com",)
+    assert org["custom"] == {"a": 1}
+    assert "custom" in org and "person_ids" not in org and "nope" not in org
+    assert org.get("person_ids", []) == [] and org.get("nope") is None
+    assert as_dict(org) == {**dict.fromkeys(Organization.fields), **data}
+    assert pickle.loads(pickle.dumps(org)) == org
+    assert not hasattr(org, "__dict__")
+    assert sys.getsizeof(org) < sys.getsizeof(data)
+
+
+def test_records_are_read_only():
+    person = Person.from_dict({"id": 1, "first_name": "Ada"})
+    try:
+        person.first_name = "Bob"
+    except AttributeError:
+        pass
+    else:
+        raise AssertionError("records should be read-only")
+
+
+def test_to_records_by_path():
+    page = to_records("/persons", {"persons": [{"id": 1}, {"id": 2}], "next_page_token": "t"})
+    assert [type(p) for p in page["persons"]] == [Person, Person] and page["next_page_token"] == "t"
+    assert type(to_records("/field-values", [{"id": 5, "value": 1}])[0]) is FieldValue
+    entry = to_records("/lists/9/list-entries/3", {"id": 3, "entity_type": 1, "entity": {"id": 10, "name": "Acme"}})
+    assert type(entry) is ListEntry and entry.entity.name == "Acme"
+    interactions = to_records("/interactions", {"emails": [{"id": 7, "subject": "Hi"}], "next_page_token": None})
+    assert interactions["emails"][0].subject == "Hi"
+    assert to_records("/lists", [{"id": 9}]) == [{"id": 9}]
+
+
+@responses.activate
+def test_typed_client_returns_records():
+    responses.add(responses.GET, "https://api.affinity.co/organizations/10", json={"id": 10, "name": "Acme"}, status=200)
+    responses.add(responses.GET, "https://api.affinity.co/organizations", json={
+        "organizations": [{"id": 10, "name": "Acme", "domain": "acme.com"}], "next_page_token": None,
+    }, status=200)
+    client = AffinityClient(api_key="test", typed_records=True)
+
+    assert client.get_organization(10).name == "Acme"
+    assert [org.domain for org in client.list_all_organizations()] == ["acme.com"]
+    assert [org.domain for org in client.list_all_organizations(stream=True)] == ["acme.com"]
+    assert client.build_organization_index().by_domain("acme.com").id == 10
+
+
+@responses.activate
+def test_replica_accepts_typed_records():
+    responses.add(responses.GET, "https://api.affinity.co/persons", json={"persons": [{"id": 1, "first_name": "Ada", "emails": ["ada@acme.com"]}], "next_page_token": None}, status=200)
+    responses.add(responses.GET, "https://api.affinity.co/organizations", json={"organizations": [], "next_page_token": None}, status=200)
+    responses.add(responses.GET, "https://api.affinity.co/opportunities", json={"opportunities": [], "next_page_token": None}, status=200)
+    responses.add(responses.GET, "https://api.affinity.co/lists", json=[{"id": 9, "name": "People", "type": 0}], status=200)
+    responses.add(responses.GET, "https://api.affinity.co/lists/9/list-entries", json={"list_entries": [{"id": 100, "entity_id": 1, "entity_type": 0}], "next_page_token": None}, status=200)
+    responses.add(responses.GET, "https://api.affinity.co/field-values", json=[{"id": 5000, "field_id": 7, "value": "VIP"}], status=200)
+    responses.add(responses.GET, "https://api.affinity.co/fields", json=[{"id": 7, "name": "Tier", "list_id": 9}], status=200)
+    responses.add(responses.GET, "https://api.affinity.co/field-value-changes", json=[{"id": 1, "field_id": 7, "entity_id": 1}], status=200)
+    replica = LocalReplica(AffinityClient(api_key="test", typed_records=True))
+
+    replica.sync()
+    assert replica.find_persons_by_email("ada@acme.com")[0]["emails"] == ["ada@acme.com"]
+    assert replica.field_values(1, entity_type=0)[0]["value"] == "VIP"
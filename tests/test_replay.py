@@ -0,0 +1,61 @@
+import json
+import pytest
+from affinity.client import AffinityClient
+from affinity.exceptions import AffinityAPIError
+from affinity.mock_server import ORGANIZATION_IDS, MockAffinityServer, generate_data
+from affinity.replay import RecordingTransport, ReplayMissError, ReplayTransport
+from affinity.retry import NO_RETRY
+
+
+@pytest.fixture
+def cassette(tmp_path):
+    path = str(tmp_path / "cassette.jsonl")
+    with MockAffinityServer(generate_data(organizations=120)) as server:
+        client = server.client(api_key="secret-key", transport=RecordingTransport(path), retry_policy=NO_RETRY)
+        client.get_organization(ORGANIZATION_IDS + 1)
+        client.update_organization(ORGANIZATION_IDS + 1, name="Renamed")
+        client.get_organization(ORGANIZATION_IDS + 1)
+        list(client.list_all_organizations(page_size=50, stream=True))
+        with pytest.raises(AffinityAPIError):
+            client.get_organization(1)
+        client.close()
+    return path
+
+
+def replay_client(path, **kwargs):
+    return AffinityClient(api_key="other", transport=ReplayTransport(path, **kwargs), retry_policy=NO_RETRY)
+
+
+def test_cassette_contents(cassette):
+    with open(cassette) as f:
+        text = f.read()
+    assert "secret-key" not in text
+    entries = [json.loads(line) for line in text.splitlines()]
+    assert len(entries) == 7
+    assert entries[1]["request"] == json.dumps(["PUT", f"/organizations/{ORGANIZATION_IDS + 1}", [], {"name": "Renamed"}], sort_keys=True)
+
+
+def test_replay_in_recorded_order(cassette):
+    client = replay_client(cassette)
+    assert client.get_organization(ORGANIZATION_IDS + 1)["name"] == "Company 1"
+    client.update_organization(ORGANIZATION_IDS + 1, name="Renamed")
+    assert client.get_organization(ORGANIZATION_IDS + 1)["name"] == "Renamed"
+    assert len(list(client.list_all_organizations(page_size=50, stream=True))) == 120
+    with pytest.raises(AffinityAPIError) as exc_info:
+        client.get_organization(1)
+    assert exc_info.value.status_code == 404
+    assert client.transport.remaining() == 0
+
+
+def test_replay_miss(cassette):
+    client = replay_client(cassette)
+    with pytest.raises(ReplayMissError):
+        client.get_organization(ORGANIZATION_IDS + 2)
+    with pytest.raises(ReplayMissError):
+        client.update_organization(ORGANIZATION_IDS + 1, name="Other name")
+
+
+def test_replay_non_strict_repeats_last(cassette):
+    client = replay_client(cassette, strict=False)
+    names = [client.get_organization(ORGANIZATION_IDS + 1)["name"] for _ in range(3)]
+    assert names == ["Company 1", "Renamed", "Renamed"]
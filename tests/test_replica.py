@@ -0,0 +1,101 @@
+import responses
+from affinity.client import AffinityClient
+from affinity.mock_server import FIELD_VALUE_IDS, LIST_ENTRY_IDS, ORGANIZATION_IDS, MockAffinityServer, generate_data
+from affinity.replica import LocalReplica
+
+
+def mock_crm(organizations, list_entries, field_values):
+    responses.add(responses.GET, "https://api.affinity.co/persons", json={"persons": [
+        {"id": 1, "first_name": "Ada", "last_name": "Lovelace", "primary_email": "ada@acme.com", "emails": ["ada@acme.com", "Ada@Home.org"]},
+    ], "next_page_token": None}, status=200)
+    responses.add(responses.GET, "https://api.affinity.co/organizations", json={"organizations": organizations, "next_page_token": None}, status=200)
+    responses.add(responses.GET, "https://api.affinity.co/opportunities", json={"opportunities": [{"id": 300, "name": "Series A"}], "next_page_token": None}, status=200)
+    responses.add(responses.GET, "https://api.affinity.co/lists", json=[{"id": 9, "name": "Deals", "type": 1}], status=200)
+    responses.add(responses.GET, "https://api.affinity.co/lists/9/list-entries", json={"list_entries": list_entries, "next_page_token": None}, status=200)
+    responses.add(responses.GET, "https://api.affinity.co/fields", json=[{"id": 7, "name": "Status", "list_id": 9}], status=200)
+    responses.add(responses.GET, "https://api.affinity.co/field-value-changes?field_id=7", json=[], status=200)
+    for org_id, values in field_values.items():
+        responses.add(responses.GET, f"https://api.affinity.co/field-values?organization_id={org_id}", json=values, status=200)
+
+
+def field_value_requests():
+    return [c.request.url for c in responses.calls if "/field-values" in c.request.url]
+
+
+@responses.activate
+def test_full_then_incremental_sync():
+    mock_crm(
+        organizations=[{"id": 10, "name": "Acme", "domain": "acme.com", "domains": ["acme.com"]}, {"id": 11, "name": "Globex", "domain": "globex.com"}],
+        list_entries=[{"id": 100, "entity_id": 10, "entity_type": 1}],
+        field_values={10: [{"id": 5000, "field_id": 7, "value": "Active", "list_entry_id": 100}]},
+    )
+    replica = LocalReplica(AffinityClient(api_key="test"))
+    stats = replica.sync()
+    assert stats.tables["organizations"]["inserted"] == 2
+
+    assert replica.get_person(1)["last_name"] == "Lovelace"
+    assert replica.find_persons_by_email("ada@home.org")[0]["id"] == 1
+    assert [o["id"] for o in replica.find_organizations_by_domain("ACME.com")] == [10]
+    assert replica.list_entries(9)[0]["entity_id"] == 10
+    assert replica.field_values(10, entity_type=1)[0]["value"] == "Active"
+    assert len(field_value_requests()) == 1
+
+    responses.reset()
+    mock_crm(
+        organizations=[{"id": 10, "name": "Acme Corp", "domain": "acme.com", "domains": ["acme.com"]}],
+        list_entries=[{"id": 100, "entity_id": 10, "entity_type": 1}, {"id": 101, "entity_id": 300, "entity_type": 8}],
+        field_values={},
+    )
+    responses.add(responses.GET, "https://api.affinity.co/field-values?opportunity_id=300", json=[{"id": 6000, "field_id": 7, "value": "New"}], status=200)
+    stats = replica.sync()
+
+    assert stats.tables["organizations"] == {"inserted": 0, "updated": 1, "deleted": 1, "unchanged": 0}
+    assert stats.tables["persons"]["unchanged"] == 1
+    assert replica.get_organization(11) is None
+    assert replica.find_organizations_by_domain("globex.com") == []
+    # Only the new list entry's field values were fetched
+    assert field_value_requests() == ["https://api.affinity.co/field-values?opportunity_id=300"]
+    assert replica.field_values(300)[0]["value"] == "New"
+
+
+def test_replica_persists_on_disk(tmp_path):
+    path = str(tmp_path / "crm.sqlite")
+    replica = LocalReplica(AffinityClient(api_key="test"), path=path)
+    replica.upsert("organizations", {"id": 1, "name": "Acme", "domain": "acme.com"})
+    replica.set_state("last_sync", "2024-01-01T00:00:00Z")
+    replica.close()
+
+    reopened = LocalReplica(AffinityClient(api_key="test"), path=path)
+    assert reopened.search_organizations("acm")[0]["id"] == 1
+    assert reopened.get_state("last_sync") == "2024-01-01T00:00:00Z"
+
+
+def test_incremental_sync_follows_field_value_changes():
+    with MockAffinityServer(generate_data(organizations=4, list_entries=4, fields=2, field_values=2)) as server:
+        client = server.client()
+        replica = LocalReplica(client)
+        replica.sync()
+        assert len(replica.query("SELECT id FROM field_values")) == 8
+
+        refreshed = []
+        refresh = replica.refresh_field_values
+        replica.refresh_field_values = lambda entity_id, *args: refreshed.append(entity_id) or refresh(entity_id, *args)
+
+        # An edit on an existing entry: only that entity's values are refetched
+        edited = client.update_field_value(FIELD_VALUE_IDS, "edited")
+        replica.sync()
+        assert refreshed == [ORGANIZATION_IDS]
+        assert replica.field_values(ORGANIZATION_IDS, field_id=edited["field_id"])[0]["value"] == "edited"
+
+        # Nothing changed since: nothing refetched
+        refreshed.clear()
+        replica.sync()
+        assert refreshed == []
+
+        # Vanished entries and entities take their field values with them
+        client.delete_list_entry(10, LIST_ENTRY_IDS + 1)
+        client.delete_organization(ORGANIZATION_IDS + 2)
+        replica.sync()
+        assert replica.field_values(ORGANIZATION_IDS + 1) == []
+        assert replica.field_values(ORGANIZATION_IDS + 2) == []
+        assert len(replica.query("SELECT id FROM field_values")) == 4
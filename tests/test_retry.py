@@ -0,0 +1,80 @@
+import responses
+import pytest
+import requests
+from affinity.client import AffinityClient
+from affinity.exceptions import AffinityAPIError
+from affinity.retry import RetryPolicy
+
+
+def make_client(clock, **kwargs):
+    policy = RetryPolicy(jitter=False, sleep=clock.sleep, clock=clock, **kwargs)
+    return AffinityClient(api_key="test", retry_policy=policy)
+
+
+@responses.activate
+def test_get_is_retried_with_exponential_backoff(clock):
+    responses.add(responses.GET, "https://api.affinity.co/organizations/1", status=502)
+    responses.add(responses.GET, "https://api.affinity.co/organizations/1", status=503)
+    responses.add(responses.GET, "https://api.affinity.co/organizations/1", json={"id": 1}, status=200)
+    client = make_client(clock)
+    assert client.get_organization(1)["id"] == 1
+    assert clock.sleeps == [0.5, 1.0]
+
+
+@responses.activate
+def test_retry_after_header_is_honored(clock):
+    responses.add(responses.GET, "https://api.affinity.co/auth/whoami", status=429, headers={"Retry-After": "7"})
+    responses.add(responses.GET, "https://api.affinity.co/auth/whoami", json={"id": 1}, status=200)
+    client = make_client(clock)
+    assert client.whoami()["id"] == 1
+    assert clock.sleeps == [7.0]
+
+
+@responses.activate
+def test_gives_up_after_max_retries(clock):
+    responses.add(responses.DELETE, "https://api.affinity.co/notes/5", status=503)
+    client = make_client(clock, max_retries=2)
+    with pytest.raises(AffinityAPIError) as excinfo:
+        client.delete_note(5)
+    assert excinfo.value.status_code == 503
+    assert len(responses.calls) == 3
+
+
+@responses.activate
+def test_time_budget_stops_retries(clock):
+    responses.add(responses.GET, "https://api.affinity.co/auth/whoami", status=429, headers={"Retry-After": "90"})
+    client = make_client(clock, max_elapsed=60)
+    with pytest.raises(AffinityAPIError):
+        client.whoami()
+    assert clock.sleeps == []
+
+
+@responses.activate
+def test_client_errors_are_not_retried(clock):
+    responses.add(responses.GET, "https://api.affinity.co/persons/1", status=404)
+    client = make_client(clock)
+    with pytest.raises(AffinityAPIError):
+        client.get_person(1)
+    assert len(responses.calls) == 1
+
+
+@responses.activate
+def test_post_is_only_retried_on_opt_in(clock):
+    responses.add(responses.POST, "https://api.affinity.co/organizations", status=503)
+    responses.add(responses.POST, "https://api.affinity.co/organizations", json={"id": 9}, status=200)
+    client = make_client(clock)
+    with pytest.raises(AffinityAPIError):
+        client.create_organization(name="Acme")
+    assert len(responses.calls) == 1
+
+    client = make_client(clock, retry_posts=True)
+    assert client.create_organization(name="Acme")["id"] == 9
+
+
+@responses.activate
+def test_connection_errors_are_retried(clock):
+    responses.add(responses.GET, "https://api.affinity.co/auth/whoami", body=requests.ConnectionError("reset"))
+    responses.add(responses.GET, "https://api.affinity.co/auth/whoami", json={"id": 1}, status=200)
+    client = make_client(clock)
+    assert client.whoami()["id"] == 1
+    assert len(clock.sleeps) == 1
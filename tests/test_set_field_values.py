@@ -0,0 +1,117 @@
+import json
+import pytest
+import responses
+from affinity.client import AffinityClient
+from affinity.exceptions import AffinityAPIError
+from affinity.retry import NO_RETRY
+
+
+def add_existing_values(values):
+    responses.add(
+        responses.GET,
+        "https://api.affinity.co/field-values?opportunity_id=555",
+        json=values,
+        status=200,
+    )
+
+
+@responses.activate
+def test_set_field_values_reads_once_and_diffs():
+    add_existing_values([
+        {"id": 1, "field_id": 10, "value": "Active", "list_entry_id": 99},
+        {"id": 2, "field_id": 11, "value": {"id": 19697139, "text": "Identified"}, "list_entry_id": 99},
+        {"id": 3, "field_id": 12, "value": 100, "list_entry_id": 99},
+        {"id": 4, "field_id": 13, "value": "old", "list_entry_id": 99},
+    ])
+    responses.add(responses.PUT, "https://api.affinity.co/field-values/1", json={"id": 1, "value": "Closed"}, status=200)
+    responses.add(responses.DELETE, "https://api.affinity.co/field-values/4", json={"success": True}, status=200)
+    responses.add(responses.POST, "https://api.affinity.co/field-values", json={"id": 5, "field_id": 14}, status=200)
+
+    client = AffinityClient(api_key="test")
+    summary = client.set_field_values(
+        555,
+        {10: "Closed", 11: 19697139, 12: 100, 13: None, 14: 2500000},
+        entity_type=8,
+        list_entry_id=99,
+    )
+
+    assert summary["updated"] == [{"id": 1, "value": "Closed"}]
+    assert summary["deleted"] == [{"success": True}]
+    assert summary["created"] == [{"id": 5, "field_id": 14}]
+    assert sorted(summary["unchanged"]) == [11, 12]
+    assert summary["errors"] == {}
+    methods = [call.request.method for call in responses.calls]
+    assert methods.count("GET") == 1
+    assert len(methods) == 4
+    create_body = json.loads([c for c in responses.calls if c.request.method == "POST"][0].request.body)
+    assert create_body == {"field_id": 14, "value": 2500000, "entity_id": 555, "list_entry_id": 99}
+
+
+@responses.activate
+def test_set_field_values_skips_all_writes_when_nothing_changed():
+    add_existing_values({"field_values": [{"id": 1, "field_id": 10, "value": "Active"}]})
+    client = AffinityClient(api_key="test")
+    summary = client.set_field_values(555, {10: "Active"}, entity_type=8)
+    assert summary["unchanged"] == [10]
+    assert len(responses.calls) == 1
+
+
+@responses.activate
+def test_set_field_values_captures_write_errors():
+    add_existing_values([])
+    responses.add(responses.POST, "https://api.affinity.co/field-values", json={"message": "bad value"}, status=422)
+    client = AffinityClient(api_key="test", retry_policy=NO_RETRY)
+    summary = client.set_field_values(555, {10: "x"}, entity_type=8)
+    assert summary["created"] == []
+    assert summary["errors"][10].status_code == 422
+
+
+@responses.activate
+def test_set_field_values_propagates_read_errors():
+    responses.add(responses.GET, "https://api.affinity.co/field-values?opportunity_id=555", json={"message": "boom"}, status=500)
+    client = AffinityClient(api_key="test", retry_policy=NO_RETRY)
+    with pytest.raises(AffinityAPIError):
+        client.set_field_values(555, {10: "x"}, entity_type=8)
+    assert [call.request.method for call in responses.calls] == ["GET"]
+
+
+@responses.activate
+def test_set_field_values_creates_when_no_entity_type_matches():
+    for param in ("person_id", "organization_id", "opportunity_id", "list_entry_id"):
+        responses.add(responses.GET, f"https://api.affinity.co/field-values?{param}=555", json={"message": "not found"}, status=404)
+    responses.add(responses.POST, "https://api.affinity.co/field-values", json={"id": 5}, status=200)
+    client = AffinityClient(api_key="test", retry_policy=NO_RETRY)
+    summary = client.set_field_values(555, {10: "x"})
+    assert summary["created"] == [{"id": 5}]
+
+
+@responses.activate
+def test_set_field_values_diffs_each_value_of_multi_value_fields():
+    add_existing_values([
+        {"id": 1, "field_id": 10, "value": {"id": 7, "name": "Acme"}},
+        {"id": 2, "field_id": 10, "value": {"id": 8, "name": "Globex"}},
+        {"id": 3, "field_id": 11, "value": "a"},
+        {"id": 4, "field_id": 11, "value": "b"},
+    ])
+    responses.add(responses.POST, "https://api.affinity.co/field-values", json={"id": 5}, status=200)
+    responses.add(responses.DELETE, "https://api.affinity.co/field-values/2", json={"success": True}, status=200)
+    client = AffinityClient(api_key="test")
+    summary = client.set_field_values(555, {10: [7, 9], 11: ["b", "a"]}, entity_type=8)
+
+    assert summary["unchanged"] == [11]
+    assert summary["created"] == [{"id": 5}] and summary["deleted"] == [{"success": True}]
+    create_body = json.loads([c for c in responses.calls if c.request.method == "POST"][0].request.body)
+    assert create_body == {"field_id": 10, "value": 9, "entity_id": 555}
+    assert not [c for c in responses.calls if c.request.method == "PUT"]
+
+
+@responses.activate
+def test_set_field_values_compares_dates():
+    add_existing_values([
+        {"id": 1, "field_id": 10, "value": "2025-03-31T00:00:00.000-07:00"},
+        {"id": 2, "field_id": 11, "value": "2025-01-01T09:30:00.000Z"},
+    ])
+    client = AffinityClient(api_key="test")
+    summary = client.set_field_values(555, {10: "2025-03-31", 11: "2025-01-01T09:30:00+00:00"}, entity_type=8)
+    assert sorted(summary["unchanged"]) == [10, 11]
+    assert len(responses.calls) == 1
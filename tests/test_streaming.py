@@ -0,0 +1,73 @@
+import json
+import pytest
+import responses
+from affinity.client import AffinityClient
+from affinity.streaming import JSONRecordParser, StreamedPage
+
+PAGE = {
+    "list_entries": [
+        {"id": 1, "entity": {"id": 10, "name": "Acme é", "domains": ["acme.com"]}},
+        {"id": 2, "entity": {"id": 20, "name": "Globex", "score": 12.5}},
+    ],
+    "next_page_token": "abc",
+    "total": 1234,
+}
+
+
+def chunked(data: bytes, size: int):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+@pytest.mark.parametrize("size", [1, 2, 7, 64, 10000])
+def test_parser_handles_any_chunk_boundary(size):
+    body = json.dumps(PAGE).encode("utf-8")
+    page = StreamedPage(chunked(body, size), "list_entries")
+    assert list(page) == PAGE["list_entries"]
+    assert page.meta == {"next_page_token": "abc", "total": 1234}
+
+
+def test_parser_yields_records_before_the_body_is_complete():
+    parser = JSONRecordParser("list_entries")
+    body = json.dumps(PAGE)
+    cut = body.index('{"id": 2')
+    assert parser.feed(body[:cut]) == [PAGE["list_entries"][0]]
+    assert parser.feed(body[cut:]) == [PAGE["list_entries"][1]]
+    assert parser.close() == []
+
+
+def test_parser_handles_top_level_arrays():
+    body = json.dumps([{"id": 1}, {"id": 2}, 3]).encode()
+    assert list(StreamedPage(chunked(body, 3), "field_values")) == [{"id": 1}, {"id": 2}, 3]
+
+
+def test_parser_rejects_truncated_bodies():
+    body = json.dumps(PAGE).encode()[:-5]
+    with pytest.raises(ValueError):
+        list(StreamedPage([body], "list_entries"))
+
+
+@responses.activate
+def test_list_all_list_entries_stream():
+    responses.add(
+        responses.GET,
+        "https://api.affinity.co/lists/101/list-entries?page_size=50",
+        json={"list_entries": [{"id": 1}], "next_page_token": "next1"},
+        status=200,
+    )
+    responses.add(
+        responses.GET,
+        "https://api.affinity.co/lists/101/list-entries?page_size=50&page_token=next1",
+        json={"list_entries": [{"id": 2}], "next_page_token": None},
+        status=200,
+    )
+    client = AffinityClient(api_key="test")
+    assert [e["id"] for e in client.list_all_list_entries(101, stream=True)] == [1, 2]
+
+
+@responses.activate
+def test_iter_field_values_probes_entity_type():
+    responses.add(responses.GET, "https://api.affinity.co/field-values?person_id=5", json={"message": "not found"}, status=404)
+    responses.add(responses.GET, "https://api.affinity.co/field-values?organization_id=5", json=[{"id": 1}, {"id": 2}], status=200)
+    client = AffinityClient(api_key="test")
+    assert [fv["id"] for fv in client.iter_field_values(5)] == [1, 2]
+    assert client.entity_type_cache.get(5) == "organization_id"
@@ -0,0 +1,119 @@
+import json
+import pytest
+import responses
+from affinity.client import AffinityClient
+from affinity.exceptions import AffinityAPIError
+from affinity.retry import NO_RETRY
+from affinity.transport import DEFAULT_TIMEOUT, RequestsTransport
+
+
+@responses.activate
+def test_default_transport_applies_timeout():
+    responses.add(responses.GET, "https://api.affinity.co/organizations/1", json={"id": 1}, status=200)
+    client = AffinityClient(api_key="test")
+    client.get_organization(1)
+    assert responses.calls[0].request.req_kwargs["timeout"] == DEFAULT_TIMEOUT
+
+
+@responses.activate
+def test_requests_transport_settings():
+    responses.add(responses.GET, "https://api.affinity.co/organizations/1", json={"id": 1}, status=200)
+    transport = RequestsTransport(pool_maxsize=64, keep_alive=False, timeout=5)
+    client = AffinityClient(api_key="test", transport=transport)
+    assert client.session is transport.session
+    assert transport.session.get_adapter("https://api.affinity.co")._pool_maxsize == 64
+
+    client.get_organization(1)
+    request = responses.calls[0].request
+    assert request.headers["Connection"] == "close"
+    assert request.req_kwargs["timeout"] == 5
+    client.close()
+
+
+@responses.activate
+def test_base_url():
+    responses.add(responses.GET, "http://localhost:8080/organizations/1", json={"id": 1}, status=200)
+    with AffinityClient(api_key="test", base_url="http://localhost:8080/") as client:
+        assert client.get_organization(1) == {"id": 1}
+
+
+httpx = pytest.importorskip("httpx")
+
+from affinity.transport import HTTPXTransport
+
+
+def make_client(handler, **kwargs):
+    return AffinityClient(api_key="test", transport=HTTPXTransport(http2=False, transport=httpx.MockTransport(handler)), **kwargs)
+
+
+def test_httpx_transport_get():
+    def handler(request):
+        assert request.url.path == "/organizations/456"
+        assert request.headers["Authorization"] == "Basic OnRlc3Q="
+        return httpx.Response(200, json={"id": 456, "name": "Serena Capital"})
+
+    with make_client(handler) as client:
+        assert client.get_organization(456)["name"] == "Serena Capital"
+
+
+def test_httpx_transport_sends_json_body():
+    def handler(request):
+        assert json.loads(request.content)["emails"] == ["new.person@example.com"]
+        return httpx.Response(200, json={"id": 321})
+
+    with make_client(handler) as client:
+        assert client.create_person("New", "Person", ["new.person@example.com"])["id"] == 321
+
+
+def test_httpx_transport_error_status():
+    def handler(request):
+        return httpx.Response(404, json={"error": "Not found"})
+
+    with make_client(handler, retry_policy=NO_RETRY) as client:
+        with pytest.raises(AffinityAPIError) as exc_info:
+            client.get_organization(1)
+    assert exc_info.value.status_code == 404
+
+
+def test_httpx_transport_connection_errors_are_retryable():
+    attempts = []
+
+    def handler(request):
+        attempts.append(request)
+        if len(attempts) == 1:
+            raise httpx.ConnectError("refused")
+        return httpx.Response(200, json={"id": 1})
+
+    with make_client(handler) as client:
+        client.retry_policy.sleep = lambda seconds: None
+        assert client.get_organization(1)["id"] == 1
+    assert len(attempts) == 2
+
+
+def test_httpx_transport_streaming():
+    organizations = [{"id": i, "name": f"Org {i}"} for i in range(50)]
+
+    def handler(request):
+        return httpx.Response(200, json={"organizations": organizations, "next_page_token": None})
+
+    with make_client(handler) as client:
+        assert [org["id"] for org in client.list_all_organizations(stream=True)] == list(range(50))
+
+
+def test_httpx_transport_cache_revalidation(clock):
+    from affinity.cache import ResponseCache
+
+    requests_seen = []
+
+    def handler(request):
+        requests_seen.append(request)
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, json={"id": 1}, headers={"ETag": '"v1"'})
+
+    with make_client(handler, cache=ResponseCache(clock=clock)) as client:
+        client.whoami()
+        clock.now += 3601
+        assert client.whoami() == {"id": 1}
+        assert client.cache.revalidations == 1
+    assert len(requests_seen) == 2
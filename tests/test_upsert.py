@@ -0,0 +1,103 @@
+import json
+
+import responses
+from responses import matchers
+from affinity.client import AffinityClient
+from affinity.indexes import OrganizationIndex, PersonIndex
+from affinity.rate_limit import RateLimiter
+from affinity.retry import NO_RETRY
+from affinity.upsert import upsert_organizations, upsert_persons
+
+
+@responses.activate
+def test_upsert_persons_only_writes_what_changed():
+    responses.add(responses.GET, "https://api.affinity.co/persons", json={"persons": [
+        {"id": 1, "first_name": "Ada", "last_name": "Lovelace", "emails": ["ada@acme.com"]},
+        {"id": 2, "first_name": "Bob", "last_name": "Smith", "emails": ["bob@globex.com"]},
+    ], "next_page_token": None}, status=200)
+    responses.add(responses.PUT, "https://api.affinity.co/persons/2", json={"id": 2}, status=200,
+                  match=[matchers.json_params_matcher({"last_name": "Smyth", "emails": ["bob@globex.com", "bob@home.org"]})])
+    responses.add(responses.POST, "https://api.affinity.co/persons", json={"id": 3, "emails": ["cy@initech.com"]}, status=200)
+    client = AffinityClient(api_key="test")
+
+    report = upsert_persons(client, [
+        {"first_name": "Ada", "last_name": "Lovelace", "email": "ADA@acme.com"},
+        {"first_name": "Bob", "last_name": "Smyth", "emails": ["bob@globex.com", "bob@home.org"]},
+        {"first_name": "Cy", "last_name": "D", "email": "cy@initech.com"},
+        {"first_name": "Cy", "last_name": "D", "email": "cy@initech.com"},
+        {"first_name": "No", "last_name": "Email"},
+    ])
+
+    assert [(r.action, r.id) for r in report.results] == [
+        ("unchanged", 1), ("updated", 2), ("created", 3), ("duplicate", None), ("failed", None),
+    ]
+    assert report.requests == 2
+    assert report.counts == {"unchanged": 1, "updated": 1, "created": 1, "duplicate": 1, "failed": 1}
+    assert client.person_index.by_email("cy@initech.com")["id"] == 3
+
+
+@responses.activate
+def test_upsert_organizations_resumes_from_checkpoint(tmp_path):
+    checkpoint = str(tmp_path / "orgs.jsonl")
+    responses.add(responses.POST, "https://api.affinity.co/organizations", json={"id": 10}, status=200,
+                  match=[matchers.json_params_matcher({"name": "Acme", "domain": "acme.com"})])
+    responses.add(responses.POST, "https://api.affinity.co/organizations", json={"message": "boom"}, status=500,
+                  match=[matchers.json_params_matcher({"name": "Globex", "domain": "globex.com"})])
+    client = AffinityClient(api_key="test", retry_policy=NO_RETRY, organization_index=OrganizationIndex())
+    rows = [{"name": "Acme", "domain": "https://acme.com"}, {"name": "Globex", "domain": "globex.com"}]
+
+    report = upsert_organizations(client, rows, checkpoint_path=checkpoint)
+    assert [r.action for r in report.results] == ["created", "failed"]
+    assert len(report.failed) == 1
+    with open(checkpoint) as f:
+        assert [json.loads(line) for line in f] == [{"key": "acme.com", "action": "created", "id": 10}]
+
+    # Restart with a fresh index (as after a crash): the checkpoint alone prevents a duplicate create
+    responses.replace(responses.POST, "https://api.affinity.co/organizations", json={"id": 11}, status=200,
+                      match=[matchers.json_params_matcher({"name": "Globex", "domain": "globex.com"})])
+    client.organization_index = OrganizationIndex()
+    report = upsert_organizations(client, rows, checkpoint_path=checkpoint)
+    assert [(r.action, r.id) for r in report.results] == [("resumed", 10), ("created", 11)]
+    assert report.requests == 1
+
+
+@responses.activate
+def test_upsert_organizations_matches_by_unique_name_without_domain():
+    responses.add(responses.PUT, "https://api.affinity.co/organizations/5", json={"id": 5}, status=200)
+    index = OrganizationIndex([{"id": 5, "name": "Initech", "domain": None}])
+    client = AffinityClient(api_key="test", organization_index=index, person_index=PersonIndex())
+
+    report = upsert_organizations(client, [{"name": "initech"}])
+    assert [(r.action, r.id) for r in report.results] == [("updated", 5)]
+    assert json.loads(responses.calls[0].request.body) == {"name": "initech"}
+
+
+def test_checkpoint_survives_truncated_last_line(tmp_path):
+    checkpoint = tmp_path / "persons.jsonl"
+    checkpoint.write_text('{"key": "ada@acme.com", "action": "created", "id": 1}\n{"key": "bob@glo')
+    client = AffinityClient(api_key="test", person_index=PersonIndex([{"id": 3, "first_name": "Cy", "last_name": "D", "emails": ["cy@initech.com"]}]))
+
+    report = upsert_persons(client, [
+        {"first_name": "Ada", "last_name": "L", "email": "ada@acme.com"},
+        {"first_name": "Cy", "last_name": "D", "email": "cy@initech.com"},
+    ], checkpoint_path=str(checkpoint))
+    assert [r.action for r in report.results] == ["resumed", "unchanged"]
+    assert checkpoint.read_text().splitlines()[-1] == '{"key": "cy@initech.com", "action": "unchanged", "id": 3}'
+
+
+@responses.activate
+def test_upsert_paces_writes_without_client_rate_limiter():
+    responses.add(responses.GET, "https://api.affinity.co/organizations", json={"organizations": [], "next_page_token": None}, status=200)
+    responses.add(responses.POST, "https://api.affinity.co/organizations", json={"id": 1}, status=200)
+    clock = [0.0]
+    waits = []
+
+    def sleep(seconds):
+        waits.append(seconds)
+        clock[0] += seconds
+
+    budget = RateLimiter(limit=2, window=1.0, clock=lambda: clock[0], sleep=sleep)
+    report = upsert_organizations(AffinityClient(api_key="test"), [{"name": f"Org {i}", "domain": f"org{i}.com"} for i in range(3)], max_workers=1, rate_limiter=budget)
+    assert report.counts["created"] == 3
+    # Two writes fit the burst, the third waits for a token
+    assert waits == [0.5]
@@ -0,0 +1,108 @@
+import io
+import json
+import os
+
+import responses
+from affinity.cache import ResponseCache
+from affinity.client import AffinityClient
+from affinity.replica import LocalReplica
+from affinity.webhooks import WebhookDispatcher, WebhookReceiver, apply_to_client, apply_to_replica, replay_events
+
+EVENTS = os.path.join(os.path.dirname(__file__), "fixtures", "webhook_events.jsonl")
+
+
+def test_dispatch_matches_exact_and_glob_types():
+    dispatcher = WebhookDispatcher()
+    seen = []
+    dispatcher.on("person.created", lambda body, event: seen.append(("exact", body["id"])))
+
+    @dispatcher.on("person.*")
+    def any_person(body, event):
+        seen.append(("glob", event["type"]))
+
+    assert dispatcher.dispatch({"type": "person.created", "body": {"id": 1}}) == 2
+    assert dispatcher.dispatch({"type": "note.created", "body": {}}) == 0
+    assert seen == [("exact", 1), ("glob", "person.created")]
+
+
+def test_replay_into_replica():
+    replica = LocalReplica(AffinityClient(api_key="test"))
+    dispatcher = apply_to_replica(WebhookDispatcher(), replica)
+
+    assert replay_events(dispatcher, EVENTS) == 8
+
+    assert replica.get_person(1) is None
+    assert replica.get_organization(10)["name"] == "Acme Corp"
+    assert replica.find_organizations_by_domain("acme.com") == []
+    assert replica.find_organizations_by_domain("acme.io")[0]["id"] == 10
+    assert replica.list_entries(9)[0]["entity_id"] == 10
+    # Entity type comes from the list entry the value belongs to
+    values = replica.field_values(10, entity_type=1)
+    assert [v["value"] for v in values] == ["Active"]
+
+    replay_events(dispatcher, [
+        {"type": "field_value.deleted", "body": {"id": 5000}},
+        {"type": "list_entry.deleted", "body": {"id": 100, "list_id": 9}},
+    ])
+    assert replica.field_values(10) == []
+    assert replica.list_entries(9) == []
+
+
+@responses.activate
+def test_events_invalidate_client_caches():
+    responses.add(responses.GET, "https://api.affinity.co/fields", json=[{"id": 7, "name": "Status"}], status=200)
+    client = AffinityClient(api_key="test", cache=ResponseCache())
+    dispatcher = apply_to_client(WebhookDispatcher(), client)
+
+    client.list_fields()
+    client.list_fields()
+    assert len(responses.calls) == 1
+
+    replay_events(dispatcher, EVENTS)
+    assert client.entity_type_cache.get(10) == "organization_id"
+    assert client.entity_type_cache.get(1) is None  # person.deleted
+
+    client.list_fields()
+    assert len(responses.calls) == 2
+
+
+def wsgi_post(app, payload, query=""):
+    body = json.dumps(payload).encode() if not isinstance(payload, bytes) else payload
+    environ = {
+        "REQUEST_METHOD": "POST",
+        "QUERY_STRING": query,
+        "CONTENT_LENGTH": str(len(body)),
+        "wsgi.input": io.BytesIO(body),
+    }
+    status = []
+    app(environ, lambda s, headers: status.append(s))
+    return status[0]
+
+
+def test_wsgi_receiver():
+    dispatcher = WebhookDispatcher()
+    received = []
+    dispatcher.on("*", lambda body, event: received.append(event["type"]))
+    receiver = WebhookReceiver(dispatcher, token="s3cret")
+
+    assert wsgi_post(receiver, {"type": "person.created", "body": {"id": 1}}, "token=s3cret").startswith("200")
+    assert wsgi_post(receiver, {"type": "person.created", "body": {"id": 1}}, "token=wrong").startswith("403")
+    assert wsgi_post(receiver, b"{not json", "token=s3cret").startswith("400")
+    assert received == ["person.created"]
+
+    replay_events(receiver, EVENTS)
+    assert len(received) == 9
+
+
+def test_wsgi_receiver_token_and_handler_errors():
+    dispatcher = WebhookDispatcher()
+
+    @dispatcher.on("person.created")
+    def reject(body, event):
+        raise ValueError("bad person")
+
+    receiver = WebhookReceiver(dispatcher, token="a b&c")
+    assert wsgi_post(receiver, {"type": "organization.created"}, "token=a+b%26c").startswith("200")
+    assert wsgi_post(receiver, {"type": "organization.created"}, "x=token=a b&c").startswith("403")
+    # A handler's exception is a server error, not a malformed request
+    assert wsgi_post(receiver, {"type": "person.created", "body": {}}, "token=a%20b%26c").startswith("500")